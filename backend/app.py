@@ -6,19 +6,32 @@ Business Agent - India Business News Aggregator
 import os
 import yaml
 import json
-import re
+import hashlib
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from functools import partial
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional
 import feedparser
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from openai import OpenAI
-from cache_manager import SimpleCache
+from cache_manager import cache_from_config, content_cache_from_config
+from date_utils import get_entry_date, is_recent_timestamp, parse_date
+from llm_executor import RateLimiter, run_batches
+from url_canon import canonical_url
+from near_dedup import attach_alternates, collapse_near_duplicates
+from llm_batching import MAX_SUMMARY_CHARS, encode_batch, plan_batches, reconcile_output
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dateutil import parser as date_parser
+from feed_fetcher import fetch_feeds_async
+from feed_state import FeedStateStore
+from feed_health import CircuitOpenError, FeedHealthStore, health_from_config, hedged_call
+from feed_parsing import (KNOWN, ParsedFeed, extract_entries, finish_items, get_parse_pool, parse_feed,
+                          parse_workers_from_config)
+from audit_log import AuditLog, audit_log_from_config
+from entry_ledger import EntryLedger
+from item_selection import TopKSelector
+from metrics import metrics
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 # Configure logging
@@ -40,7 +53,73 @@ def load_config():
         'openai_api_key': os.getenv('OPENAI_API_KEY'),
         'llm_model': os.getenv('LLM_MODEL', 'gpt-4o-mini'),
         'max_items': int(os.getenv('MAX_ITEMS', '50')),
-        'batch_size': int(os.getenv('BATCH_SIZE', '4'))
+        'select_half_life_hours': float(os.getenv('SELECT_HALF_LIFE_HOURS', '12')),
+        'batch_size': int(os.getenv('BATCH_SIZE', '4')),
+        'fetch_mode': os.getenv('FETCH_MODE', 'thread'),
+        'fetch_workers': int(os.getenv('FETCH_WORKERS', '10')),
+        'fetch_max_in_flight': int(os.getenv('FETCH_MAX_IN_FLIGHT', '50')),
+        'fetch_per_host_limit': int(os.getenv('FETCH_PER_HOST_LIMIT', '4')),
+        'fetch_timeout': int(os.getenv('FETCH_TIMEOUT', '10')),
+        'feed_breaker': os.getenv('FEED_BREAKER', 'true').lower() == 'true',
+        'breaker_failures': int(os.getenv('BREAKER_FAILURES', '3')),
+        'breaker_cooldown_seconds': int(os.getenv('BREAKER_COOLDOWN_SECONDS', '300')),
+        'breaker_max_cooldown_seconds': int(os.getenv('BREAKER_MAX_COOLDOWN_SECONDS', '21600')),
+        'feed_health_file': os.getenv('FEED_HEALTH_FILE', 'feed_health.json'),
+        'hedge_requests': os.getenv('HEDGE_REQUESTS', 'false').lower() == 'true',
+        'hedge_factor': float(os.getenv('HEDGE_FACTOR', '1.0')),
+        'conditional_get': os.getenv('CONDITIONAL_GET', 'true').lower() == 'true',
+        'feed_state_file': os.getenv('FEED_STATE_FILE', 'feed_state.json'),
+        'recency_hours': int(os.getenv('RECENCY_HOURS', '48')),
+        'entry_ledger': os.getenv('ENTRY_LEDGER', 'true').lower() == 'true',
+        'entry_ledger_file': os.getenv('ENTRY_LEDGER_FILE', 'entry_ledger.json'),
+        'cache_backend': os.getenv('CACHE_BACKEND', 'json'),
+        'cache_file': os.getenv('CACHE_FILE'),
+        'cache_max_entries': int(os.getenv('CACHE_MAX_ENTRIES', '0')),
+        'cache_max_bytes': int(os.getenv('CACHE_MAX_BYTES', '0')),
+        'schedule_mode': os.getenv('SCHEDULE_MODE', 'fixed'),
+        'feed_state_save_seconds': int(os.getenv('FEED_STATE_SAVE_SECONDS', '300')),
+        'poll_min_seconds': int(os.getenv('POLL_MIN_SECONDS', '120')),
+        'poll_max_seconds': int(os.getenv('POLL_MAX_SECONDS', '3600')),
+        'poll_jitter': float(os.getenv('POLL_JITTER', '0.1')),
+        'feed_schedule_file': os.getenv('FEED_SCHEDULE_FILE', 'feed_schedule.json'),
+        'pipeline_mode': os.getenv('PIPELINE_MODE', 'staged'),
+        'pipeline_linger_seconds': float(os.getenv('PIPELINE_LINGER_SECONDS', '2')),
+        'pipeline_queue_size': int(os.getenv('PIPELINE_QUEUE_SIZE', '200')),
+        'digest_journal_file': os.getenv('DIGEST_JOURNAL_FILE', 'digest_journal.jsonl'),
+        'digest_journal_entries': int(os.getenv('DIGEST_JOURNAL_ENTRIES', '288')),
+        'digest_artifacts': os.getenv('DIGEST_ARTIFACTS', 'true').lower() == 'true',
+        'digest_artifacts_dir': os.getenv('DIGEST_ARTIFACTS_DIR', 'digest'),
+        'audit_dir': os.getenv('AUDIT_DIR', 'audit'),
+        'audit_compression': os.getenv('AUDIT_COMPRESSION', 'gzip'),
+        'audit_max_bytes': int(os.getenv('AUDIT_MAX_BYTES', str(64 * 2 ** 20))),
+        'audit_rotate': os.getenv('AUDIT_ROTATE', 'daily'),
+        'audit_keep': int(os.getenv('AUDIT_KEEP', '30')),
+        'parse_workers': os.getenv('PARSE_WORKERS', '0'),
+        'shard_role': os.getenv('SHARD_ROLE', ''),
+        'shard_id': os.getenv('SHARD_ID', ''),
+        'shard_members': os.getenv('SHARD_MEMBERS', ''),
+        'shard_dir': os.getenv('SHARD_DIR', 'shards'),
+        'shard_vnodes': int(os.getenv('SHARD_VNODES', '100')),
+        'shard_merge_seconds': int(os.getenv('SHARD_MERGE_SECONDS', '30')),
+        'shard_stale_seconds': int(os.getenv('SHARD_STALE_SECONDS', '3600')),
+        'metrics': os.getenv('METRICS', 'true').lower() == 'true',
+        'profile_cycles': int(os.getenv('PROFILE_CYCLES', '0')),
+        'profile_dir': os.getenv('PROFILE_DIR', 'profiles'),
+        'profile_keep': int(os.getenv('PROFILE_KEEP', '20')),
+        'profile_sample_ms': float(os.getenv('PROFILE_SAMPLE_MS', '5')),
+        'near_dedup': os.getenv('NEAR_DEDUP', 'true').lower() == 'true',
+        'near_dup_threshold': float(os.getenv('NEAR_DUP_THRESHOLD', '0.25')),
+        'content_cache': os.getenv('CONTENT_CACHE', 'true').lower() == 'true',
+        'content_cache_file': os.getenv('CONTENT_CACHE_FILE'),
+        'content_cache_hours': int(os.getenv('CONTENT_CACHE_HOURS', '168')),
+        'cache_negative_ttl_minutes': int(os.getenv('CACHE_NEGATIVE_TTL_MINUTES', '60')),
+        'openai_base_url': os.getenv('OPENAI_BASE_URL') or None,
+        'llm_concurrency': int(os.getenv('LLM_CONCURRENCY', '4')),
+        'llm_rpm': int(os.getenv('LLM_RPM', '500')),
+        'llm_tpm': int(os.getenv('LLM_TPM', '200000')),
+        'llm_max_attempts': int(os.getenv('LLM_MAX_ATTEMPTS', '3')),
+        'llm_batch_tokens': int(os.getenv('LLM_BATCH_TOKENS', '4000')),
+        'llm_summary_chars': int(os.getenv('LLM_SUMMARY_CHARS', str(MAX_SUMMARY_CHARS)))
     }
 
     # Load RSS sources
@@ -51,154 +130,325 @@ def load_config():
     return config
 
 
-def clean_text(text: str) -> str:
-    """Remove HTML tags and normalize whitespace"""
-    if not text:
-        return ""
-
-    # Remove HTML tags
-    soup = BeautifulSoup(text, 'html.parser')
-    clean_text = soup.get_text()
-
-    # Collapse whitespace
-    clean_text = re.sub(r'\s+', ' ', clean_text)
-    clean_text = clean_text.strip()
-
-    return clean_text
-
-
 def get_published_date(entry) -> str:
     """Safely extract and normalize published date"""
-    for field in ['published', 'updated', 'created']:
-        date_str = getattr(entry, field, None)
-        if date_str:
-            try:
-                return date_parser.parse(date_str).isoformat()
-            except:
-                continue
-    return datetime.now().isoformat()
+    return get_entry_date(entry)[1]
 
 
 def is_recent_article(published_date: str, hours: int = 48) -> bool:
     """Check if article is within the specified time window"""
-    try:
-        article_date = date_parser.parse(published_date)
-        cutoff_date = datetime.now(article_date.tzinfo) - timedelta(hours=hours)
-        return article_date >= cutoff_date
-    except:
+    parsed = parse_date(published_date)
+    if parsed is None:
         return True  # If we can't parse date, include the article
+    return is_recent_timestamp(parsed[0], hours)
+
+
+def is_recent_item(item: Dict, hours: int = 48) -> bool:
+    """Recency check on an extracted item, without re-parsing when possible"""
+    if 'published_ts' in item:
+        return is_recent_timestamp(item['published_ts'], hours)
+    return is_recent_article(item.get('published', ''), hours)
 
 
 @retry(stop=stop_after_attempt(3), wait=wait_exponential(min=1, max=10))
-def fetch_feed_with_retry(url: str, timeout: int = 10) -> feedparser.FeedParserDict:
-    """Fetch RSS feed with retry logic and timeout"""
+def fetch_feed_with_retry(url: str, timeout: int = 10, headers: Dict[str, str] = None) -> requests.Response:
+    """Fetch RSS feed with retry logic and timeout (a 304 is returned, not raised)"""
     response = requests.get(url, timeout=timeout, headers={
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        **(headers or {})
     })
     response.raise_for_status()
-    return feedparser.parse(response.content)
+    return response
+
+
+def extract_feed_items(name: str, parsed_feed: feedparser.FeedParserDict, ledger: EntryLedger = None,
+                       recency_hours: int = 48) -> tuple[List[Dict], int, int]:
+    """Extract recent, cleaned items from a parsed feed"""
+    is_known = (lambda key: ledger.lookup(key)[0]) if ledger is not None else None
+    items, items_ok, items_failed = ledger_items(extract_entries(name, parsed_feed, recency_hours, is_known), ledger)
+    return finish_items(items), items_ok, items_failed
+
+
+def ledger_items(parsed: ParsedFeed, ledger: EntryLedger = None) -> tuple[List[Dict], int, int]:
+    """Items of a parsed feed (raw text until finish_items): known entries from the ledger, new ones recorded in it"""
+    if parsed.warning:
+        logging.warning(parsed.warning)
+    if parsed.error:
+        logging.error(parsed.error)
+    if parsed.parse_seconds:
+        metrics.observe('stage_seconds', parsed.parse_seconds, stage='parse')
+
+    items = []
+    for key, item in parsed.entries:
+        if item == KNOWN:
+            known_item = ledger.lookup(key)[1]
+            if known_item is not None:
+                items.append(known_item)
+            continue
+        if key is not None and ledger is not None:
+            ledger.record(key, item)
+        if item is not None:
+            items.append(item)
+    return items, len(items), parsed.items_failed
+
+
+def build_feed_info(name: str, items_ok: int, items_failed: int,
+                    not_modified: bool = False, bytes_saved: int = 0,
+                    health: Dict = None, hedged: bool = False, skipped: bool = False) -> Dict:
+    """Create the per-feed entry of feed_summary"""
+    feed_info = {
+        'name': name,
+        'items_ok': items_ok,
+        'items_failed': items_failed,
+        'status': 'success' if items_ok > 0 else 'failed',
+        'not_modified': not_modified,
+        'bytes_saved': bytes_saved
+    }
+    if health is not None:
+        feed_info.update(health, hedged=hedged, skipped=skipped)
+    return feed_info
 
 
-def fetch_single_feed(feed: Dict) -> tuple[str, List[Dict], Dict]:
+def fetch_single_feed(feed: Dict, feed_state: FeedStateStore = None, ledger: EntryLedger = None,
+                      recency_hours: int = 48, health: FeedHealthStore = None,
+                      hedge_executor=None, hedge_factor: float = None,
+                      timeout: int = 10, parse_pool=None) -> tuple[str, List[Dict], Dict]:
     """Fetch items from a single RSS feed with all improvements"""
+    url = feed['url']
+    handle = partial(process_feed_response, feed, feed_state=feed_state, ledger=ledger,
+                     recency_hours=recency_hours, health=health, parse_pool=parse_pool)
+    if health is not None and not health.allow(url):
+        return handle(None, CircuitOpenError(url))
+
+    logging.info(f"Fetching from {feed['name']}...")
+    # Fetch with retry and timeout, conditional on what we saw last time; a half-open probe gets one attempt
+    headers = feed_state.request_headers(url) if feed_state else None
+    fetch = fetch_feed_with_retry
+    if health is not None and health.is_probe(url):
+        fetch = fetch_feed_with_retry.retry_with(stop=stop_after_attempt(1))
+    hedge_after = None
+    if health is not None and hedge_executor is not None and hedge_factor:
+        hedge_after = health.hedge_delay(url, hedge_factor)
+
+    start = time.monotonic()
+    try:
+        response, hedged = hedged_call(partial(fetch, url, timeout=timeout, headers=headers),
+                                       hedge_after, hedge_executor)
+        response.hedged = hedged
+    except Exception as e:
+        metrics.observe('feed_request_seconds', time.monotonic() - start, mode='thread')
+        if health is not None:
+            health.record(url, time.monotonic() - start, e)
+        return handle(None, e)
+    metrics.observe('feed_request_seconds', time.monotonic() - start, mode='thread')
+    if health is not None:
+        health.record(url, time.monotonic() - start)
+
+    return handle(response)
+
+
+def process_feed_response(feed: Dict, response, error: Exception = None, feed_state: FeedStateStore = None,
+                          ledger: EntryLedger = None, recency_hours: int = 48,
+                          health: FeedHealthStore = None, parse_pool=None) -> tuple[str, List[Dict], Dict]:
+    """Turn a feed response into items; reuses the last items when the feed is unchanged,
+    and serves them while its circuit breaker is open. A changed body is parsed on parse_pool
+    (worker processes) if given, else in the calling thread"""
     name = feed['name']
     url = feed['url']
     items_ok = 0
     items_failed = 0
     items = []
-
-    logging.info(f"Fetching from {name}...")
+    not_modified = False
+    bytes_saved = 0
+    skipped = isinstance(error, CircuitOpenError)
 
     try:
-        # Fetch with retry and timeout
-        parsed_feed = fetch_feed_with_retry(url, timeout=10)
-
-        if parsed_feed.bozo:
-            logging.warning(f"Feed parsing issues for {name}: {parsed_feed.bozo_exception}")
-
-        # Check if feed returned entries
-        if not hasattr(parsed_feed, 'entries') or len(parsed_feed.entries) == 0:
-            logging.error(f"No entries found for {name}")
-            items_failed = 1
+        if skipped:
+            last_items = feed_state.last_items(url) if feed_state is not None else []
+            items = [item for item in last_items if is_recent_item(item, hours=recency_hours)]
+            items_ok = len(items)
+            not_modified = True
+            logging.info(f"⏸️  {name}: circuit open, serving {items_ok} last good items")
+        elif error is not None:
+            raise error
         else:
-            # Extract items
-            for entry in parsed_feed.entries:
-                try:
-                    # Get normalized published date
-                    published_date = get_published_date(entry)
-
-                    # Skip old articles (older than 48 hours)
-                    if not is_recent_article(published_date, hours=48):
-                        continue
-
-                    item = {
-                        'title': clean_text(getattr(entry, 'title', '')),
-                        'summary': clean_text(getattr(entry, 'summary', '') or getattr(entry, 'description', '')),
-                        'link': getattr(entry, 'link', ''),
-                        'published': published_date,
-                        'source': name
-                    }
-
-                    items.append(item)
-                    items_ok += 1
-
-                except Exception as e:
-                    logging.error(f"Error processing entry from {name}: {type(e).__name__}: {e}")
-                    items_failed += 1
-
-        logging.info(f"✅ {name}: {items_ok} items OK, {items_failed} items failed")
+            unchanged = None
+            if feed_state is not None:
+                unchanged = feed_state.unchanged_items(url, response.status_code, response.content)
+
+            if unchanged is not None:
+                # Skip feedparser and clean_text entirely, only re-apply the recency window
+                items = [item for item in unchanged if is_recent_item(item, hours=recency_hours)]
+                items_ok = len(items)
+                not_modified = True
+                if response.status_code == 304:
+                    bytes_saved = feed_state.body_size(url)
+                logging.info(f"✅ {name}: not modified, reusing {items_ok} items")
+            else:
+                known_keys = ledger.known_keys(name) if ledger is not None else None
+                parsed = parse_feed(name, response.content, recency_hours, known_keys, parse_pool)
+                items, items_ok, items_failed = ledger_items(parsed, ledger)
+                # Validators are kept whenever the body parsed; malformed entries are just left out
+                if feed_state is not None and parsed.error is None:
+                    feed_state.record(url, response.headers, response.content, items)
+                logging.info(f"✅ {name}: {items_ok} items OK, {items_failed} items failed")
 
     except Exception as e:
         error_msg = f"{type(e).__name__}: {e}"
         logging.error(f"❌ {name}: Complete failure - {error_msg}")
         items_failed = 1
 
-    # Create feed summary
-    feed_info = {
-        'name': name,
-        'items_ok': items_ok,
-        'items_failed': items_failed,
-        'status': 'success' if items_ok > 0 else 'failed'
-    }
+    if skipped:
+        metrics.inc('feed_fetches_total', outcome='skipped')
+    elif items_failed and not items_ok:
+        metrics.inc('feed_fetches_total', outcome='failed')
+    else:
+        metrics.inc('feed_fetches_total', outcome='not_modified' if not_modified else 'ok')
+
+    health_info = health.summary(url) if health is not None else None
+    return name, items, build_feed_info(name, items_ok, items_failed, not_modified, bytes_saved,
+                                        health_info, getattr(response, 'hedged', False), skipped)
+
+
+class FeedStores:
+    """Feed state, entry ledger and feed health (each None when disabled in the config).
 
+    fetch_rss_items opens a fresh set per call unless given one; the service
+    keeps one for its whole run, so a poll neither reloads the files nor
+    rewrites them within save_seconds of the last save.
+    """
+
+    def __init__(self, config: Dict, save_seconds: float = 0):
+        self.feed_state = None
+        if config.get('conditional_get', True):
+            self.feed_state = FeedStateStore(config.get('feed_state_file', 'feed_state.json'))
+
+        self.ledger = None
+        if config.get('entry_ledger', True):
+            self.ledger = EntryLedger(config.get('entry_ledger_file', 'entry_ledger.json'),
+                                      retention_hours=config.get('recency_hours', 48))
+
+        # Circuit breaker and latency history per feed; hedging needs the latency history
+        self.health = health_from_config(config)
+        self.save_seconds = save_seconds
+        self._saved = float('-inf')  # the first fetch always saves
+
+    def save(self, force: bool = False):
+        """Write every store, unless the last save was less than save_seconds ago"""
+        if not force and time.monotonic() - self._saved < self.save_seconds:
+            return
+        for store in (self.ledger, self.health, self.feed_state):
+            if store is not None:
+                store.save()
+        self._saved = time.monotonic()
+
+
+def _notify_feed(handle_feed: Callable, on_feed: Callable, feed: Dict, response, error: Exception = None):
+    """Run handle_feed, then pass its result to on_feed"""
+    name, items, feed_info = handle_feed(feed, response, error)
+    on_feed(name, items, feed_info)
     return name, items, feed_info
 
 
-def fetch_rss_items(feeds: List[Dict], max_items: int) -> tuple[List[Dict[str, Any]], List[Dict]]:
+def fetch_rss_items(feeds: List[Dict], max_items: int, config: Dict = None, on_feed: Callable = None,
+                    stores: FeedStores = None) -> tuple[List[Dict[str, Any]], List[Dict]]:
     """Fetch and parse RSS items from all feeds with all improvements:
-    - Parallel fetching with ThreadPoolExecutor
+    - Parallel fetching with ThreadPoolExecutor, or asyncio when FETCH_MODE=async
     - Timeout handling and retry logic
-    - Date filtering (48-hour window)
+    - Date filtering (RECENCY_HOURS window, 48 hours by default)
+    - Seen-entry ledger so known entries skip parsing and cleaning
     - Content validation (spam filtering)
-    - Weighted round-robin based on source quality
+    - Top max_items by recency and per-source weight and quota from sources.yml, ranked as
+      feeds complete (see item_selection); only the selected items go through clean_text
+
+    on_feed(name, items, feed_info), if given, is called with each feed's items as it completes, instead
+    of selecting here: the items are still raw (RAW_TEXT), and the consumer ranks them, passes only the
+    ones it keeps to finish_items() and saves the stores once it is done with them (the ledger and feed
+    state hold the same dicts). Only the feed summary is returned then.
+    stores (FeedStores) defaults to a set opened from config; without on_feed it is saved before returning.
     """
-    source_items = {}
+    config = config or {}
+    fetch_start = time.perf_counter()
+    fetch_mode = config.get('fetch_mode', 'thread')
+    selector = TopKSelector(feeds, max_items, config.get('select_half_life_hours', 12)) if on_feed is None else None
     feed_summary = []
+    fetched = 0
+
+    recency_hours = config.get('recency_hours', 48)
+
+    stores = stores or FeedStores(config)
+    feed_state, ledger, health = stores.feed_state, stores.ledger, stores.health
+    hedge_factor = config.get('hedge_factor', 1.0) if config.get('hedge_requests', False) else None
+    timeout = config.get('fetch_timeout', 10)
+
+    # feedparser and clean_text are CPU-bound; with PARSE_WORKERS they run on worker processes
+    parse_pool = get_parse_pool(parse_workers_from_config(config))
+
+    if fetch_mode == 'async':
+        logging.info(f"Starting async fetch from {len(feeds)} feeds...")
+
+        handle_feed = partial(process_feed_response, feed_state=feed_state, ledger=ledger,
+                              recency_hours=recency_hours, health=health, parse_pool=parse_pool)
+        if on_feed is not None:
+            handle_feed = partial(_notify_feed, handle_feed, on_feed)
+
+        results = fetch_feeds_async(
+            feeds,
+            handle_feed,
+            headers_for=feed_state.request_headers if feed_state else None,
+            max_in_flight=config.get('fetch_max_in_flight', 50),
+            per_host_limit=config.get('fetch_per_host_limit', 4),
+            timeout=timeout,
+            health=health,
+            hedge_factor=hedge_factor
+        )
+        for name, items, feed_info in results:
+            if selector is not None:
+                selector.add(name, items)
+            fetched += len(items)
+            feed_summary.append(feed_info)
+    else:
+        logging.info(f"Starting parallel fetch from {len(feeds)} feeds...")
+
+        # Hedged requests run on their own pool; a losing request is left to finish in the background
+        fetch_workers = config.get('fetch_workers', 10)
+        hedge_executor = None
+        if hedge_factor and health is not None:
+            hedge_executor = ThreadPoolExecutor(max_workers=fetch_workers * 2, thread_name_prefix='hedge')
+
+        # Parallel fetching with ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            # Submit all feed fetch tasks
+            future_to_feed = {
+                executor.submit(fetch_single_feed, feed, feed_state, ledger, recency_hours,
+                                health, hedge_executor, hedge_factor, timeout, parse_pool): feed
+                for feed in feeds
+            }
+
+            # Collect results as they complete
+            for future in as_completed(future_to_feed):
+                try:
+                    name, items, feed_info = future.result()
+                    if selector is not None:
+                        selector.add(name, items)
+                    fetched += len(items)
+                    feed_summary.append(feed_info)
 
-    logging.info(f"Starting parallel fetch from {len(feeds)} feeds...")
-
-    # Parallel fetching with ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        # Submit all feed fetch tasks
-        future_to_feed = {executor.submit(fetch_single_feed, feed): feed for feed in feeds}
-
-        # Collect results as they complete
-        for future in as_completed(future_to_feed):
-            try:
-                name, items, feed_info = future.result()
-                source_items[name] = items
-                feed_summary.append(feed_info)
-
-            except Exception as e:
-                feed = future_to_feed[future]
-                feed_name = feed['name']
-                logging.error(f"Unexpected error fetching {feed_name}: {type(e).__name__}: {e}")
-                feed_summary.append({
-                    'name': feed_name,
-                    'items_ok': 0,
-                    'items_failed': 1,
-                    'status': 'failed'
-                })
+                except Exception as e:
+                    feed = future_to_feed[future]
+                    feed_name = feed['name']
+                    logging.error(f"Unexpected error fetching {feed_name}: {type(e).__name__}: {e}")
+                    name, items, feed_info = feed_name, [], build_feed_info(feed_name, 0, 1)
+                    feed_summary.append(feed_info)
+
+                if on_feed is not None:
+                    on_feed(name, items, feed_info)
+
+        if hedge_executor is not None:
+            hedge_executor.shutdown(wait=False)
+
+    # Clean only what made the cut (before the ledger and feed state are saved, as they share the items)
+    all_items = finish_items(selector.selected()) if selector is not None else []
 
     # Print feed summary
     logging.info("\nFeed Summary:")
@@ -212,76 +462,58 @@ def fetch_rss_items(feeds: List[Dict], max_items: int) -> tuple[List[Dict[str, A
 
     logging.info(f"\n{successful_feeds}/{len(feed_summary)} feeds successful")
 
-    # Simple selection: flatten all items and take first max_items
-    all_items = []
-    for source_name in source_items:
-        all_items.extend(source_items[source_name])
-
-    # Take only max_items
-    all_items = all_items[:max_items]
-
-    logging.info(f"\nSelected {len(all_items)} items")
-    source_counts = {}
-    for item in all_items:
-        source_counts[item['source']] = source_counts.get(item['source'], 0) + 1
-    for source, count in sorted(source_counts.items()):
-        logging.info(f"  {source}: {count} items")
-
+    if selector is not None:
+        stores.save()
+
+    if health is not None:
+        open_breakers = [feed_info['name'] for feed_info in feed_summary if feed_info.get('breaker') == 'open']
+        hedged = sum(1 for feed_info in feed_summary if feed_info.get('hedged'))
+        latencies = sorted(feed_info['latency_ms']['p50'] for feed_info in feed_summary
+                           if feed_info.get('latency_ms', {}).get('p50') is not None)
+        if latencies:
+            logging.info(f"Feed latency p50 across feeds: median {latencies[len(latencies) // 2]} ms, "
+                         f"worst {latencies[-1]} ms; {hedged} hedged")
+        if open_breakers:
+            logging.info(f"Circuit open for {len(open_breakers)} feeds: {', '.join(open_breakers)}")
+
+    if feed_state is not None:
+        not_modified = sum(1 for feed_info in feed_summary if feed_info.get('not_modified'))
+        bytes_saved = sum(feed_info.get('bytes_saved', 0) for feed_info in feed_summary)
+        logging.info(f"{not_modified}/{len(feed_summary)} feeds not modified, {bytes_saved / 1024:.0f} KB saved")
+
+    if selector is not None:
+        logging.info(f"\nSelected {len(all_items)} of {fetched} items")
+        source_counts = {}
+        for item in all_items:
+            source_counts[item['source']] = source_counts.get(item['source'], 0) + 1
+        for source, count in sorted(source_counts.items()):
+            logging.info(f"  {source}: {count} items")
+        metrics.inc('items_total', len(all_items), stage='selected')
+
+    metrics.observe('stage_seconds', time.perf_counter() - fetch_start, stage='fetch')
+    metrics.inc('items_total', fetched, stage='fetched')
     return all_items, feed_summary
 
 
 def deduplicate_items(items: List[Dict]) -> List[Dict]:
-    """Remove duplicate items based on link"""
+    """Remove duplicate items based on canonical link"""
     seen_links = set()
     deduped_items = []
 
-    for item in items:
-        link = item.get('link', '')
-        if link and link not in seen_links:
-            seen_links.add(link)
-            deduped_items.append(item)
+    with metrics.timer(stage='dedup'):
+        for item in items:
+            link = canonical_url(item.get('link', ''))
+            if link and link not in seen_links:
+                seen_links.add(link)
+                deduped_items.append(item)
 
+    metrics.inc('items_total', len(deduped_items), stage='deduped')
     return deduped_items
 
 
-def process_with_llm(items: List[Dict], config: Dict) -> List[Dict]:
-    """Process items with OpenAI LLM for analysis and summarization"""
-    if not items:
-        return []
-
-    print(f"Processing {len(items)} items with LLM...")
-
-    # Initialize OpenAI client
-    client = OpenAI(api_key=config['openai_api_key'])
-
-    # Process in batches
-    batch_size = config.get('batch_size', 4)
-    all_processed = []
-
-    for i in range(0, len(items), batch_size):
-        batch = items[i:i+batch_size]
-        print(f"Processing batch {i//batch_size + 1}/{(len(items) + batch_size - 1)//batch_size} ({len(batch)} items)...")
-
-        try:
-            processed_batch = process_batch_with_llm(batch, config, client)
-            all_processed.extend(processed_batch)
-        except Exception as e:
-            print(f"Error processing batch: {e}, using fallback")
-            fallback_batch = fallback_processing(batch)
-            all_processed.extend(fallback_batch)
-
-    print(f"Processed {len(all_processed)} items")
-    return all_processed
-
-
-def process_batch_with_llm(items: List[Dict], config: Dict, client: OpenAI) -> List[Dict]:
-    """Process a single batch of items with OpenAI LLM"""
-
-    # Prepare system prompt
-    system_prompt = """You are a precise India business analyst. Use only the provided item fields (title, summary, source, link, published). Do not invent facts. When unsure, say "unclear". Return strict JSON only."""
+SYSTEM_PROMPT = """You are a precise India business analyst. Use only the provided item fields (title, summary, source). Do not invent facts. When unsure, say "unclear". Return strict JSON only."""
 
-    # Prepare user prompt with input data
-    user_prompt = f"""INPUT JSON: {json.dumps(items, indent=2)}
+USER_PROMPT_TEMPLATE = """INPUT JSON: {input_json}
 
 TASKS:
 For each item, produce:
@@ -295,12 +527,9 @@ For each item, produce:
    - financial_terms: up to 4 financial/business terms (e.g., ["IPO", "merger", "profit"])
    - entities: up to 3 other entities like exchanges, currencies, government bodies (e.g., ["NSE", "RBI", "rupee"])
 
-Return exactly:
-[{{
- "title": "...",
- "source": "...",
- "link": "...",
- "published": "...",
+Return exactly one object per input item, identified by its id (do not repeat titles or links):
+{{"items": [{{
+ "id": "0",
  "one_liner": "...",
  "bullets": ["...", "..."],
  "labels": ["policy"],
@@ -310,46 +539,144 @@ Return exactly:
    "financial_terms": ["..."],
    "entities": ["..."]
  }}
-}}]"""
+}}]}}"""
 
-    try:
+
+# Content-cache entries are tied to this; editing either prompt invalidates them
+PROMPT_VERSION = hashlib.sha1((SYSTEM_PROMPT + USER_PROMPT_TEMPLATE).encode('utf-8')).hexdigest()[:12]
+
+
+def process_uncached_items(uncached_items: List[Dict], config: Dict, cache, content_cache=None,
+                           client: OpenAI = None, limiter: RateLimiter = None) -> List[Dict]:
+    """Reuse analyses of unchanged text from the content cache, send the rest to the LLM, update both tiers"""
+    if content_cache is not None:
+        content_cache.clean_expired()
+        reused, to_process = content_cache.partition(uncached_items)
+        if reused:
+            print(f"📊 Content cache: {len(reused)} re-published stories reused, {len(to_process)} need the LLM")
+    else:
+        reused, to_process = [], uncached_items
+
+    failed_links = set()
+    processed = process_with_llm(to_process, config, failed_links, client, limiter) if to_process else []
+    if content_cache is not None:
+        content_cache.update(to_process, processed, failed_links)
+
+    processed_new = reused + processed
+    cache.update(uncached_items, processed_new, failed_links)
+    return processed_new
+
+
+def make_llm_client(config: Dict) -> OpenAI:
+    """OpenAI client; retries are handled per batch by the executor"""
+    return OpenAI(
+        api_key=config['openai_api_key'],
+        base_url=config.get('openai_base_url'),
+        max_retries=0
+    )
+
+
+def process_with_llm(items: List[Dict], config: Dict, failed_links: set = None,
+                     client: OpenAI = None, limiter: RateLimiter = None) -> List[Dict]:
+    """Process items with OpenAI LLM for analysis and summarization.
+
+    Returns one item per input. Links that only got fallback output are added
+    to failed_links, if given, so the caller can cache them briefly. Callers
+    running several of these at once pass one client and rate limiter to share.
+    """
+    if not items:
+        return []
+
+    print(f"Processing {len(items)} items with LLM...")
+
+    client = client or make_llm_client(config)
+
+    # Pack batches by estimated tokens (BATCH_SIZE caps items per batch), several in flight at a time
+    batch_size = config.get('batch_size', 4)
+    summary_chars = config.get('llm_summary_chars', MAX_SUMMARY_CHARS)
+    batches = plan_batches(items, config.get('llm_batch_tokens', 4000), max_items=batch_size,
+                           max_summary_chars=summary_chars)
+    concurrency = config.get('llm_concurrency', 4)
+    print(f"Processing {len(batches)} batches of up to {batch_size} items, {concurrency} at a time...")
+
+    def fallback(failed_items: List[Dict]) -> List[Dict]:
+        if failed_links is not None:
+            failed_links.update(canonical_url(item['link']) for item in failed_items if item.get('link'))
+        return fallback_processing(failed_items)
+
+    limiter = limiter or RateLimiter(config.get('llm_rpm', 500), config.get('llm_tpm', 200000))
+    all_processed = run_batches(
+        batches,
+        lambda batch: call_llm_batch(batch, config, client),
+        fallback,
+        concurrency=concurrency,
+        limiter=limiter,
+        max_attempts=config.get('llm_max_attempts', 3),
+        max_summary_chars=summary_chars
+    )
+
+    print(f"Processed {len(all_processed)} items")
+    return all_processed
+
+
+def call_llm_batch(items: List[Dict], config: Dict, client: OpenAI) -> List[Optional[Dict]]:
+    """Send one batch to the LLM; one answer per input item, None where missing or invalid.
+
+    API errors propagate to the caller; a malformed response counts as all items missing.
+    """
+
+    # Compact, field-minimal input keyed by short IDs; link and published are restored locally
+    input_json, items_by_id = encode_batch(items, config.get('llm_summary_chars', MAX_SUMMARY_CHARS))
+    user_prompt = USER_PROMPT_TEMPLATE.format(input_json=input_json)
+
+    with metrics.timer('llm_batch_seconds'):
         response = client.chat.completions.create(
             model=config['llm_model'],
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             response_format={"type": "json_object"},
             timeout=120  # Restore reasonable timeout for batch processing
         )
 
-        result_text = response.choices[0].message.content
-
-        # Parse JSON
-        parsed_result = json.loads(result_text)
-
-        # Handle if response is wrapped in array
-        if isinstance(parsed_result, list):
-            processed_items = parsed_result
-        elif isinstance(parsed_result, dict):
-            # Try different possible keys
-            if 'items' in parsed_result:
-                processed_items = parsed_result['items']
-            elif 'articles' in parsed_result:
-                processed_items = parsed_result['articles']
-            elif 'stories' in parsed_result:
-                processed_items = parsed_result['stories']
-            else:
-                # If no known key, assume the dict values are the items
-                processed_items = list(parsed_result.values())[0] if parsed_result else []
+    usage = getattr(response, 'usage', None)
+    if usage is not None:
+        metrics.inc('llm_tokens_total', getattr(usage, 'prompt_tokens', 0) or 0, kind='prompt')
+        metrics.inc('llm_tokens_total', getattr(usage, 'completion_tokens', 0) or 0, kind='completion')
+
+    result_text = response.choices[0].message.content
+
+    # Parse JSON
+    try:
+        parsed_result = json.loads(result_text or '')
+    except ValueError as e:
+        logging.warning(f"LLM returned malformed JSON for {len(items)} items: {e}")
+        parsed_result = None
+
+    # Handle if response is wrapped in array
+    if isinstance(parsed_result, list):
+        processed_items = parsed_result
+    elif isinstance(parsed_result, dict):
+        # Try different possible keys
+        if 'items' in parsed_result:
+            processed_items = parsed_result['items']
+        elif 'articles' in parsed_result:
+            processed_items = parsed_result['articles']
+        elif 'stories' in parsed_result:
+            processed_items = parsed_result['stories']
         else:
-            processed_items = []
+            # If no known key, assume the dict values are the items
+            processed_items = list(parsed_result.values())[0] if parsed_result else []
+    else:
+        processed_items = []
 
-        return validate_llm_output(processed_items)
+    if not isinstance(processed_items, list):
+        processed_items = []
 
-    except Exception as e:
-        print(f"LLM processing failed: {e}")
-        return fallback_processing(items)
+    answers = reconcile_output(items, processed_items, items_by_id)
+    metrics.inc('llm_requests_total', outcome='ok' if all(answer is not None for answer in answers) else 'partial')
+    return [validate_llm_output([answer])[0] if answer is not None else None for answer in answers]
 
 
 def fallback_processing(items: List[Dict]) -> List[Dict]:
@@ -483,30 +810,23 @@ def render_markdown_digest(grouped_items: Dict[str, List[Dict]]) -> str:
                     markdown += f"- {bullet}\n"
                 markdown += "\n"
 
-                # Source link
+                # Source link, plus other outlets carrying the same story
                 markdown += f"[Source]({item['link']})\n\n"
+                if item.get('alternates'):
+                    also = ', '.join(f"[{alt['source']}]({alt['link']})" for alt in item['alternates'])
+                    markdown += f"Also reported by: {also}\n\n"
                 markdown += "---\n\n"
 
     return markdown
 
 
-def save_audit_file(raw_items: List[Dict], processed_items: List[Dict]) -> str:
-    """Save audit JSON file with raw and processed data"""
-    today = datetime.now().strftime("%Y-%m-%d")
-    audit_filename = f"run_{today}.json"
-
-    audit_data = {
-        "date": today,
-        "total_raw_items": len(raw_items),
-        "total_processed_items": len(processed_items),
-        "raw_items": raw_items,
-        "llm_output": processed_items
-    }
-
-    with open(audit_filename, 'w', encoding='utf-8') as f:
-        json.dump(audit_data, f, indent=2, ensure_ascii=False)
-
-    return audit_filename
+def save_audit_file(raw_items: List[Dict], processed_items: List[Dict], audit_log: AuditLog) -> str:
+    """Append this run's raw and processed items to the compressed audit log; returns the segment file written"""
+    with metrics.timer(stage='audit_write'):
+        entry = audit_log.append(raw_items, processed_items)
+    logging.info(f"Audit cycle {entry['cycle']}: {len(raw_items)} raw, {len(processed_items)} processed items, "
+                 f"{entry['length'] / 1024:.1f} KB compressed")
+    return entry['segment']
 
 
 def main():
@@ -519,7 +839,7 @@ def main():
     print(f"Max items limit: {config['max_items']}")
 
     # Fetch RSS items
-    raw_items, feed_summary = fetch_rss_items(config['feeds'], config['max_items'])
+    raw_items, feed_summary = fetch_rss_items(config['feeds'], config['max_items'], config)
     print(f"Total items fetched: {len(raw_items)}")
 
     # Print feed summary
@@ -543,35 +863,38 @@ def main():
             f.write(empty_digest)
         print("✅ Empty digest.md created")
 
-        # Save empty audit file
-        audit_filename = save_audit_file([], [])
+        # Record the empty run in the audit log
+        audit_filename = save_audit_file([], [], audit_log_from_config(config))
         print(f"✅ {audit_filename} saved")
         return
 
     # Deduplicate
     deduped_items = deduplicate_items(raw_items)
     print(f"Items after deduplication: {len(deduped_items)}")
+    if config.get('near_dedup', True):
+        deduped_items = collapse_near_duplicates(deduped_items, config.get('near_dup_threshold', 0.25))
+        print(f"Stories after near-duplicate grouping: {len(deduped_items)}")
 
     # Simple cache check
-    cache = SimpleCache('cache.json', max_age_hours=24)
+    # Cache entries live as long as the recency window so no item is re-sent to the LLM
+    cache = cache_from_config(config)
     cache.clean_expired()
 
-    cached_items = cache.get_cached(deduped_items)
-    uncached_items = cache.filter_uncached(deduped_items)
+    cached_items, uncached_items = cache.partition(deduped_items)
 
     print(f"📊 Cache stats: {len(cached_items)} cached, {len(uncached_items)} need processing")
 
     # Only process uncached items
     if uncached_items:
-        processed_new = process_with_llm(uncached_items, config)
-        cache.update(uncached_items, processed_new)
+        content_cache = content_cache_from_config(config, PROMPT_VERSION) if config.get('content_cache', True) else None
+        processed_new = process_uncached_items(uncached_items, config, cache, content_cache)
         print(f"LLM processing complete: {len(processed_new)} items processed")
     else:
         processed_new = []
         print("All items found in cache, skipping LLM processing")
 
     # Combine cached + newly processed
-    processed_items = cached_items + processed_new
+    processed_items = attach_alternates(cached_items + processed_new, deduped_items)
     print(f"Total articles available: {len(processed_items)}")
 
     # Process items if available
@@ -600,8 +923,8 @@ def main():
             f.write(markdown_content)
         print("✅ digest.md saved")
 
-        # Save audit file
-        audit_filename = save_audit_file(raw_items, processed_items)
+        # Append the run to the audit log
+        audit_filename = save_audit_file(raw_items, processed_items, audit_log_from_config(config))
         print(f"✅ {audit_filename} saved")
 
         print(f"\n🎉 Processing complete! Generated digest with {len(processed_items)} stories across {len(grouped_items)} categories.")
@@ -0,0 +1,249 @@
+"""Append-only compressed JSONL audit log of every cycle's raw and processed items, with rotation and an offset index"""
+import argparse
+import glob
+import gzip
+import json
+import logging
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+
+def _compact(record: Dict) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+
+class AuditLog:
+    """Cycles appended to rotating segment files, each cycle one independent compressed block.
+
+    A segment audit-<time>.jsonl.gz is a series of gzip members (zstd frames
+    for .zst), one per cycle, so it is also a valid gzip/zstd stream: zcat
+    or zstdcat shows it all. Each cycle decompresses to one JSON line per record:
+      {"type": "cycle", "cycle": 12, "time": ..., "raw_items": 40, "processed_items": 38}
+      {"type": "raw", "item": {...}}        one per raw item
+      {"type": "processed", "item": {...}}  one per processed item
+    Next to each segment, <segment>.idx holds one JSON line per cycle with its
+    offset and length, so read_cycle() seeks to one block and decompresses
+    only that. Appending writes only the new block and index line.
+
+    A new segment starts when the current one reaches max_bytes or, with
+    rotate='daily' / 'hourly', when the day / hour changes. Only the newest
+    keep segments are kept.
+    """
+
+    def __init__(self, directory: str = 'audit', compression: str = 'gzip', max_bytes: int = 64 * 2 ** 20,
+                 rotate: str = 'daily', keep: int = 30):
+        if compression == 'zstd' and zstandard is None:
+            logging.warning("AUDIT_COMPRESSION=zstd needs the zstandard package; writing gzip instead")
+            compression = 'gzip'
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown audit compression {compression!r}")
+        self.directory = directory
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.rotate = rotate
+        self.keep = max(1, keep)
+
+        # Continue the newest segment (repaired on the first append; readers never modify files)
+        self.segment = None
+        self._repaired = False
+        self.next_cycle = 1
+        segments = self.segments()
+        for segment in reversed(segments):
+            index = self._index(segment)
+            if index:
+                self.next_cycle = index[-1]['cycle'] + 1
+                break
+        if segments and segments[-1].endswith(EXTENSIONS[compression]):
+            self.segment = segments[-1]
+
+    def segments(self) -> List[str]:
+        """Segment files, oldest first"""
+        paths = glob.glob(os.path.join(self.directory, 'audit-*.jsonl.gz'))
+        paths += glob.glob(os.path.join(self.directory, 'audit-*.jsonl.zst'))
+        return sorted(paths, key=os.path.basename)
+
+    @staticmethod
+    def _index(segment: str) -> List[Dict]:
+        entries = []
+        try:
+            with open(f"{segment}.idx", 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # torn last line
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _repair(self, segment: str):
+        """Drop a torn index line and cut off a block written after the last indexed cycle (a crash mid-append)"""
+        index = self._index(segment)
+        lines = ''.join(_compact(entry) + '\n' for entry in index)
+        if os.path.exists(f"{segment}.idx"):
+            with open(f"{segment}.idx", 'r', encoding='utf-8') as f:
+                torn = f.read() != lines
+            if torn:
+                logging.warning(f"Rewriting the torn index of {segment}")
+                with open(f"{segment}.idx", 'w', encoding='utf-8') as f:
+                    f.write(lines)
+        end = index[-1]['offset'] + index[-1]['length'] if index else 0
+        if os.path.getsize(segment) > end:
+            logging.warning(f"Truncating {os.path.getsize(segment) - end} unindexed bytes from {segment}")
+            with open(segment, 'r+b') as f:
+                f.truncate(end)
+
+    def _period(self, moment: datetime) -> str:
+        if self.rotate == 'hourly':
+            return moment.strftime('%Y%m%d%H')
+        if self.rotate == 'daily':
+            return moment.strftime('%Y%m%d')
+        return ''
+
+    def _segment_for(self, moment: datetime) -> str:
+        """The current segment, or a new one when it is full or its period has passed"""
+        if self.segment is not None and not self._repaired:
+            self._repair(self.segment)
+            self._repaired = True
+        if self.segment is not None:
+            started = datetime.strptime(os.path.basename(self.segment)[6:21], '%Y%m%d-%H%M%S')
+            if os.path.getsize(self.segment) < self.max_bytes and self._period(started) == self._period(moment):
+                return self.segment
+
+        os.makedirs(self.directory, exist_ok=True)
+        name = f"audit-{moment.strftime('%Y%m%d-%H%M%S')}-{self.next_cycle:08d}{EXTENSIONS[self.compression]}"
+        self.segment = os.path.join(self.directory, name)
+        self._prune()
+        return self.segment
+
+    def _prune(self):
+        """Delete all but the newest keep segments (the one about to be created counts)"""
+        segments = self.segments()
+        for segment in segments[:max(0, len(segments) - (self.keep - 1))]:
+            for path in (segment, f"{segment}.idx"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def append(self, raw_items: List[Dict], processed_items: List[Dict], extra: Dict = None) -> Dict:
+        """Write one cycle; returns its index entry (with the segment path)"""
+        moment = datetime.now()
+        cycle = self.next_cycle
+        header = {
+            'type': 'cycle',
+            'cycle': cycle,
+            'time': moment.isoformat(),
+            'raw_items': len(raw_items),
+            'processed_items': len(processed_items),
+            **(extra or {})
+        }
+        lines = [_compact(header)]
+        lines.extend(_compact({'type': 'raw', 'item': item}) for item in raw_items)
+        lines.extend(_compact({'type': 'processed', 'item': item}) for item in processed_items)
+        block = self._compress(('\n'.join(lines) + '\n').encode('utf-8'))
+
+        segment = self._segment_for(moment)
+        with open(segment, 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(block)
+        entry = {
+            'cycle': cycle,
+            'time': header['time'],
+            'offset': offset,
+            'length': len(block),
+            'raw_items': len(raw_items),
+            'processed_items': len(processed_items)
+        }
+        # The index line goes last: an indexed cycle is always complete on disk
+        with open(f"{segment}.idx", 'a', encoding='utf-8') as f:
+            f.write(_compact(entry) + '\n')
+        self.next_cycle = cycle + 1
+        return {**entry, 'segment': segment}
+
+    def cycles(self) -> List[Dict]:
+        """Index entries of every cycle still on disk, oldest first, with their segment"""
+        return [
+            {**entry, 'segment': segment}
+            for segment in self.segments() for entry in self._index(segment)
+        ]
+
+    def read_cycle(self, cycle: int) -> Optional[Dict]:
+        """{'cycle': header, 'raw_items': [...], 'processed_items': [...]} for one cycle, or None if rotated away"""
+        for segment in reversed(self.segments()):
+            for entry in self._index(segment):
+                if entry['cycle'] == cycle:
+                    return self._read_block(segment, entry)
+        return None
+
+    @staticmethod
+    def _read_block(segment: str, entry: Dict) -> Dict:
+        with open(segment, 'rb') as f:
+            f.seek(entry['offset'])
+            block = f.read(entry['length'])
+        if segment.endswith(EXTENSIONS['zstd']):
+            if zstandard is None:
+                raise RuntimeError(f"Reading {segment} needs the zstandard package")
+            data = zstandard.ZstdDecompressor().decompress(block)
+        else:
+            data = gzip.decompress(block)
+
+        result = {'cycle': None, 'raw_items': [], 'processed_items': []}
+        for line in data.decode('utf-8').splitlines():
+            record = json.loads(line)
+            if record['type'] == 'cycle':
+                result['cycle'] = record
+            else:
+                result[f"{record['type']}_items"].append(record['item'])
+        return result
+
+
+def audit_log_from_config(config: Dict) -> AuditLog:
+    return AuditLog(
+        config.get('audit_dir', 'audit'),
+        compression=config.get('audit_compression', 'gzip'),
+        max_bytes=config.get('audit_max_bytes', 64 * 2 ** 20),
+        rotate=config.get('audit_rotate', 'daily'),
+        keep=config.get('audit_keep', 30)
+    )
+
+
+def main():
+    """List the logged cycles, or print one as JSON"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--dir', default=os.getenv('AUDIT_DIR', 'audit'))
+    parser.add_argument('cycle', nargs='?', type=int, help='cycle to print (default: list all)')
+    args = parser.parse_args()
+
+    log = AuditLog(args.dir)
+    if args.cycle is None:
+        for entry in log.cycles():
+            print(f"{entry['cycle']:>8}  {entry['time']}  {entry['raw_items']:>5} raw  "
+                  f"{entry['processed_items']:>5} processed  {os.path.basename(entry['segment'])}")
+        return
+    cycle = log.read_cycle(args.cycle)
+    if cycle is None:
+        sys.exit(f"Cycle {args.cycle} is not in {args.dir}/ (rotated away?)")
+    json.dump(cycle, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
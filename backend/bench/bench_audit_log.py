@@ -0,0 +1,100 @@
+"""Audit writes over a day of cycles: rewriting run_<date>.json vs appending to the compressed audit log.
+
+Simulates --cycles service cycles (288 = one day at the 5-minute refresh) of
+--items raw and processed items each, built from the fixture article texts:
+  rewrite   pretty-printed run_<date>.json rewritten every cycle (the old behaviour; keeps only the last cycle)
+  append    one compressed block per cycle appended to the audit log, plus its index line
+Reports the write time of the first and last cycles, bytes on disk, and the
+time to read back one cycle through the index vs decompressing the whole day.
+
+Run from backend/:  python -m bench.bench_audit_log --cycles 288 --items 50
+"""
+import argparse
+import gzip
+import json
+import shutil
+import tempfile
+import time
+
+from audit_log import AuditLog
+from bench.synthetic import load_text_pool
+
+
+def make_cycle(pool, cycle: int, count: int):
+    raw = [
+        {**pool[(cycle * count + i) % len(pool)], 'link': f"https://example.com/{cycle}/{i}", 'source': f"Feed {i % 8}",
+         'published': '2024-01-01T00:00:00', 'published_ts': 1704067200.0 + cycle * 300}
+        for i in range(count)
+    ]
+    processed = [
+        {**item, 'one_liner': item['title'], 'bullets': [item['summary'][:160]], 'labels': ['markets'],
+         'auto_tags': {'companies': [], 'sectors': ['Finance'], 'financial_terms': [], 'entities': []}}
+        for item in raw
+    ]
+    return raw, processed
+
+
+def rewrite(path: str, raw, processed):
+    """save_audit_file as it was"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'date': '2024-01-01',
+            'total_raw_items': len(raw),
+            'total_processed_items': len(processed),
+            'raw_items': raw,
+            'llm_output': processed
+        }, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=288)
+    parser.add_argument('--items', type=int, default=50)
+    args = parser.parse_args()
+
+    pool = load_text_pool()
+    cycles = [make_cycle(pool, cycle, args.items) for cycle in range(args.cycles)]
+    workdir = tempfile.mkdtemp(prefix='audit-')
+    try:
+        old_file = f"{workdir}/run_2024-01-01.json"
+        old_times = []
+        for raw, processed in cycles:
+            start = time.perf_counter()
+            rewrite(old_file, raw, processed)
+            old_times.append(time.perf_counter() - start)
+        with open(old_file, 'rb') as f:
+            old_bytes = len(f.read())
+
+        log = AuditLog(f"{workdir}/audit", rotate='none', max_bytes=2 ** 40)
+        new_times = []
+        for raw, processed in cycles:
+            start = time.perf_counter()
+            entry = log.append(raw, processed)
+            new_times.append(time.perf_counter() - start)
+        segment = entry['segment']
+        with open(segment, 'rb') as f:
+            new_bytes = len(f.read())
+
+        middle = args.cycles // 2 + 1
+        start = time.perf_counter()
+        one = log.read_cycle(middle)
+        indexed = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(segment, 'rb') as f:
+            lines = gzip.decompress(f.read()).splitlines()
+        whole = time.perf_counter() - start
+        assert len(one['raw_items']) == args.items and one['cycle']['cycle'] == middle
+
+        print(f"{args.cycles} cycles x {args.items} raw + {args.items} processed items")
+        print(f"  rewrite: first {old_times[0] * 1000:6.1f} ms, last {old_times[-1] * 1000:6.1f} ms, "
+              f"total {sum(old_times):6.2f}s, {old_bytes / 2 ** 20:6.2f} MB on disk holding 1 cycle")
+        print(f"   append: first {new_times[0] * 1000:6.1f} ms, last {new_times[-1] * 1000:6.1f} ms, "
+              f"total {sum(new_times):6.2f}s, {new_bytes / 2 ** 20:6.2f} MB on disk holding {args.cycles} cycles")
+        print(f"  read cycle {middle}: {indexed * 1000:.1f} ms through the index, "
+              f"{whole * 1000:.1f} ms to decompress the whole segment ({len(lines)} lines)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Check the tiered clean_text against the BeautifulSoup original and time each tier.
+
+Run from backend/:  python -m bench.bench_clean_text --repeat 20
+"""
+import argparse
+import re
+import time
+import warnings
+
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+
+from bench.synthetic import load_fixture_texts
+from text_cleaner import clean_text, strip_simple_html
+
+
+def reference_clean_text(text: str) -> str:
+    """clean_text as it was before the tiered cleaner"""
+    if not text:
+        return ""
+    soup = BeautifulSoup(text, 'html.parser')
+    return re.sub(r'\s+', ' ', soup.get_text()).strip()
+
+
+def tier_of(text: str) -> str:
+    if '<' not in text and '&' not in text:
+        return 'plain'
+    if strip_simple_html(text) is not None:
+        return 'simple'
+    return 'soup'
+
+
+def items_per_sec(func, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    return len(texts) * repeat / elapsed if elapsed else float('inf')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    warnings.filterwarnings('ignore', category=MarkupResemblesLocatorWarning)
+    texts = [text for text in load_fixture_texts() if text]
+
+    mismatches = [text for text in texts if clean_text(text) != reference_clean_text(text)]
+    print(f"{len(texts)} recorded titles/summaries, {len(mismatches)} differ from the BeautifulSoup output")
+    for text in mismatches[:5]:
+        print(f"  {text[:100]!r}")
+
+    by_tier = {}
+    for text in texts:
+        by_tier.setdefault(tier_of(text), []).append(text)
+
+    for tier in ('plain', 'simple', 'soup'):
+        tier_texts = by_tier.get(tier, [])
+        if not tier_texts:
+            print(f"{tier:>7}: no inputs")
+            continue
+        before = items_per_sec(reference_clean_text, tier_texts, args.repeat)
+        after = items_per_sec(clean_text, tier_texts, args.repeat)
+        print(f"{tier:>7}: {len(tier_texts):4d} inputs, {before:10.0f} -> {after:10.0f} items/sec ({after / before:.1f}x)")
+
+    before = items_per_sec(reference_clean_text, texts, args.repeat)
+    after = items_per_sec(clean_text, texts, args.repeat)
+    print(f"{'all':>7}: {len(texts):4d} inputs, {before:10.0f} -> {after:10.0f} items/sec ({after / before:.1f}x)")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
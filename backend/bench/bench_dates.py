@@ -0,0 +1,83 @@
+"""Benchmark entry date normalization against the previous double dateutil parse.
+
+Builds N entries from the recorded fixtures (keeping their date formats and
+the repetition of timestamps within a feed) and checks the new path returns
+the same ISO strings and recency decisions.
+
+Run from backend/:  python -m bench.bench_dates --entries 10000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from dateutil import parser as date_parser
+
+from bench.synthetic import load_fixture_feeds
+from date_utils import get_entry_date, is_recent_timestamp, parse_date
+
+
+def previous_get_published_date(entry) -> str:
+    for field in ['published', 'updated', 'created']:
+        date_str = getattr(entry, field, None)
+        if date_str:
+            try:
+                return date_parser.parse(date_str).isoformat()
+            except:
+                continue
+    return datetime.now().isoformat()
+
+
+def previous_is_recent_article(published_date: str, hours: int) -> bool:
+    try:
+        article_date = date_parser.parse(published_date)
+        cutoff_date = datetime.now(article_date.tzinfo) - timedelta(hours=hours)
+        return article_date >= cutoff_date
+    except:
+        return True
+
+
+def load_entries(count: int, seed: int = 0) -> list:
+    entries = [entry for parsed_feed in load_fixture_feeds().values() for entry in parsed_feed.entries]
+    rng = random.Random(seed)
+    return [rng.choice(entries) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10000)
+    # Fixture dates are from October 2025; a wide window keeps both branches exercised
+    parser.add_argument('--hours', type=int, default=24 * 400)
+    args = parser.parse_args()
+
+    entries = load_entries(args.entries)
+
+    start = time.perf_counter()
+    before = []
+    for entry in entries:
+        published = previous_get_published_date(entry)
+        before.append((published, previous_is_recent_article(published, args.hours)))
+    before_seconds = time.perf_counter() - start
+
+    parse_date.cache_clear()
+    start = time.perf_counter()
+    after = []
+    for entry in entries:
+        published_ts, published = get_entry_date(entry)
+        after.append((published, is_recent_timestamp(published_ts, args.hours)))
+    after_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for old, new in zip(before, after) if old != new)
+    cache_info = parse_date.cache_info()
+    print(f"{len(entries)} entries, {mismatches} differ from the previous ISO/recency result")
+    print(f"previous: {before_seconds:.3f}s ({len(entries) / before_seconds:,.0f} entries/sec)")
+    print(f"     new: {after_seconds:.3f}s ({len(entries) / after_seconds:,.0f} entries/sec), "
+          f"{before_seconds / after_seconds:.0f}x faster")
+    print(f"memo cache: {cache_info.hits} hits, {cache_info.misses} misses")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Payload size and serialization time: pretty-printed digest vs pre-compressed artifacts.
+
+Uses latest_digest.json, optionally repeated --scale times with distinct
+links to model a larger digest. Reports:
+- bytes on the wire for the full digest and the average category slice,
+  pretty-printed (what /api/news reads today), minified, gzip and brotli;
+- per-cycle write time of today's json.dump(indent=2) vs DigestArtifacts.write;
+- per-request cost of today's path (read + parse + re-serialize, as the
+  Express routes do) vs sending the stored bytes.
+
+Run from backend/:  python -m bench.bench_digest_artifacts --scale 5
+"""
+import argparse
+import copy
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from bench.synthetic import BACKEND_DIR
+from digest_artifacts import DigestArtifacts, brotli
+
+
+def scaled_digest(digest, scale: int):
+    if scale <= 1:
+        return digest
+    scaled = copy.deepcopy(digest)
+    for name, articles in digest.get('categories', {}).items():
+        scaled['categories'][name] = [
+            {**item, 'link': f"{item.get('link', '')}?copy={copy_index}"} if copy_index else item
+            for copy_index in range(scale) for item in articles
+        ]
+    scaled['total_items'] = sum(len(articles) for articles in scaled['categories'].values())
+    return scaled
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=1, help='repeat every article this many times')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs; the best is reported')
+    parser.add_argument('--requests', type=int, default=200, help='requests per serving measurement')
+    args = parser.parse_args()
+
+    with open(os.path.join(BACKEND_DIR, 'latest_digest.json'), 'r', encoding='utf-8') as f:
+        digest = scaled_digest({**json.load(f), 'version': 1}, args.scale)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        pretty_path = os.path.join(workdir, 'latest_digest.json')
+
+        def write_pretty():
+            with open(pretty_path, 'w', encoding='utf-8') as f:
+                json.dump(digest, f, indent=2, ensure_ascii=False)
+
+        artifacts_dir = os.path.join(workdir, 'digest')
+
+        def write_artifacts():
+            # A fresh directory each run, so no file is skipped as already written
+            shutil.rmtree(artifacts_dir, ignore_errors=True)
+            return DigestArtifacts(artifacts_dir).write(digest)
+
+        pretty_seconds = best_of(write_pretty, args.repeat)
+        artifacts_seconds = best_of(write_artifacts, args.repeat)
+        manifest = write_artifacts()
+        pretty_size = os.path.getsize(pretty_path)
+
+        def serve_current():
+            for _ in range(args.requests):
+                with open(pretty_path, 'r', encoding='utf-8') as f:
+                    json.dumps({'success': True, 'data': json.load(f)}).encode('utf-8')
+
+        best_file = os.path.join(artifacts_dir, manifest['digest']['encodings'].get(
+            'br', manifest['digest']['encodings']['gzip'])['file'])
+
+        def serve_artifact():
+            for _ in range(args.requests):
+                with open(best_file, 'rb') as f:
+                    f.read()
+
+        current_request = best_of(serve_current, args.repeat) / args.requests
+        artifact_request = best_of(serve_artifact, args.repeat) / args.requests
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"Digest: {digest['total_items']} articles in {len(digest['categories'])} categories"
+          + ("" if brotli else "  (brotli not installed: br variants skipped)"))
+    print(f"{'variant':<12}{'full digest':>14}{'avg category':>14}")
+    print(f"{'pretty':<12}{pretty_size:>12,} B{'-':>14}")
+    slices = list(manifest['categories'].values())
+    for encoding, label in (('identity', 'minified'), ('gzip', 'gzip'), ('br', 'brotli')):
+        if encoding not in manifest['digest']['encodings']:
+            continue
+        full = manifest['digest']['encodings'][encoding]['length']
+        per_category = sum(s['encodings'][encoding]['length'] for s in slices) // max(1, len(slices))
+        print(f"{label:<12}{full:>12,} B{per_category:>12,} B  ({full / pretty_size:.1%} of pretty)")
+
+    print(f"Per cycle:   json.dump(indent=2) {pretty_seconds * 1000:.1f} ms, "
+          f"all artifacts (digest + {len(slices)} slices, every encoding) {artifacts_seconds * 1000:.1f} ms")
+    print(f"Per request: read + parse + serialize {current_request * 1000:.3f} ms, "
+          f"read stored bytes {artifact_request * 1000:.3f} ms ({current_request / artifact_request:.0f}x); "
+          f"a matching ETag sends nothing")
+
+
+if __name__ == "__main__":
+    main()
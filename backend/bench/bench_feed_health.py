@@ -0,0 +1,96 @@
+"""Cycle time with dead and spiky feeds: no breaker vs circuit breaker vs breaker + hedged requests.
+
+Against the local feed server: after the first cycle some feeds start
+hanging (longer than the fetch timeout) and some start answering 503, and
+every request has a small chance of a latency spike. Each scenario runs
+--cycles fetch cycles from fresh state; the first --warmup cycles let the
+breakers open and the latency history fill, and the rest are reported:
+median and worst cycle time, and the items still delivered for the broken
+feeds (their last good items, while the breaker is open).
+
+Run from backend/:  python -m bench.bench_feed_health --feeds 60 --mode thread
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from app import fetch_rss_items
+from bench.feed_server import FeedServer
+
+SCENARIOS = {
+    'no breaker': {'feed_breaker': False, 'hedge_requests': False},
+    'breaker': {'feed_breaker': True, 'hedge_requests': False},
+    'breaker + hedging': {'feed_breaker': True, 'hedge_requests': True},
+}
+
+
+def run_scenario(name: str, args) -> dict:
+    server = FeedServer(args.feeds, args.items, args.latency, spike_rate=args.spike_rate,
+                        spike_latency=args.spike_latency, seed=args.seed).start()
+    broken = set(range(args.dead + args.failing))
+    try:
+        feeds = server.feeds()
+        with tempfile.TemporaryDirectory() as state_dir:
+            config = {
+                'fetch_mode': args.mode,
+                'fetch_timeout': args.timeout,
+                'feed_state_file': os.path.join(state_dir, 'feed_state.json'),
+                'entry_ledger_file': os.path.join(state_dir, 'entry_ledger.json'),
+                'feed_health_file': os.path.join(state_dir, 'feed_health.json'),
+                'recency_hours': 24 * 365,
+                **SCENARIOS[name]
+            }
+            cycles, broken_items = [], []
+            for cycle in range(args.cycles):
+                if cycle == 1:
+                    server.slow_feeds.update({i: args.timeout * 10 for i in range(args.dead)})
+                    server.failing_feeds.update(range(args.dead, args.dead + args.failing))
+                start = time.perf_counter()
+                _, feed_summary = fetch_rss_items(feeds, args.feeds * args.items, config)
+                elapsed = time.perf_counter() - start
+                if cycle >= args.warmup:
+                    cycles.append(elapsed)
+                    broken_names = {f"Feed {i}" for i in broken}
+                    broken_items.append(sum(feed_info['items_ok'] for feed_info in feed_summary
+                                            if feed_info['name'] in broken_names))
+    finally:
+        server.stop()
+    return {
+        'median': statistics.median(cycles),
+        'worst': max(cycles),
+        'broken_items': statistics.mean(broken_items),
+        'requests': server.requests
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=60)
+    parser.add_argument('--items', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--dead', type=int, default=2, help='feeds that start hanging after the first cycle')
+    parser.add_argument('--failing', type=int, default=2, help='feeds that start answering 503 after the first cycle')
+    parser.add_argument('--spike-rate', type=float, default=0.03)
+    parser.add_argument('--spike-latency', type=float, default=1.5)
+    parser.add_argument('--timeout', type=int, default=2, help='FETCH_TIMEOUT for the run')
+    parser.add_argument('--cycles', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--mode', default='thread', choices=['thread', 'async'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.CRITICAL)
+    print(f"{args.feeds} feeds ({args.dead} hanging, {args.failing} failing), "
+          f"{args.spike_rate:.0%} of requests spike to {args.spike_latency}s, {args.mode} mode, "
+          f"cycles {args.warmup + 1}-{args.cycles} of {args.cycles}")
+    for name in SCENARIOS:
+        result = run_scenario(name, args)
+        print(f"{name:<18} cycle median {result['median']:.2f}s, worst {result['worst']:.2f}s, "
+              f"{result['broken_items']:.0f} items from broken feeds, {result['requests']} requests")
+
+
+if __name__ == "__main__":
+    main()
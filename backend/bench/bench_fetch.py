@@ -0,0 +1,64 @@
+"""Compare thread and async fetch modes against the local feed server.
+
+Each mode runs twice: a cold run with no feed state and a warm run where
+conditional GET lets every feed come back 304.
+
+Run from backend/:  python -m bench.bench_fetch --feeds 300 --latency 0.2
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from app import fetch_rss_items
+from bench.feed_server import FeedServer
+
+
+def run_mode(feeds, mode: str, max_items: int, state_dir: str) -> dict:
+    config = {
+        'fetch_mode': mode,
+        'feed_state_file': os.path.join(state_dir, 'feed_state.json'),
+        'entry_ledger_file': os.path.join(state_dir, 'entry_ledger.json'),
+        'feed_health_file': os.path.join(state_dir, 'feed_health.json')
+    }
+    start = time.perf_counter()
+    items, feed_summary = fetch_rss_items(feeds, max_items, config)
+    elapsed = time.perf_counter() - start
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'feeds_ok': sum(1 for feed_info in feed_summary if feed_info['status'] == 'success'),
+        'not_modified': sum(1 for feed_info in feed_summary if feed_info['not_modified']),
+        'bytes_saved': sum(feed_info['bytes_saved'] for feed_info in feed_summary),
+        'feeds_per_sec': len(feeds) / elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=200)
+    parser.add_argument('--items', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.2)
+    parser.add_argument('--modes', default='thread,async')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    server = FeedServer(args.feeds, args.items, args.latency).start()
+    try:
+        feeds = server.feeds()
+        for mode in args.modes.split(','):
+            with tempfile.TemporaryDirectory() as state_dir:
+                for run in ('cold', 'warm'):
+                    result = run_mode(feeds, mode, args.feeds * args.items, state_dir)
+                    print(f"{result['mode']:>6} {run}: {result['seconds']:.2f}s, "
+                          f"{result['feeds_ok']}/{len(feeds)} feeds ok, "
+                          f"{result['not_modified']} not modified, "
+                          f"{result['bytes_saved'] / 1024:.0f} KB saved, "
+                          f"{result['feeds_per_sec']:.1f} feeds/sec")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
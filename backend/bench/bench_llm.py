@@ -0,0 +1,56 @@
+"""Benchmark process_with_llm at several concurrency levels against the fake OpenAI server.
+
+Run from backend/:  python -m bench.bench_llm --items 100 --latency 2 --concurrency 1,4,16
+With --drop-rate the server omits that fraction of answers, exercising the
+per-item follow-up requests and the fallback for items that keep failing.
+"""
+import argparse
+import logging
+import time
+
+from app import process_with_llm
+from bench.fake_openai import FakeOpenAIServer
+from bench.synthetic import load_text_pool, make_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=1.0)
+    parser.add_argument('--rpm', type=int, default=0, help='server-side limit that triggers 429s')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='fraction of answers the server omits')
+    parser.add_argument('--concurrency', default='1,4,16')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    items = [dict(entry, source='Bench') for entry in make_entries(load_text_pool(), args.items)]
+
+    server = FakeOpenAIServer(latency=args.latency, rpm=args.rpm, drop_rate=args.drop_rate).start()
+    try:
+        baseline = None
+        for concurrency in [int(level) for level in args.concurrency.split(',')]:
+            config = {
+                'openai_api_key': 'fake',
+                'openai_base_url': server.base_url,
+                'llm_model': 'fake-model',
+                'batch_size': args.batch_size,
+                'llm_concurrency': concurrency
+            }
+            requests_before = server.requests
+            start = time.perf_counter()
+            failed_links = set()
+            processed = process_with_llm(items, config, failed_links)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            in_order = [item['link'] for item in processed] == [item['link'] for item in items]
+            print(f"concurrency {concurrency:>2}: {elapsed:6.2f}s, {len(processed)} items, "
+                  f"{server.requests - requests_before} requests, {len(failed_links)} fell back, "
+                  f"order preserved: {in_order}, "
+                  f"speedup {baseline / elapsed:.1f}x")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Precision/recall and scaling of near-duplicate grouping.
+
+Precision and recall are measured on bench/fixtures/near_duplicates.json:
+cross-source story pairs taken from processed articles and labelled by hand
+(1 = same story, 0 = related but distinct). Scaling is measured on synthetic
+stories built from the cache.json vocabulary, 30% of them with a reworded
+copy under another source, and compared with checking every pair.
+
+Run from backend/:  python -m bench.bench_near_dup --sizes 1000,5000,10000,20000
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+from bench.synthetic import FIXTURES_DIR, load_text_pool
+from near_dedup import features, find_duplicate_groups, jaccard
+
+SOURCES = ['Economic Times', 'Mint', 'The Hindu Business', 'Times of India Business',
+           'CNN News18 Business', 'India Today Business', 'Business Standard', 'NDTV Business']
+
+
+def fixture_scores(threshold: float):
+    """Pairwise precision and recall of the groups found in the labelled fixture"""
+    with open(os.path.join(FIXTURES_DIR, 'near_duplicates.json'), 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+    items = fixture['items']
+    group_of = {}
+    for number, group in enumerate(find_duplicate_groups(items, threshold)):
+        for index in group:
+            group_of[items[index]['link']] = number
+
+    tp = fp = fn = 0
+    for link_a, link_b, same_story in fixture['pairs']:
+        grouped = group_of[link_a] == group_of[link_b]
+        tp += grouped and same_story
+        fp += grouped and not same_story
+        fn += not grouped and same_story
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    return precision, tp / (tp + fn), len(fixture['pairs'])
+
+
+def reword(title: str, rng: random.Random) -> str:
+    """A different outlet's headline for the same story: drop a word, append one"""
+    words = title.split()
+    del words[rng.randrange(len(words))]
+    return ' '.join(words + [rng.choice(['report', 'details', 'check', 'live updates', 'sources'])])
+
+
+def synthetic_items(pool, count: int, duplicate_share: float = 0.3, seed: int = 0):
+    """count distinct stories drawn from the pool's vocabulary, some with reworded copies.
+
+    Words keep their frequency in the pool, so common words ("india",
+    "stocks") are shared between unrelated stories as they are in real feeds.
+    """
+    rng = random.Random(seed)
+    title_words = [word for article in pool for word in article['title'].split()]
+    summary_words = [word for article in pool for word in article['summary'].split()]
+    items = []
+    while len(items) < count:
+        item = {
+            'title': ' '.join(rng.choices(title_words, k=rng.randint(8, 14))),
+            'summary': ' '.join(rng.choices(summary_words, k=30)),
+            'source': rng.choice(SOURCES),
+            'link': f"https://example.com/story/{len(items)}"
+        }
+        items.append(item)
+        if rng.random() < duplicate_share and len(items) < count:
+            items.append(dict(item, title=reword(item['title'], rng), source=rng.choice(SOURCES),
+                              link=f"https://example.com/story/{len(items)}"))
+    return items
+
+
+def all_pairs_seconds(items, threshold: float) -> float:
+    """Time for the obvious alternative: Jaccard of every pair"""
+    start = time.perf_counter()
+    item_features = [features(item) for item in items]
+    for i in range(len(items)):
+        a = item_features[i]
+        for j in range(i):
+            jaccard(a, item_features[j]) >= threshold
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threshold', type=float, default=0.25)
+    parser.add_argument('--sizes', default='1000,5000,10000,20000')
+    parser.add_argument('--all-pairs-max', type=int, default=5000,
+                        help='largest size to also time with the all-pairs comparison')
+    args = parser.parse_args()
+
+    precision, recall, pairs = fixture_scores(args.threshold)
+    print(f"Fixture ({pairs} labelled pairs), threshold {args.threshold}: "
+          f"precision {precision:.2f}, recall {recall:.2f}")
+
+    pool = load_text_pool()
+    for size in [int(size) for size in args.sizes.split(',')]:
+        items = synthetic_items(pool, size)
+        start = time.perf_counter()
+        groups = find_duplicate_groups(items, args.threshold)
+        elapsed = time.perf_counter() - start
+        line = (f"{size:>6} items: {elapsed:6.2f}s ({elapsed / size * 1e6:5.0f} µs/item), "
+                f"{size - len(groups)} copies folded, {len(groups)} stories")
+        if size <= args.all_pairs_max:
+            line += f", all-pairs {all_pairs_seconds(items, args.threshold):6.2f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Feed parsing throughput in the fetch threads vs on a pool of worker processes.
+
+Parses the synthetic feed bodies of the local feed server (no network) from
+a pool of fetch threads, as fetch_rss_items does, once per worker count.
+Also checks that every worker count yields the same items, and compares the
+pickled size of a ParsedFeed with the feedparser result it replaces.
+Scaling needs free cores: on an N-core machine expect up to ~N x.
+
+Run from backend/:  python -m bench.bench_parse_pool --feeds 200 --workers 0,1,2,4,8
+"""
+import argparse
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+
+from bench.synthetic import load_text_pool, make_entries, render_rss
+from feed_parsing import discard_parse_pool, get_parse_pool, parse_feed, parse_feed_content
+
+
+def parse_all(bodies, workers: int, threads: int) -> tuple:
+    pool = get_parse_pool(workers)
+    if pool is not None:
+        # Spawn the workers before timing; the service pays this once at start-up
+        list(pool.map(int, range(workers * 4)))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(
+            lambda name_body: parse_feed(name_body[0], name_body[1], 24 * 365, None, pool), bodies))
+    elapsed = time.perf_counter() - start
+    if pool is not None:
+        discard_parse_pool(pool)
+    return elapsed, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=200)
+    parser.add_argument('--items', type=int, default=40, help='items per feed')
+    parser.add_argument('--workers', default='0,1,2,4', help='0 = parse in the fetch threads')
+    parser.add_argument('--threads', type=int, default=10, help='fetch threads (FETCH_WORKERS)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    pool = load_text_pool()
+    bodies = [(f"Feed {i}", render_rss(f"Feed {i}", make_entries(pool, args.items, seed=i)))
+              for i in range(args.feeds)]
+    print(f"{args.feeds} feeds x {args.items} items, {sum(len(body) for _, body in bodies) / 2 ** 20:.1f} MB, "
+          f"{args.threads} fetch threads, {os.cpu_count()} CPUs")
+
+    name, body = bodies[0]
+    parsed_size = len(pickle.dumps(feedparser.parse(body)))
+    compact_size = len(pickle.dumps(parse_feed_content(name, body, 24 * 365)))
+    print(f"Pickled per feed: feedparser result {parsed_size / 1024:.0f} KB, "
+          f"ParsedFeed {compact_size / 1024:.0f} KB (body {len(body) / 1024:.0f} KB)")
+
+    baseline = reference = None
+    for workers in [int(level) for level in args.workers.split(',')]:
+        threads = max(args.threads, workers)
+        elapsed, results = parse_all(bodies, workers, threads)
+        entries = [parsed.entries for parsed in results]
+        reference = reference or entries
+        baseline = baseline or elapsed
+        label = 'in-thread' if workers == 0 else f"{workers} workers"
+        print(f"{label:>12}: {elapsed:6.2f}s, {args.feeds / elapsed:7.1f} feeds/sec, "
+              f"speedup {baseline / elapsed:.2f}x, same items: {entries == reference}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Compare the staged and streaming service cycles end to end, offline.
+
+Feeds come from the local feed server, one of them much slower than the
+rest (like a publisher stuck in retries); the LLM is the fake OpenAI
+server. Each mode starts with empty caches in its own temporary directory.
+Reports time to the first LLM answer, total cycle time and peak memory.
+
+Run from backend/:  python -m bench.bench_pipeline --feeds 16 --slow-latency 6
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench.fake_openai import FakeOpenAIServer
+from bench.feed_server import FeedServer
+
+
+def run_cycle(mode: str, feeds, llm: FakeOpenAIServer, args) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"pipeline-{mode}-")
+    os.chdir(workdir)
+    # service.py opens service.log and status files in the working directory
+    import service
+    from pipeline import run_streaming_cycle
+
+    config = {
+        'feeds': feeds,
+        'max_items': args.max_items,
+        'fetch_mode': 'async',
+        'openai_api_key': 'fake',
+        'openai_base_url': llm.base_url,
+        'llm_model': 'fake-model',
+        'batch_size': args.batch_size,
+        'llm_concurrency': args.concurrency,
+        'pipeline_linger_seconds': args.linger,
+        'cache_file': os.path.join(workdir, 'cache.json'),
+        'content_cache_file': os.path.join(workdir, 'content_cache.json'),
+        'feed_state_file': os.path.join(workdir, 'feed_state.json'),
+        'entry_ledger_file': os.path.join(workdir, 'entry_ledger.json'),
+        'recency_hours': 24 * 365
+    }
+    service._cache = service._content_cache = service._feed_stores = None
+    cache = service.get_cache(config)
+    content_cache = service.get_content_cache(config)
+
+    answered_before = len(llm.answered_at)
+    tracemalloc.start()
+    start = time.monotonic()
+    if mode == 'streaming':
+        raw_items, processed_items, _ = run_streaming_cycle(config, cache, content_cache)
+    else:
+        raw_items, processed_items, _ = service.run_staged_cycle(config)
+    total = time.monotonic() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    answers = llm.answered_at[answered_before:]
+    return {
+        'mode': mode,
+        'first': answers[0] - start if answers else None,
+        'total': total,
+        'items': len(raw_items),
+        'processed': len(processed_items),
+        'peak_mb': peak / 2 ** 20
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=16)
+    parser.add_argument('--items', type=int, default=20, help='items per feed')
+    parser.add_argument('--latency', type=float, default=0.2, help='feed response time')
+    parser.add_argument('--slow-latency', type=float, default=6.0, help='response time of the slowest feed')
+    parser.add_argument('--llm-latency', type=float, default=1.0)
+    parser.add_argument('--max-items', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--linger', type=float, default=1.0)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    feed_server = FeedServer(args.feeds, args.items, latency=args.latency,
+                             slow_feeds={0: args.slow_latency}).start()
+    llm = FakeOpenAIServer(latency=args.llm_latency).start()
+    try:
+        results = [run_cycle(mode, feed_server.feeds(), llm, args) for mode in ('staged', 'streaming')]
+    finally:
+        os.chdir(cwd)
+        feed_server.stop()
+        llm.stop()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    for result in results:
+        print(f"{result['mode']:>9}: first answer {result['first']:5.2f}s, cycle {result['total']:5.2f}s, "
+              f"{result['items']} items -> {result['processed']} processed, peak {result['peak_mb']:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
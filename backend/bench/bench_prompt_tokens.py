@@ -0,0 +1,78 @@
+"""Compare prompt size per item for the previous and the compact LLM encoding.
+
+The previous prompt sent every item field as indent=2 JSON and asked the
+model to echo title/source/link/published back; the compact one sends short
+IDs with title, summary (truncated) and source only; the instruction text
+is the current template for both, so only the item encoding differs. Uses
+tiktoken when it is installed, otherwise the same ~4 chars/token estimate
+as the batch planner.
+
+Run from backend/:  python -m bench.bench_prompt_tokens --items 200
+"""
+import argparse
+import json
+
+from app import SYSTEM_PROMPT, USER_PROMPT_TEMPLATE, load_config
+from bench.synthetic import load_text_pool, make_entries
+from llm_batching import count_tokens, encode_batch, plan_batches
+
+PREVIOUS_TEMPLATE_TAIL = USER_PROMPT_TEMPLATE.split('{input_json}', 1)[1]
+
+
+def token_counter():
+    """tiktoken's cl100k encoding if available, else the planner's estimate"""
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding('cl100k_base')
+        return (lambda text: len(encoding.encode(text))), 'tiktoken cl100k_base'
+    except Exception:
+        return count_tokens, 'chars/4 estimate'
+
+
+def previous_answer(item):
+    """What the previous prompt asked the model to return per item"""
+    return {
+        'title': item['title'], 'source': item['source'], 'link': item['link'],
+        'published': item['published'], 'one_liner': '', 'bullets': [], 'labels': [],
+        'auto_tags': {}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--batch-size', type=int, default=4)
+    parser.add_argument('--batch-tokens', type=int, default=4000)
+    args = parser.parse_args()
+
+    count, method = token_counter()
+    items = [dict(entry, source='Bench') for entry in make_entries(load_text_pool(), args.items)]
+    summary_chars = load_config().get('llm_summary_chars', 600)
+
+    # Previous: fixed-size batches, all fields pretty-printed, echoed fields in the answer
+    previous_in = previous_out = 0
+    previous_batches = [items[i:i + args.batch_size] for i in range(0, len(items), args.batch_size)]
+    for batch in previous_batches:
+        previous_in += count(SYSTEM_PROMPT) + count(f"INPUT JSON: {json.dumps(batch, indent=2)}{PREVIOUS_TEMPLATE_TAIL}")
+        previous_out += count(json.dumps([previous_answer(item) for item in batch], indent=1))
+
+    # Compact: token-packed batches, ID-keyed minimal fields, ID-only answers
+    compact_in = compact_out = 0
+    compact_batches = plan_batches(items, args.batch_tokens, max_items=args.batch_size, max_summary_chars=summary_chars)
+    for batch in compact_batches:
+        input_json, _ = encode_batch(batch, summary_chars)
+        compact_in += count(SYSTEM_PROMPT) + count(USER_PROMPT_TEMPLATE.format(input_json=input_json))
+        answers = [{'id': str(i), 'one_liner': '', 'bullets': [], 'labels': [], 'auto_tags': {}}
+                   for i in range(len(batch))]
+        compact_out += count(json.dumps({'items': answers}, indent=1))
+
+    print(f"{len(items)} items, token counts via {method}")
+    print(f"{'':10} {'batches':>8} {'in/item':>8} {'echo out/item':>14}")
+    print(f"{'previous':10} {len(previous_batches):>8} {previous_in / len(items):>8.0f} {previous_out / len(items):>14.0f}")
+    print(f"{'compact':10} {len(compact_batches):>8} {compact_in / len(items):>8.0f} {compact_out / len(items):>14.0f}")
+    print(f"input tokens saved: {1 - compact_in / previous_in:.0%}, "
+          f"answer overhead saved: {1 - compact_out / previous_out:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""Requests per day and article freshness: fixed 5-minute polling vs the adaptive scheduler.
+
+Simulated clock, no network. Each feed publishes as a Poisson process at the
+median gap measured in its recorded fixture (bench/fixtures), at full rate
+from 08:00 to 22:00 and at --night-rate of it overnight, and shows its newest
+40 items. A poll is "not modified" when the feed has nothing new. Reported
+over the days after a one-day warm-up: requests per day, mean and 95th
+percentile delay from publication to the first poll that sees the article,
+and digest rebuilds (polls that brought at least one new article).
+
+Run from backend/:  python -m bench.bench_scheduler --days 3
+"""
+import argparse
+import bisect
+import random
+import statistics
+
+from bench.synthetic import load_fixture_feeds
+from date_utils import get_entry_date
+from scheduler import FeedScheduler, publishing_gap
+
+DAY = 86400
+FEED_WINDOW = 40
+FIXED_INTERVAL = 300
+
+
+def fixture_gaps():
+    """Feed name -> median seconds between items in its recorded fixture"""
+    gaps = {}
+    for name, parsed_feed in load_fixture_feeds().items():
+        items = [{'published_ts': get_entry_date(entry)[0]} for entry in parsed_feed.entries]
+        gaps[name] = publishing_gap(items)
+    return gaps
+
+
+def publish_times(gap: float, seconds: float, night_rate: float, rng: random.Random):
+    """Poisson publication times over the run, thinned overnight"""
+    times = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(1 / gap)
+        if t >= seconds:
+            return times
+        hour = (t % DAY) / 3600
+        if 8 <= hour < 22 or rng.random() < night_rate:
+            times.append(t)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def poll(times, now, name):
+    """Items the feed shows at now: its newest FEED_WINDOW publications"""
+    end = bisect.bisect_right(times, now)
+    return [{'link': f"https://example.com/{name}/{i}", 'published_ts': times[i]}
+            for i in range(max(0, end - FEED_WINDOW), end)]
+
+
+def record_delays(times, polled_at, seen, delays, warmup):
+    for index in range(len(times)):
+        if index not in seen and times[index] <= polled_at:
+            seen.add(index)
+            if times[index] >= warmup:
+                delays.append(polled_at - times[index])
+
+
+def simulate_fixed(feeds, seconds, warmup):
+    requests = {name: 0 for name in feeds}
+    rebuilds = 0
+    delays = {name: [] for name in feeds}
+    seen = {name: set() for name in feeds}
+    t = 0.0
+    while t < seconds:
+        new = 0
+        for name, times in feeds.items():
+            before = len(seen[name])
+            record_delays(times, t, seen[name], delays[name], warmup)
+            new += len(seen[name]) - before
+            requests[name] += t >= warmup
+        rebuilds += bool(new) and t >= warmup
+        t += FIXED_INTERVAL
+    return requests, rebuilds, delays
+
+
+def simulate_adaptive(feeds, seconds, warmup, min_interval, max_interval):
+    clock = Clock()
+    scheduler = FeedScheduler([{'name': name, 'url': name} for name in feeds], state_file=None,
+                              min_interval=min_interval, max_interval=max_interval,
+                              initial_interval=FIXED_INTERVAL, clock=clock)
+    requests = {name: 0 for name in feeds}
+    rebuilds = 0
+    delays = {name: [] for name in feeds}
+    seen = {name: set() for name in feeds}
+    while True:
+        clock.now = scheduler.next_poll_time()
+        if clock.now >= seconds:
+            break
+        new = 0
+        for feed in scheduler.due_feeds():
+            name = feed['name']
+            before = len(seen[name])
+            record_delays(feeds[name], clock.now, seen[name], delays[name], warmup)
+            unchanged = len(seen[name]) == before
+            new += scheduler.record(name, poll(feeds[name], clock.now, name),
+                                    {'status': 'success', 'not_modified': unchanged})
+            requests[name] += clock.now >= warmup
+        rebuilds += bool(new) and clock.now >= warmup
+    return requests, rebuilds, delays
+
+
+def p95(values):
+    return sorted(values)[int(len(values) * 0.95)] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--days', type=int, default=3, help='simulated days, the first is warm-up')
+    parser.add_argument('--night-rate', type=float, default=0.1, help='overnight share of the daytime rate')
+    parser.add_argument('--min-interval', type=float, default=120)
+    parser.add_argument('--max-interval', type=float, default=3600)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rng = random.Random(args.seed)
+    seconds = args.days * DAY
+    warmup = DAY
+    measured_days = args.days - 1
+    gaps = fixture_gaps()
+    feeds = {name: publish_times(gap, seconds, args.night_rate, rng) for name, gap in gaps.items()}
+
+    fixed_requests, fixed_rebuilds, fixed_delays = simulate_fixed(feeds, seconds, warmup)
+    adaptive_requests, adaptive_rebuilds, adaptive_delays = simulate_adaptive(
+        feeds, seconds, warmup, args.min_interval, args.max_interval)
+
+    print(f"{len(feeds)} feeds, {measured_days} measured days; delay = publication to first poll that sees it")
+    print(f"{'feed':<18}{'gap':>7}{'fixed req/d':>13}{'mean delay':>12}"
+          f"{'adaptive req/d':>16}{'mean delay':>12}{'p95 delay':>11}")
+    for name in feeds:
+        print(f"{name:<18}{gaps[name]:>6.0f}s{fixed_requests[name] / measured_days:>13.0f}"
+              f"{statistics.mean(fixed_delays[name] or [0]):>11.0f}s"
+              f"{adaptive_requests[name] / measured_days:>16.0f}"
+              f"{statistics.mean(adaptive_delays[name] or [0]):>11.0f}s{p95(adaptive_delays[name]):>10.0f}s")
+    fixed_total = sum(fixed_requests.values())
+    adaptive_total = sum(adaptive_requests.values())
+    all_fixed = [d for values in fixed_delays.values() for d in values]
+    all_adaptive = [d for values in adaptive_delays.values() for d in values]
+    print(f"Requests/day:   fixed {fixed_total / measured_days:,.0f}, adaptive {adaptive_total / measured_days:,.0f} "
+          f"({1 - adaptive_total / fixed_total:.0%} fewer)")
+    print(f"Mean delay:     fixed {statistics.mean(all_fixed):.0f}s, adaptive {statistics.mean(all_adaptive):.0f}s; "
+          f"p95 fixed {p95(all_fixed):.0f}s, adaptive {p95(all_adaptive):.0f}s")
+    print(f"Rebuilds/day:   fixed {fixed_rebuilds / measured_days:,.0f}, adaptive {adaptive_rebuilds / measured_days:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
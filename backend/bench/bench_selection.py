@@ -0,0 +1,79 @@
+"""Top-K selection vs flatten-and-truncate: time, cleaning work and dependence on feed completion order.
+
+Parses the synthetic feeds once, then per method and per random completion
+order extracts every feed's items and picks max_items of them:
+  truncate  clean every item, flatten in completion order, keep the first max_items (the old behaviour)
+  top-k     rank raw items by recency and source weight as feeds complete, clean only the selected ones
+Every other feed gets weight 2 as sources.yml allows.
+
+Run from backend/:  python -m bench.bench_selection --feeds 100 --max-items 50
+"""
+import argparse
+import random
+import time
+
+import feedparser
+
+from bench.synthetic import load_text_pool, make_entries, render_rss
+from feed_parsing import RAW_TEXT, extract_entries, finish_items
+from item_selection import TopKSelector
+
+
+def extract(name: str, parsed_feed) -> list:
+    return [item for _, item in extract_entries(name, parsed_feed, 24 * 365).entries if item is not None]
+
+
+def truncate(feeds, parsed, order, max_items):
+    all_items = []
+    for index in order:
+        all_items.extend(finish_items(extract(feeds[index]['name'], parsed[index])))
+    return all_items[:max_items]
+
+
+def top_k(feeds, parsed, order, max_items):
+    selector = TopKSelector(feeds, max_items)
+    for index in order:
+        selector.add(feeds[index]['name'], extract(feeds[index]['name'], parsed[index]))
+    return finish_items(selector.selected())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=100)
+    parser.add_argument('--items', type=int, default=30, help='items per feed')
+    parser.add_argument('--max-items', type=int, default=50)
+    parser.add_argument('--orders', type=int, default=5, help='random completion orders tried')
+    args = parser.parse_args()
+
+    pool = load_text_pool()
+    feeds = [{'name': f"Feed {i}", 'weight': 2.0 if i % 2 else 1.0} for i in range(args.feeds)]
+    parsed = [feedparser.parse(render_rss(feed['name'], make_entries(pool, args.items, seed=i)))
+              for i, feed in enumerate(feeds)]
+    weighted = {feed['name'] for feed in feeds if feed['weight'] > 1}
+    total = sum(len(parsed_feed.entries) for parsed_feed in parsed)
+    print(f"{args.feeds} feeds x {args.items} items = {total}, selecting {args.max_items}")
+
+    for name, method in (('truncate', truncate), ('top-k', top_k)):
+        selections = set()
+        elapsed = 0.0
+        for seed in range(args.orders):
+            order = list(range(args.feeds))
+            random.Random(seed).shuffle(order)
+            start = time.perf_counter()
+            items = method(feeds, parsed, order, args.max_items)
+            elapsed += time.perf_counter() - start
+            selections.add(tuple(item['link'] for item in items))
+            assert not any(RAW_TEXT in item for item in items)
+            if seed == 0:
+                first = items
+        cleaned = total if name == 'truncate' else len(first)
+        newest_hours = (time.time() - max(item['published_ts'] for item in first)) / 3600
+        oldest_hours = (time.time() - min(item['published_ts'] for item in first)) / 3600
+        print(f"{name:>9}: {elapsed / args.orders * 1000:7.1f} ms per run, {cleaned} items cleaned, "
+              f"{len(selections)} distinct selections over {args.orders} completion orders, "
+              f"ages {newest_hours:.1f}-{oldest_hours:.1f}h, "
+              f"{sum(item['source'] in weighted for item in first)} from weight-2 feeds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Sharded service mode: ring balance and movement, then worker throughput and duplicate LLM work, offline.
+
+Ring: how evenly HashRing spreads feeds over N members, and what share of
+feeds moves when a member joins or leaves (ideal: 1/(N+1) and 1/N).
+
+Cycles: N worker processes share one directory, as on one host or on several
+hosts mounting it. Each runs one staged cycle over its slice of the local feed
+server's feeds against the fake OpenAI server, then the coordinator merges
+their outputs into latest_digest.json. Every feed also carries a few shared
+articles, so shards race for the same stories. Reports wall time, LLM
+requests and items (equal to one shard's when no story is processed twice),
+and the digest size. Finally a warm rebalance from the largest N to N+1
+members shows how much LLM work moves with the feeds.
+
+Run from backend/:  python -m bench.bench_sharding --feeds 48 --shards 1,2,4
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bench.fake_openai import FakeOpenAIServer
+from bench.feed_server import FeedServer
+from bench.synthetic import load_text_pool, make_entries, render_rss
+from sharding import HashRing
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bench_ring(feed_count: int, member_counts: list):
+    names = [f"Feed {i}" for i in range(feed_count)]
+    print(f"Ring over {feed_count} feeds:")
+    for count in member_counts:
+        members = [f"shard-{i}" for i in range(count)]
+        ring = HashRing(members)
+        owners = {name: ring.owner(name) for name in names}
+        sizes = [len(feeds) for feeds in ring.assign([{'name': name} for name in names]).values()]
+        grown = HashRing(members + [f"shard-{count}"])
+        moved_join = sum(grown.owner(name) != owners[name] for name in names) / feed_count
+        line = (f"  {count} members: largest slice {max(sizes) / (feed_count / count):.2f}x the mean, "
+                f"join moves {moved_join:.1%} (ideal {1 / (count + 1):.1%})")
+        if count > 1:
+            shrunk = HashRing(members[:-1])
+            moved_leave = sum(shrunk.owner(name) != owners[name] for name in names) / feed_count
+            line += f", leave moves {moved_leave:.1%} (ideal {1 / count:.1%})"
+        print(line)
+
+
+def worker_cycle(workdir: str, env: dict, barrier):
+    """One service cycle as shard SHARD_ID, in a spawned process"""
+    os.chdir(workdir)
+    os.environ.update(env)
+    import service
+    from app import load_config
+    from sharding import shard_from_config
+    logging.getLogger().setLevel(logging.WARNING)
+    service._shard = shard_from_config(load_config())
+    barrier.wait()
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.process_and_save()
+
+
+def run_shards(workdir: str, members: list, env: dict) -> float:
+    """Run one cycle on every member at once; seconds from the common start to the last worker done"""
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(len(members) + 1)
+    processes = [
+        context.Process(target=worker_cycle, args=(workdir, {
+            **env, 'SHARD_ROLE': 'worker', 'SHARD_ID': member, 'SHARD_MEMBERS': ','.join(members)
+        }, barrier))
+        for member in members
+    ]
+    for process in processes:
+        process.start()
+    # Time the cycles, not interpreter start-up
+    barrier.wait()
+    start = time.perf_counter()
+    for process in processes:
+        process.join()
+    return time.perf_counter() - start
+
+
+def coordinate(workdir: str, members: list, env: dict) -> int:
+    """Merge the shard outputs into workdir/latest_digest.json; returns its article count"""
+    os.chdir(workdir)
+    # The workers' MAX_ITEMS too, as the coordinator re-ranks the merged articles
+    os.environ.update({**env, 'SHARD_ROLE': 'coordinator', 'SHARD_MEMBERS': ','.join(members)})
+    import service
+    from app import load_config
+    from sharding import merge_partials, shard_from_config
+    logging.getLogger().setLevel(logging.WARNING)
+    config = load_config()
+    # The audit log opened by the previous run points into that run's directory
+    service._audit_log = None
+    service._shard = shard_from_config(config)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service.publish_cycle(config, *merge_partials(service._shard, config))
+    with open(service.DIGEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f).get('total_items', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ring-feeds', type=int, default=10000)
+    parser.add_argument('--feeds', type=int, default=48)
+    parser.add_argument('--items', type=int, default=20, help='items per feed')
+    parser.add_argument('--shared', type=int, default=5, help='articles carried by every feed')
+    parser.add_argument('--shards', default='1,2,4')
+    parser.add_argument('--llm-latency', type=float, default=0.5)
+    parser.add_argument('--concurrency', type=int, default=2, help='LLM_CONCURRENCY per worker')
+    args = parser.parse_args()
+
+    shard_counts = [int(count) for count in args.shards.split(',')]
+    bench_ring(args.ring_feeds, sorted(set(shard_counts + [8, 16])))
+
+    logging.getLogger().setLevel(logging.WARNING)
+    feeds = FeedServer(args.feeds, args.items, latency=0.05)
+    shared = make_entries(load_text_pool(), args.shared, seed=10 ** 6)
+    for i in feeds.bodies:
+        entries = make_entries(load_text_pool(), args.items, seed=i) + shared
+        random.Random(i).shuffle(entries)
+        feeds.bodies[i] = render_rss(f"Feed {i}", entries)
+    feeds.start()
+    llm = FakeOpenAIServer(latency=args.llm_latency).start()
+    env = {
+        'OPENAI_API_KEY': 'fake',
+        'OPENAI_BASE_URL': llm.base_url,
+        'LLM_MODEL': 'fake-model',
+        'MAX_ITEMS': '1000000',
+        'RECENCY_HOURS': str(24 * 365),
+        'LLM_CONCURRENCY': str(args.concurrency),
+        'LLM_RPM': '100000',
+        'LLM_TPM': '100000000',
+        'FETCH_MODE': 'async',
+        'PIPELINE_MODE': 'staged',
+        'PARSE_WORKERS': '0'
+    }
+    feeds_yaml = json.dumps({'feeds': feeds.feeds()})  # JSON is valid YAML
+
+    print(f"\nCycles: {args.feeds} feeds x {args.items} items + {args.shared} shared, "
+          f"LLM latency {args.llm_latency}s, LLM_CONCURRENCY={args.concurrency} per worker, {os.cpu_count()} CPUs")
+    root = tempfile.mkdtemp(prefix='sharding-')
+    try:
+        baseline = None
+        for count in shard_counts:
+            workdir = os.path.join(root, f"shards_{count}")
+            os.makedirs(workdir)
+            with open(os.path.join(workdir, 'sources.yml'), 'w') as f:
+                f.write(feeds_yaml)
+            members = [f"shard-{i}" for i in range(count)]
+            requests_before, items_before = llm.requests, llm.items
+            seconds = run_shards(workdir, members, env)
+            total = coordinate(workdir, members, env)
+            llm_items = llm.items - items_before
+            baseline = baseline or (seconds, llm_items)
+            print(f"  {count} workers: {seconds:6.2f}s (speedup {baseline[0] / seconds:.2f}x), "
+                  f"{llm.requests - requests_before} LLM requests, {llm_items} LLM items "
+                  f"({llm_items - baseline[1]:+d} vs {shard_counts[0]} worker), {total} articles in the digest")
+
+        # Warm rebalance: one more member joins the largest deployment
+        count = shard_counts[-1]
+        members = [f"shard-{i}" for i in range(count + 1)]
+        before = HashRing(members[:-1])
+        after = HashRing(members)
+        moved = sum(before.owner(feed['name']) != after.owner(feed['name']) for feed in feeds.feeds())
+        items_before = llm.items
+        seconds = run_shards(workdir, members, env)
+        total = coordinate(workdir, members, env)
+        print(f"  {count} -> {count + 1} workers (warm): {moved}/{args.feeds} feeds moved, "
+              f"{llm.items - items_before} LLM items re-sent ({(llm.items - items_before) / max(1, baseline[1]):.1%}), "
+              f"{seconds:.2f}s, {total} articles in the digest")
+    finally:
+        os.chdir(BACKEND_DIR)
+        shutil.rmtree(root, ignore_errors=True)
+        feeds.stop()
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cache hit rate and LLM calls with raw links vs canonical links.
+
+Two measurements:
+- the recorded feeds in bench/fixtures: distinct articles per cycle when
+  keyed by the raw entry link vs the canonical article URL (the NDTV
+  feedburner feed links through feedproxy to articles other feeds carry);
+- a warm cache built from cache.json, probed with the same articles under
+  the link variants feeds hand out (tracking parameters, AMP pages, http,
+  trailing slashes): hit rate of an exact-link lookup vs SimpleCache.
+
+Run from backend/:  python -m bench.bench_url_canon --variant-share 0.3
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import tempfile
+from urllib.parse import urlsplit, urlunsplit
+
+from bench.synthetic import BACKEND_DIR, load_fixture_feeds
+from cache_manager import SimpleCache
+from url_canon import canonical_url, entry_url
+
+
+def variant(link: str, rng: random.Random) -> str:
+    """The same article as another feed or client might link it"""
+    parts = urlsplit(link)
+    path = parts.path
+    kind = rng.choice(['utm', 'http', 'slash', 'amp', 'fragment'])
+    if kind == 'utm':
+        return urlunsplit((parts.scheme, parts.netloc, path, 'utm_source=rss&utm_medium=feed', ''))
+    if kind == 'http':
+        return urlunsplit(('http', parts.netloc, path, parts.query, ''))
+    if kind == 'slash':
+        return urlunsplit((parts.scheme, parts.netloc, path + '/', parts.query, ''))
+    if kind == 'amp':
+        if '/articleshow/' in path:
+            path = path.replace('/articleshow/', '/amp_articleshow/')
+        else:
+            path = '/amp' + path
+        return urlunsplit((parts.scheme, parts.netloc, path, '', ''))
+    return link + '#comments'
+
+
+def fixture_counts():
+    """(raw distinct links, canonical distinct links) across the recorded feeds"""
+    raw, canonical = set(), set()
+    for parsed_feed in load_fixture_feeds().values():
+        for entry in parsed_feed.entries:
+            raw.add(entry.get('link', ''))
+            canonical.add(canonical_url(entry_url(entry)))
+    return len(raw), len(canonical)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--variant-share', type=float, default=0.3,
+                        help='share of articles seen under a different link than the cached one')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    raw_count, canonical_count = fixture_counts()
+    print(f"Recorded feeds: {raw_count} distinct raw links, {canonical_count} distinct articles "
+          f"-> {raw_count - canonical_count} fewer LLM items per cold cycle")
+
+    rng = random.Random(args.seed)
+    with open(os.path.join(BACKEND_DIR, 'cache.json'), 'r', encoding='utf-8') as f:
+        legacy = json.load(f)
+    probes = [
+        {'link': variant(link, rng) if rng.random() < args.variant_share else link}
+        for link in legacy
+    ]
+
+    exact_hits = sum(1 for probe in probes if probe['link'] in legacy)
+
+    workdir = tempfile.mkdtemp()
+    try:
+        cache_file = os.path.join(workdir, 'cache.json')
+        shutil.copy(os.path.join(BACKEND_DIR, 'cache.json'), cache_file)
+        # Entries never expire here: only the keys are under test
+        cache = SimpleCache(cache_file, max_age_hours=10 ** 6)
+        canonical_hits = len(cache.partition(probes)[0])
+    finally:
+        shutil.rmtree(workdir)
+
+    print(f"Warm cache, {len(probes)} articles, {args.variant_share:.0%} under a variant link:")
+    print(f"  exact-link hit rate: {exact_hits / len(probes):.1%} ({len(probes) - exact_hits} LLM items)")
+    print(f"  canonical hit rate:  {canonical_hits / len(probes):.1%} ({len(probes) - canonical_hits} LLM items)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Local OpenAI-compatible chat completions endpoint for offline LLM benchmarks.
+
+Answers POST /v1/chat/completions after a configurable latency by echoing the
+items found after "INPUT JSON:" in the user prompt with canned analysis. It
+can enforce a requests-per-minute limit with 429 + Retry-After, and drop a
+fraction of items from each answer to exercise partial-output handling.
+
+Run standalone:  python -m bench.fake_openai --latency 2 --rpm 120
+Then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8766/v1
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler
+from typing import Dict, List
+
+from bench.feed_server import BenchHTTPServer
+
+ECHO_FIELDS = ('id', 'title', 'source', 'link', 'published')
+
+
+def extract_input_items(prompt: str) -> List[Dict]:
+    """The JSON value following 'INPUT JSON:' in a prompt"""
+    marker = prompt.find('INPUT JSON:')
+    if marker == -1:
+        return []
+    text = prompt[marker + len('INPUT JSON:'):].lstrip()
+    value, _ = json.JSONDecoder().raw_decode(text)
+    if isinstance(value, dict):
+        value = value.get('items', [])
+    return value
+
+
+def analyse(item: Dict) -> Dict:
+    """Canned per-item answer in the shape the prompt asks for"""
+    title = item.get('title') or item.get('t', '')
+    answer = {field: item[field] for field in ECHO_FIELDS if field in item}
+    answer.update({
+        'one_liner': ' '.join(title.split()[:22]),
+        'bullets': [f"{title[:80]} matters for Indian investors."],
+        'labels': ['markets'],
+        'auto_tags': {'companies': [], 'sectors': ['Finance'], 'financial_terms': [], 'entities': []}
+    })
+    return answer
+
+
+class FakeOpenAIServer:
+    """Threaded HTTP server imitating the chat completions API"""
+
+    def __init__(self, latency: float = 1.0, jitter: float = 0.0, rpm: int = 0,
+                 drop_rate: float = 0.0, port: int = 0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rpm = rpm
+        self.drop_rate = drop_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.items = 0            # items in answered requests
+        self.rate_limited = 0
+        self.prompt_chars = 0
+        self.answered_at = []     # time.monotonic() of each successful answer
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self.httpd = BenchHTTPServer(('127.0.0.1', port), self._handler())
+        self.port = self.httpd.server_address[1]
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def _over_limit(self) -> bool:
+        """Sliding one-minute window request count"""
+        if not self.rpm:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if len(self._recent) >= self.rpm:
+                return True
+            self._recent.append(now)
+            return False
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                server.requests += 1
+
+                if server._over_limit():
+                    server.rate_limited += 1
+                    self._send_json(429, {'error': {'message': 'Rate limit reached', 'type': 'requests'}},
+                                    {'Retry-After': '1'})
+                    return
+
+                prompt = ''.join(message.get('content', '') for message in request.get('messages', []))
+                server.prompt_chars += len(prompt)
+                items = extract_input_items(prompt)
+                server.items += len(items)
+                answers = [analyse(item) for item in items if server.rng.random() >= server.drop_rate]
+
+                time.sleep(max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter)))
+                content = json.dumps({'items': answers})
+                server.answered_at.append(time.monotonic())
+                prompt_tokens = len(prompt) // 4
+                completion_tokens = len(content) // 4
+                self._send_json(200, {
+                    'id': f"chatcmpl-fake-{server.requests}",
+                    'object': 'chat.completion',
+                    'created': int(time.time()),
+                    'model': request.get('model', 'fake'),
+                    'choices': [{
+                        'index': 0,
+                        'message': {'role': 'assistant', 'content': content},
+                        'finish_reason': 'stop'
+                    }],
+                    'usage': {
+                        'prompt_tokens': prompt_tokens,
+                        'completion_tokens': completion_tokens,
+                        'total_tokens': prompt_tokens + completion_tokens
+                    }
+                })
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'FakeOpenAIServer':
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=1.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--rpm', type=int, default=0)
+    parser.add_argument('--drop-rate', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=8766)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.latency, args.jitter, args.rpm, args.drop_rate, args.port)
+    print(f"Fake OpenAI API on {server.base_url}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
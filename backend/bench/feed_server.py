@@ -0,0 +1,137 @@
+"""Local HTTP stand-in for RSS publishers, for offline fetch benchmarks.
+
+Serves /feeds/<n>.xml with a configurable artificial latency and answers
+If-None-Match with 304 like a well-behaved publisher. Individual feeds can
+be made slow or failing (503), and any request can hit a latency spike. Feed URLs are
+spread over several loopback addresses (127.0.0.1, 127.0.0.2, ...) so
+per-host connection limits behave as they would against real publishers.
+
+Run standalone:  python -m bench.feed_server --feeds 300 --latency 0.2
+"""
+import argparse
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set
+
+from bench.synthetic import load_text_pool, make_entries, render_rss
+
+
+class BenchHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with a listen backlog for hundreds of simultaneous connects.
+
+    The default backlog of 5 drops SYNs once a few more clients connect at
+    once, and each dropped connect waits a full second for the retransmit.
+    """
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class FeedServer:
+    """Threaded HTTP server holding a pre-rendered body per feed"""
+
+    def __init__(self, feed_count: int = 100, items_per_feed: int = 30, latency: float = 0.1,
+                 port: int = 0, hosts: int = 8, slow_feeds: Dict[int, float] = None,
+                 failing_feeds: Set[int] = None, spike_rate: float = 0.0, spike_latency: float = 0.0,
+                 seed: int = 0):
+        pool = load_text_pool()
+        self.latency = latency
+        self.slow_feeds = slow_feeds or {}
+        self.failing_feeds = set(failing_feeds or ())
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self._rng = random.Random(seed)
+        self.hosts = hosts
+        self.requests = 0
+        self.bodies = {
+            i: render_rss(f"Feed {i}", make_entries(pool, items_per_feed, seed=i))
+            for i in range(feed_count)
+        }
+        self.httpd = BenchHTTPServer(('0.0.0.0', port), self._handler())
+        self.port = self.httpd.server_address[1]
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without this each keep-alive response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server.requests += 1
+                try:
+                    feed_id = int(self.path.rsplit('/', 1)[-1].split('.')[0])
+                    body = server.bodies[feed_id]
+                except (ValueError, KeyError):
+                    self.send_error(404)
+                    return
+
+                latency = server.slow_feeds.get(feed_id, server.latency)
+                if server.spike_rate and server._rng.random() < server.spike_rate:
+                    latency = server.spike_latency
+                if latency:
+                    time.sleep(latency)
+
+                if feed_id in server.failing_feeds:
+                    self.send_error(503)
+                    return
+
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/rss+xml')
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def feeds(self) -> List[Dict]:
+        """sources.yml-style feed list pointing at this server"""
+        return [
+            {
+                'name': f"Feed {i}",
+                'url': f"http://127.0.0.{i % self.hosts + 1}:{self.port}/feeds/{i}.xml"
+            }
+            for i in self.bodies
+        ]
+
+    def start(self) -> 'FeedServer':
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--feeds', type=int, default=100)
+    parser.add_argument('--items', type=int, default=30)
+    parser.add_argument('--latency', type=float, default=0.1)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    server = FeedServer(args.feeds, args.items, args.latency, args.port)
+    print(f"Serving {args.feeds} feeds on port {server.port}")
+    for feed in server.feeds()[:3]:
+        print(f"  {feed['url']}")
+    server.httpd.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
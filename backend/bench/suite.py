@@ -0,0 +1,326 @@
+"""Offline benchmark suite: every pipeline stage and the full service cycle, with JSON results.
+
+Feeds are synthetic, served by the local feed server at --scale times today's
+volume (the feeds in sources.yml, each with as many items as a recorded
+fixture); the LLM is the fake OpenAI server with --llm-latency. Nothing
+touches the network or the working directory.
+
+CPU-bound stages (parse, clean_text, dedup, near-dedup, cache) report the
+median of --repeat runs; fetch, LLM and cycle runs are timed once. Each
+process_and_save cycle polls just enough feeds for MAX_ITEMS (so every
+run sees the same items), cold (empty state and caches) and then warm
+(every feed 304, every item cached), and records its per-stage metrics.
+
+Run from backend/:  python -m bench.suite --scale 10 --output bench_results.json
+Compare to a saved run (exit status 1 on a regression):
+                    python -m bench.suite --scale 10 --compare bench_results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import feedparser
+
+from bench.fake_openai import FakeOpenAIServer
+from bench.feed_server import FeedServer
+from bench.synthetic import BACKEND_DIR, todays_volume
+from cache_manager import SimpleCache
+from metrics import metrics
+from near_dedup import collapse_near_duplicates
+from text_cleaner import clean_text
+
+# MAX_ITEMS default: items per cycle at 1x
+TODAY_MAX_ITEMS = 50
+
+RECENCY_HOURS = 24 * 365
+
+
+def timed(func: Callable, repeat: int = 1) -> float:
+    """Median seconds of repeat calls"""
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs)
+
+
+def result(seconds: float, items: int, **extra) -> Dict:
+    return {
+        'seconds': round(seconds, 6),
+        'items': items,
+        'items_per_sec': round(items / seconds, 1) if seconds else None,
+        **extra
+    }
+
+
+def bench_fetch(server: FeedServer, mode: str, workdir: str) -> Dict[str, Dict]:
+    """fetch_rss_items cold, then warm (every feed answers 304)"""
+    from app import fetch_rss_items
+
+    feeds = server.feeds()
+    config = {
+        'fetch_mode': mode,
+        'feed_state_file': os.path.join(workdir, f'feed_state_{mode}.json'),
+        'entry_ledger_file': os.path.join(workdir, f'entry_ledger_{mode}.json'),
+        'feed_health_file': os.path.join(workdir, f'feed_health_{mode}.json'),
+        'recency_hours': RECENCY_HOURS
+    }
+    results = {}
+    for run in ('cold', 'warm'):
+        start = time.perf_counter()
+        items, feed_summary = fetch_rss_items(feeds, sys.maxsize, config)
+        seconds = time.perf_counter() - start
+        results[f'fetch_{mode}_{run}'] = result(
+            seconds, len(items), feeds=len(feeds),
+            feeds_ok=sum(1 for feed_info in feed_summary if feed_info['status'] == 'success'),
+            not_modified=sum(1 for feed_info in feed_summary if feed_info['not_modified'])
+        )
+    return results
+
+
+def bench_cpu_stages(server: FeedServer, repeat: int) -> Dict[str, Dict]:
+    """parse, clean_text, dedup, near-dedup and both cache backends on the served feeds"""
+    from app import deduplicate_items, fallback_processing
+
+    bodies = list(server.bodies.values())
+    results = {}
+
+    def parse_all():
+        return [feedparser.parse(body) for body in bodies]
+
+    seconds = timed(parse_all, repeat)
+    parsed_feeds = parse_all()
+    results['parse'] = result(seconds, sum(len(parsed_feed.entries) for parsed_feed in parsed_feeds),
+                              feeds=len(bodies))
+
+    texts = [
+        entry.get(field, '')
+        for parsed_feed in parsed_feeds for entry in parsed_feed.entries
+        for field in ('title', 'summary')
+    ]
+    results['clean_text'] = result(timed(lambda: [clean_text(text) for text in texts], repeat), len(texts))
+
+    items = extract_items(parsed_feeds)
+    # Publishers syndicate each other: every third story turns up twice
+    with_copies = items + items[::3]
+    results['dedup'] = result(timed(lambda: deduplicate_items(with_copies), repeat), len(with_copies))
+    results['near_dedup'] = result(timed(lambda: collapse_near_duplicates(items), repeat), len(items))
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        processed = fallback_processing(items)
+    for backend in ('json', 'sqlite'):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache_file = os.path.join(cache_dir, f'cache.{"db" if backend == "sqlite" else "json"}')
+            cache = SimpleCache(cache_file, max_age_hours=RECENCY_HOURS, backend=backend)
+            results[f'cache_update_{backend}'] = result(timed(lambda: cache.update(items, processed)), len(items))
+            results[f'cache_lookup_{backend}'] = result(timed(lambda: cache.partition(items), repeat), len(items))
+            # A fresh process: lookups go to the storage backend instead of the in-memory layer
+            cold_cache = SimpleCache(cache_file, max_age_hours=RECENCY_HOURS, backend=backend)
+            results[f'cache_lookup_{backend}_cold'] = result(timed(lambda: cold_cache.partition(items)), len(items))
+    return results
+
+
+def extract_items(parsed_feeds: List) -> List[Dict]:
+    from app import extract_feed_items
+
+    items = []
+    for i, parsed_feed in enumerate(parsed_feeds):
+        items.extend(extract_feed_items(f"Feed {i}", parsed_feed, recency_hours=RECENCY_HOURS)[0])
+    return items
+
+
+def bench_llm(items: List[Dict], llm: FakeOpenAIServer, concurrency: int) -> Dict[str, Dict]:
+    from app import process_with_llm
+
+    config = {
+        'openai_api_key': 'fake',
+        'openai_base_url': llm.base_url,
+        'llm_model': 'fake-model',
+        'llm_concurrency': concurrency,
+        'llm_rpm': 100000
+    }
+    requests_before = llm.requests
+    with contextlib.redirect_stdout(io.StringIO()):
+        seconds = timed(lambda: process_with_llm(items, config))
+    return {'llm': result(seconds, len(items), requests=llm.requests - requests_before)}
+
+
+def bench_cycles(feeds: List[Dict], llm: FakeOpenAIServer, workdir: str, max_items: int,
+                 concurrency: int) -> Dict[str, Dict]:
+    """service.process_and_save, configured through the environment like the real service"""
+    os.environ.update({
+        'OPENAI_API_KEY': 'fake',
+        'OPENAI_BASE_URL': llm.base_url,
+        'LLM_MODEL': 'fake-model',
+        'MAX_ITEMS': str(max_items),
+        'RECENCY_HOURS': str(RECENCY_HOURS),
+        'LLM_CONCURRENCY': str(concurrency),
+        'LLM_RPM': '100000',
+        'LLM_TPM': '100000000',
+        'FETCH_MODE': 'async'
+    })
+    feeds_yaml = json.dumps({'feeds': feeds})  # JSON is valid YAML
+
+    results = {}
+    for mode in ('staged', 'streaming'):
+        mode_dir = os.path.join(workdir, f'cycle_{mode}')
+        os.makedirs(mode_dir)
+        os.chdir(mode_dir)
+        with open('sources.yml', 'w') as f:
+            f.write(feeds_yaml)
+        os.environ['PIPELINE_MODE'] = mode
+        import service
+        service._cache = service._content_cache = service._scheduler = service._feed_stores = None
+
+        for run in ('cold', 'warm'):
+            metrics.reset()
+            requests_before = llm.requests
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                service.process_and_save()
+            seconds = time.perf_counter() - start
+            with open(service.DIGEST_FILE, 'r', encoding='utf-8') as f:
+                digest = json.load(f)
+            snapshot = metrics.snapshot()
+            results[f'cycle_{mode}_{run}'] = result(
+                seconds, digest.get('total_items', 0),
+                llm_requests=llm.requests - requests_before,
+                stages={
+                    name: {'count': histogram['count'], 'sum': histogram['sum']}
+                    for name, histogram in snapshot['histograms'].items()
+                },
+                cache_hit_ratio=snapshot['cache_hit_ratio']
+            )
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results: Dict[str, Dict], baseline_file: str, threshold: float) -> List[str]:
+    """Print the change in time per benchmark; returns the names that got slower by more than threshold"""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('scale') != results['meta']['scale']:
+        print(f"⚠️  Baseline ran at scale {baseline['meta'].get('scale')}, this run at {results['meta']['scale']}")
+
+    print(f"\nCompared to {baseline_file} ({baseline['meta'].get('commit')}, {baseline['meta'].get('timestamp')}):")
+    regressions = []
+    for name, current in results['results'].items():
+        before = baseline['results'].get(name)
+        if not before or not before.get('seconds'):
+            continue
+        change = current['seconds'] / before['seconds'] - 1
+        flag = ''
+        if change > threshold:
+            flag = '  ⚠️ slower'
+            regressions.append(name)
+        print(f"  {name:<26}{before['seconds']:>10.4f}s -> {current['seconds']:>10.4f}s {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=10, help="multiple of today's feed count and MAX_ITEMS")
+    parser.add_argument('--feed-latency', type=float, default=0.05)
+    parser.add_argument('--llm-latency', type=float, default=0.2)
+    parser.add_argument('--concurrency', type=int, default=4, help='LLM batches in flight')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', default='', help='comma-separated groups: fetch,stages,llm,cycle')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--compare', help='results JSON from an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.2, help='slowdown that counts as a regression')
+    args = parser.parse_args()
+
+    groups = set(args.only.split(',')) if args.only else {'fetch', 'stages', 'llm', 'cycle'}
+    today_feeds, items_per_feed = todays_volume()
+    feed_count = today_feeds * args.scale
+    max_items = TODAY_MAX_ITEMS * args.scale
+    print(f"Scale {args.scale}x: {feed_count} feeds x {items_per_feed} items, MAX_ITEMS={max_items}")
+
+    # Quiet from here on; app.py and service.py then skip their logging set-up, but still
+    # open their log files in the working directory when first imported: the temporary one
+    logging.basicConfig(level=logging.CRITICAL, handlers=[logging.StreamHandler()])
+    cwd = os.getcwd()
+    output = os.path.abspath(args.output) if args.output else None
+    server = FeedServer(feed_count, items_per_feed, args.feed_latency).start()
+    llm = FakeOpenAIServer(latency=args.llm_latency).start()
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory(prefix='bench-suite-') as workdir:
+            os.chdir(workdir)
+            if 'fetch' in groups:
+                for mode in ('thread', 'async'):
+                    results.update(bench_fetch(server, mode, workdir))
+            if 'stages' in groups:
+                results.update(bench_cpu_stages(server, args.repeat))
+            # Just enough feeds for one cycle's MAX_ITEMS
+            cycle_feeds = -(-max_items // items_per_feed)
+            if 'llm' in groups:
+                bodies = list(server.bodies.values())[:cycle_feeds]
+                items = extract_items([feedparser.parse(body) for body in bodies])[:max_items]
+                results.update(bench_llm(items, llm, args.concurrency))
+            if 'cycle' in groups:
+                results.update(bench_cycles(server.feeds()[:cycle_feeds], llm, workdir,
+                                            cycle_feeds * items_per_feed, args.concurrency))
+            os.chdir(cwd)
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        llm.stop()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'scale': args.scale,
+            'feeds': feed_count,
+            'items_per_feed': items_per_feed,
+            'max_items': max_items,
+            'feed_latency': args.feed_latency,
+            'llm_latency': args.llm_latency,
+            'concurrency': args.concurrency,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+
+    print(f"\n{'benchmark':<26}{'seconds':>10}{'items':>9}{'items/sec':>12}")
+    for name, entry in results.items():
+        rate = f"{entry['items_per_sec']:,.0f}" if entry['items_per_sec'] is not None else '-'
+        print(f"{name:<26}{entry['seconds']:>10.4f}{entry['items']:>9}{rate:>12}")
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {output}")
+
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.threshold:.0%}: {', '.join(regressions)}")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Recorded feed fixtures, plus synthetic RSS feeds built from the article text in cache.json"""
+import glob
+import json
+import os
+import random
+import re
+import statistics
+import time
+from email.utils import formatdate
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+import feedparser
+import yaml
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Control characters are not allowed in XML 1.0 documents
+XML_INVALID_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def load_fixture_feeds() -> Dict[str, feedparser.FeedParserDict]:
+    """Parsed recorded feeds from bench/fixtures, one per publisher style"""
+    return {
+        os.path.splitext(os.path.basename(path))[0]: feedparser.parse(path)
+        for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.xml')))
+    }
+
+
+def load_fixture_texts() -> List[str]:
+    """Every title and summary string clean_text sees for the recorded feeds"""
+    texts = []
+    for parsed_feed in load_fixture_feeds().values():
+        for entry in parsed_feed.entries:
+            texts.append(entry.get('title', ''))
+            texts.append(entry.get('summary', '') or entry.get('description', ''))
+    return texts
+
+
+def todays_volume() -> Tuple[int, int]:
+    """(feeds in sources.yml, median items per recorded feed): the 1x load for scaled benchmarks"""
+    with open(os.path.join(BACKEND_DIR, 'sources.yml'), 'r') as f:
+        feed_count = len(yaml.safe_load(f)['feeds'])
+    items_per_feed = statistics.median(len(parsed_feed.entries) for parsed_feed in load_fixture_feeds().values())
+    return feed_count, int(items_per_feed)
+
+
+def load_text_pool(cache_file: str = os.path.join(BACKEND_DIR, 'cache.json')) -> List[Dict]:
+    """Titles, summaries and links of previously processed articles"""
+    with open(cache_file, 'r', encoding='utf-8') as f:
+        cache = json.load(f)
+
+    pool = []
+    for link, entry in cache.items():
+        data = entry['data']
+        pool.append({
+            'title': XML_INVALID_CHARS.sub('', data.get('title', '')),
+            'summary': XML_INVALID_CHARS.sub('', ' '.join(data.get('bullets', []))),
+            'link': link
+        })
+    return pool
+
+
+def make_entries(pool: List[Dict], count: int, seed: int = 0, max_age_hours: float = 72) -> List[Dict]:
+    """Pick count articles with publish times spread over the last max_age_hours"""
+    rng = random.Random(seed)
+    now = time.time()
+    entries = []
+    for i in range(count):
+        article = pool[rng.randrange(len(pool))]
+        entries.append({
+            'title': article['title'],
+            'summary': f"<p>{escape(article['summary'])}</p>",
+            'link': f"{article['link']}?feed={seed}&i={i}",
+            'published': formatdate(now - rng.uniform(0, max_age_hours * 3600), localtime=True)
+        })
+    return entries
+
+
+def render_rss(title: str, entries: List[Dict]) -> bytes:
+    """Render entries as an RSS 2.0 document"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0"><channel>',
+        f'<title>{escape(title)}</title>',
+        '<link>http://localhost/</link>',
+        '<description>Synthetic feed</description>'
+    ]
+    for entry in entries:
+        parts.append(
+            '<item>'
+            f'<title>{escape(entry["title"])}</title>'
+            f'<link>{escape(entry["link"])}</link>'
+            f'<guid>{escape(entry["link"])}</guid>'
+            f'<description>{escape(entry["summary"])}</description>'
+            f'<pubDate>{entry["published"]}</pubDate>'
+            '</item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
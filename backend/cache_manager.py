@@ -1,15 +1,50 @@
 """Simple cache manager for processed articles"""
+import hashlib
+import heapq
 import json
+import logging
 import os
+import sqlite3
+import threading
 import time
-from typing import List, Dict, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Set, Tuple
 
+from metrics import metrics
+from url_canon import canonical_url
 
-class SimpleCache:
-    def __init__(self, cache_file: str = 'cache.json', max_age_hours: int = 24):
+
+def link_key(item: Dict) -> str:
+    """Default cache key: the item's canonical link"""
+    return canonical_url(item.get('link', ''))
+
+
+def entry_size(link: str, entry: Dict) -> int:
+    """Approximate bytes an entry takes, for max_bytes"""
+    return len(link) + len(json.dumps(entry['data'], ensure_ascii=False))
+
+
+class JSONCacheBackend:
+    """Whole-file JSON storage: every write rewrites cache.json, unless writes are deferred.
+
+    The whole file is held in memory, so max_entries / max_bytes bound it
+    here too: past either, the oldest entries by timestamp are dropped.
+    While deferred is non-zero, writes only mark the file dirty and flush()
+    rewrites it once.
+    """
+
+    def __init__(self, cache_file: str = 'cache.json', max_entries: int = 0, max_bytes: int = 0):
         self.cache_file = cache_file
-        self.max_age_hours = max_age_hours
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.deferred = 0
+        self._dirty = False
         self.cache = self._load()
+        self._sizes = {link: entry_size(link, entry) for link, entry in self.cache.items()} if max_bytes else {}
+        self._bytes = sum(self._sizes.values())
+        if self._evict():
+            self._save()
 
     def _load(self) -> Dict:
         """Load cache from file"""
@@ -23,74 +58,548 @@ class SimpleCache:
             return {}
 
     def _save(self):
-        """Save cache to file"""
-        with open(self.cache_file, 'w', encoding='utf-8') as f:
-            json.dump(self.cache, f, indent=2, ensure_ascii=False)
+        """Save cache to file (atomic replace), or just mark it dirty while writes are deferred"""
+        self._dirty = True
+        if self.deferred:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.cache, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+        self._dirty = False
+
+    def flush(self):
+        """Write deferred changes"""
+        if self._dirty:
+            self._save()
+
+    def _evict(self) -> int:
+        """Drop the oldest entries until the bounds hold"""
+        excess = len(self.cache) - self.max_entries if self.max_entries else 0
+        if excess <= 0 and not (self.max_bytes and self._bytes > self.max_bytes):
+            return 0
+        evicted = 0
+        for link in sorted(self.cache, key=lambda link: self.cache[link].get('timestamp', 0)):
+            if evicted >= excess and not (self.max_bytes and self._bytes > self.max_bytes):
+                break
+            self._pop(link)
+            evicted += 1
+        return evicted
+
+    def _pop(self, link: str) -> bool:
+        if self.cache.pop(link, None) is None:
+            return False
+        self._bytes -= self._sizes.pop(link, 0)
+        return True
+
+    def get_many(self, links: List[str]) -> Dict[str, Dict]:
+        """Entries for the given links that exist in the cache"""
+        return {link: self.cache[link] for link in links if link in self.cache}
+
+    def upsert_many(self, entries: Dict[str, Dict]):
+        """Insert or replace entries"""
+        for link, entry in entries.items():
+            self._pop(link)
+            self.cache[link] = entry
+            if self.max_bytes:
+                self._sizes[link] = entry_size(link, entry)
+                self._bytes += self._sizes[link]
+        self._evict()
+        self._save()
+
+    def delete_many(self, links: List[str]):
+        """Remove the given links"""
+        removed = [link for link in links if self._pop(link)]
+        if removed:
+            self._save()
+
+    def delete_older_than(self, cutoff: float) -> int:
+        """Remove entries with a timestamp before cutoff"""
+        expired_links = [
+            link for link, entry in self.cache.items()
+            if entry.get('timestamp', 0) < cutoff
+        ]
+
+        for link in expired_links:
+            self._pop(link)
+
+        if expired_links:
+            self._save()
+
+        return len(expired_links)
+
+    def rekey(self, key_fn: Callable[[str], str]) -> int:
+        """Re-key every entry with key_fn, leaving data['link'] as published; the newest entry wins a collision"""
+        rekeyed = {}
+        changed = 0
+        for link, entry in self.cache.items():
+            key = key_fn(link)
+            if key != link:
+                changed += 1
+            current = rekeyed.get(key)
+            if current is None or entry.get('timestamp', 0) > current.get('timestamp', 0):
+                rekeyed[key] = entry
+
+        if changed:
+            self.cache = rekeyed
+            if self.max_bytes:
+                self._sizes = {link: entry_size(link, entry) for link, entry in self.cache.items()}
+                self._bytes = sum(self._sizes.values())
+            self._save()
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+
+class SQLiteCacheBackend:
+    """SQLite storage in WAL mode: writes cost O(changed entries), expiry uses an index"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache (
+            link TEXT PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_timestamp ON cache (timestamp);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+    """
+
+    # SQLite's default limit on host parameters per statement is 999
+    QUERY_CHUNK = 500
+
+    def __init__(self, db_file: str = 'cache.db', migrate_from: str = None):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+        # Every write is its own small transaction already; nothing to defer
+        self.deferred = 0
+
+    def flush(self):
+        pass
+
+    def migrate_from_json(self, json_file: str) -> int:
+        """One-shot import of an existing cache.json; later calls are no-ops"""
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_from'"
+            ).fetchone()
+            if done or not os.path.exists(json_file):
+                return 0
+
+            try:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+            except:
+                legacy = {}
+
+            rows = [
+                (link, entry.get('timestamp', 0), json.dumps(entry['data'], ensure_ascii=False))
+                for link, entry in legacy.items() if 'data' in entry
+            ]
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO cache (link, timestamp, data) VALUES (?, ?, ?)", rows
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_from', ?)", (json_file,)
+                )
+            return len(rows)
+
+    def get_many(self, links: List[str]) -> Dict[str, Dict]:
+        """Entries for the given links that exist in the cache"""
+        found = {}
+        with self._lock:
+            for i in range(0, len(links), self.QUERY_CHUNK):
+                chunk = links[i:i + self.QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT link, timestamp, data FROM cache WHERE link IN ({placeholders})", chunk
+                )
+                for link, timestamp, data in rows:
+                    found[link] = {'timestamp': timestamp, 'data': json.loads(data)}
+        return found
+
+    def upsert_many(self, entries: Dict[str, Dict]):
+        """Insert or replace entries in one transaction"""
+        rows = [
+            (link, entry['timestamp'], json.dumps(entry['data'], ensure_ascii=False))
+            for link, entry in entries.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (link, timestamp, data) VALUES (?, ?, ?)", rows
+            )
+
+    def delete_many(self, links: List[str]):
+        """Remove the given links"""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM cache WHERE link = ?", [(link,) for link in links])
+
+    def delete_older_than(self, cutoff: float) -> int:
+        """Remove entries with a timestamp before cutoff"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM cache WHERE timestamp < ?", (cutoff,)).rowcount
+
+    def rekey(self, key_fn: Callable[[str], str], version: str = '1') -> int:
+        """Re-key every row with key_fn, once per version; data['link'] stays as published"""
+        with self._lock:
+            done = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'rekeyed'"
+            ).fetchone()
+            if done and done[0] == version:
+                return 0
+
+            rows = self._conn.execute("SELECT link, timestamp, data FROM cache").fetchall()
+            rekeyed = {}
+            stale = []
+            for link, timestamp, data in rows:
+                key = key_fn(link)
+                if key == link:
+                    rekeyed.setdefault(key, None)
+                    continue
+                stale.append((link,))
+                current = rekeyed.get(key)
+                if current is None or timestamp > current[0]:
+                    rekeyed[key] = (timestamp, data)
+
+            with self._conn:
+                self._conn.executemany("DELETE FROM cache WHERE link = ?", stale)
+                # Keys already canonical keep their row unless a re-keyed one is newer
+                self._conn.executemany(
+                    "INSERT INTO cache (link, timestamp, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(link) DO UPDATE SET timestamp = excluded.timestamp, data = excluded.data "
+                    "WHERE excluded.timestamp > cache.timestamp",
+                    [(key, row[0], row[1]) for key, row in rekeyed.items() if row is not None]
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('rekeyed', ?)", (version,)
+                )
+            return len(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SimpleCache:
+    """Processed-article cache keyed by canonical link (see url_canon).
+
+    Meant to live for the whole service run: entries read from or written to
+    the storage backend stay in an in-memory LRU layer, optionally bounded by
+    max_entries / max_bytes. The json backend holds its whole file in memory,
+    so it applies the same bounds (see JSONCacheBackend); sqlite keeps rows
+    on disk until they expire. Expiry is tracked in time buckets, so
+    clean_expired drops whole buckets instead of scanning every entry; a full
+    backend sweep runs at most once per FULL_SWEEP_INTERVAL.
+    """
+
+    BUCKET_SECONDS = 600
+    FULL_SWEEP_INTERVAL = 3600
+
+    def __init__(self, cache_file: str = 'cache.json', max_age_hours: int = 24, backend: str = 'json',
+                 migrate_from: str = None, max_entries: int = 0, max_bytes: int = 0,
+                 negative_ttl_minutes: int = 60, key_fn: Callable[[Dict], str] = None, tier: str = 'link'):
+        self.cache_file = cache_file
+        self.key_fn = key_fn or link_key
+        self.tier = tier  # metrics label
+        self.max_age_hours = max_age_hours
+        self.negative_ttl_minutes = negative_ttl_minutes
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        if backend == 'sqlite':
+            self.backend = SQLiteCacheBackend(cache_file, migrate_from=migrate_from)
+        else:
+            self.backend = JSONCacheBackend(cache_file, max_entries=max_entries, max_bytes=max_bytes)
+
+        self._memory = OrderedDict()   # link -> entry, least recently used first
+        self._sizes = {}               # link -> approximate bytes
+        self._buckets = {}             # bucket id -> links written in that interval
+        self._bucket_ids = []          # min-heap of bucket ids
+        self._bytes = 0
+        self._last_sweep = 0.0
+        self._lock = threading.RLock()
+        self.counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+        # Entries written before links were canonicalized are re-keyed on open
+        if key_fn is None:
+            rekeyed = self.backend.rekey(canonical_url)
+            if rekeyed:
+                logging.info(f"Re-keyed {rekeyed} cache entries to canonical links")
+
+    @contextmanager
+    def deferred_writes(self):
+        """Hold backend writes until the block ends: the json backend then rewrites its file once,
+        e.g. once per streaming cycle instead of once per LLM batch. Nests; a crash loses the held writes"""
+        with self._lock:
+            self.backend.deferred += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.backend.deferred -= 1
+                if not self.backend.deferred:
+                    self.backend.flush()
 
     def _is_expired(self, timestamp: float) -> bool:
         """Check if cache entry is expired"""
         age_hours = (time.time() - timestamp) / 3600
         return age_hours > self.max_age_hours
 
-    def get_cached(self, items: List[Dict]) -> List[Dict]:
-        """Get cached processed items"""
-        cached_items = []
+    def _remember(self, link: str, entry: Dict):
+        """Put an entry in the memory layer and its expiry bucket"""
+        self._forget(link)
+        size = entry_size(link, entry)
+        self._memory[link] = entry
+        self._sizes[link] = size
+        self._bytes += size
 
-        for item in items:
-            link = item.get('link', '')
-            if link and link in self.cache:
-                entry = self.cache[link]
-                timestamp = entry.get('timestamp', 0)
+        bucket_id = int(entry.get('timestamp', 0) // self.BUCKET_SECONDS)
+        if bucket_id not in self._buckets:
+            self._buckets[bucket_id] = set()
+            heapq.heappush(self._bucket_ids, bucket_id)
+        self._buckets[bucket_id].add(link)
 
-                if not self._is_expired(timestamp):
-                    cached_items.append(entry['data'])
+        while self._memory and (
+            (self.max_entries and len(self._memory) > self.max_entries) or
+            (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            oldest = next(iter(self._memory))
+            self._forget(oldest)
+            self.counters['evictions'] += 1
 
-        return cached_items
+    def _forget(self, link: str):
+        """Drop an entry from the memory layer (the backend keeps it)"""
+        entry = self._memory.pop(link, None)
+        if entry is None:
+            return
+        self._bytes -= self._sizes.pop(link, 0)
+        bucket = self._buckets.get(int(entry.get('timestamp', 0) // self.BUCKET_SECONDS))
+        if bucket is not None:
+            bucket.discard(link)
 
-    def filter_uncached(self, items: List[Dict]) -> List[Dict]:
-        """Return only items not in cache or expired"""
-        uncached = []
+    def match(self, items: List[Dict], count: bool = True) -> Tuple[List[Tuple[Dict, Dict]], List[Dict]]:
+        """Split items into ((item, cached data) pairs, items that need processing) in one pass.
+
+        count=False is for re-reading items already looked up: hit and miss counters are left alone.
+        """
+        with self._lock, metrics.timer(stage='cache_lookup', tier=self.tier):
+            keys = [self.key_fn(item) for item in items]
+            found = {}
+            unknown = []
+            for key in keys:
+                if not key:
+                    continue
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = entry
+                else:
+                    unknown.append(key)
 
-        for item in items:
-            link = item.get('link', '')
-            if not link:
-                continue
+            if unknown:
+                for key, entry in self.backend.get_many(unknown).items():
+                    self._remember(key, entry)
+                    found[key] = entry
 
-            if link not in self.cache:
-                uncached.append(item)
-            else:
-                timestamp = self.cache[link].get('timestamp', 0)
-                if self._is_expired(timestamp):
-                    uncached.append(item)
+            hits = []
+            misses = []
+            for item, key in zip(items, keys):
+                if not key:
+                    continue
+                entry = found.get(key)
+                if entry is not None and not self._is_expired(entry.get('timestamp', 0)):
+                    hits.append((item, entry['data']))
+                else:
+                    misses.append(item)
 
-        return uncached
+            if count:
+                self.counters['hits'] += len(hits)
+                self.counters['misses'] += len(misses)
+                metrics.inc('cache_lookups_total', len(hits), tier=self.tier, result='hit')
+                metrics.inc('cache_lookups_total', len(misses), tier=self.tier, result='miss')
+            return hits, misses
 
-    def update(self, raw_items: List[Dict], processed_items: List[Dict]):
-        """Update cache with newly processed items"""
+    def partition(self, items: List[Dict], count: bool = True) -> Tuple[List[Dict], List[Dict]]:
+        """Split items into (cached processed items, items that need processing) in one pass"""
+        hits, misses = self.match(items, count)
+        return [data for _, data in hits], misses
+
+    def get_cached(self, items: List[Dict]) -> List[Dict]:
+        """Get cached processed items"""
+        return self.partition(items)[0]
+
+    def filter_uncached(self, items: List[Dict]) -> List[Dict]:
+        """Return only items not in cache or expired"""
+        return self.partition(items)[1]
+
+    def update(self, raw_items: List[Dict], processed_items: List[Dict], failed_links: Set[str] = None):
+        """Update cache with newly processed items.
+
+        Links in failed_links only got fallback output; they are cached for
+        negative_ttl_minutes so a persistently failing article is retried
+        occasionally instead of on every cycle. The entry is stored with a
+        back-dated timestamp, so expiry and storage work unchanged.
+        """
         # Create mapping of link to processed item
-        processed_by_link = {item.get('link'): item for item in processed_items if item.get('link')}
+        processed_by_link = {canonical_url(item['link']): item for item in processed_items if item.get('link')}
+        failed_links = failed_links or set()
 
+        now = time.time()
+        negative_timestamp = now - max(0, self.max_age_hours * 3600 - self.negative_ttl_minutes * 60)
+        entries = {}
         for raw_item in raw_items:
-            link = raw_item.get('link', '')
-            if link and link in processed_by_link:
-                self.cache[link] = {
-                    'timestamp': time.time(),
+            link = canonical_url(raw_item.get('link', ''))
+            key = self.key_fn(raw_item)
+            if key and link in processed_by_link:
+                entries[key] = {
+                    'timestamp': negative_timestamp if link in failed_links else now,
                     'data': processed_by_link[link]
                 }
 
-        self._save()
+        with self._lock:
+            for link, entry in entries.items():
+                self._remember(link, entry)
+            self.backend.upsert_many(entries)
 
     def clean_expired(self):
         """Remove expired entries from cache"""
-        expired_links = [
-            link for link, entry in self.cache.items()
-            if self._is_expired(entry.get('timestamp', 0))
+        with self._lock:
+            cutoff = time.time() - self.max_age_hours * 3600
+            expired_links = []
+
+            # Only buckets that ended before the cutoff; the boundary bucket is checked on read
+            while self._bucket_ids and (self._bucket_ids[0] + 1) * self.BUCKET_SECONDS <= cutoff:
+                bucket_id = heapq.heappop(self._bucket_ids)
+                for link in self._buckets.pop(bucket_id):
+                    self._memory.pop(link)
+                    self._bytes -= self._sizes.pop(link, 0)
+                    expired_links.append(link)
+
+            if expired_links:
+                self.backend.delete_many(expired_links)
+            removed = len(expired_links)
+
+            # Entries that were never loaded into memory are swept from the backend now and then
+            if time.time() - self._last_sweep >= self.FULL_SWEEP_INTERVAL:
+                removed += self.backend.delete_older_than(cutoff)
+                self._last_sweep = time.time()
+
+            self.counters['expirations'] += removed
+            return removed
+
+    def stats(self) -> Dict:
+        """Counters and memory-layer size, for service_status.json"""
+        with self._lock:
+            lookups = self.counters['hits'] + self.counters['misses']
+            return {
+                **self.counters,
+                'hit_ratio': round(self.counters['hits'] / lookups, 3) if lookups else None,
+                'entries_in_memory': len(self._memory),
+                'bytes_in_memory': self._bytes
+            }
+
+
+def content_hash(item: Dict, model: str, prompt_version: str, summary_chars: int = 600) -> str:
+    """Hash of what the model sees for an item: normalised title and summary, model, prompt version"""
+    title = ' '.join(item.get('title', '').lower().split())
+    summary = ' '.join(item.get('summary', '')[:summary_chars].lower().split())
+    text = f"{model}\n{prompt_version}\n{summary_chars}\n{title}\n{summary}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class ContentCache:
+    """Second cache tier keyed by content_hash instead of link.
+
+    Catches a story re-published under a new URL, or seen again after its
+    link entry expired, with unchanged text. Model or prompt changes alter
+    the hash, so stale analyses are simply never matched again and age out.
+    """
+
+    # Fields that belong to the article occurrence, not to the analysis
+    ITEM_FIELDS = ('title', 'source', 'link', 'published')
+
+    def __init__(self, cache_file: str, model: str, prompt_version: str, summary_chars: int = 600,
+                 max_age_hours: int = 168, backend: str = 'json', max_entries: int = 0, max_bytes: int = 0):
+        self.model = model
+        self.prompt_version = prompt_version
+        self.summary_chars = summary_chars
+        self.cache = SimpleCache(cache_file, max_age_hours=max_age_hours, backend=backend,
+                                 max_entries=max_entries, max_bytes=max_bytes, key_fn=self.key,
+                                 tier='content')
+
+    def key(self, item: Dict) -> str:
+        if not item.get('title') and not item.get('summary'):
+            return ''
+        return content_hash(item, self.model, self.prompt_version, self.summary_chars)
+
+    def partition(self, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """(cached analyses re-based on each item's own title/source/link/published, misses)"""
+        hits, misses = self.cache.match(items)
+        reused = [
+            {**data, **{field: item.get(field, '') for field in self.ITEM_FIELDS}}
+            for item, data in hits
         ]
+        return reused, misses
 
-        for link in expired_links:
-            del self.cache[link]
+    def update(self, raw_items: List[Dict], processed_items: List[Dict], failed_links: Set[str] = None):
+        """Store LLM results; fallback output for failed links is not worth keeping by content"""
+        failed_links = failed_links or set()
+        self.cache.update(
+            [item for item in raw_items if canonical_url(item.get('link', '')) not in failed_links],
+            processed_items
+        )
 
-        if expired_links:
-            self._save()
+    def clean_expired(self):
+        return self.cache.clean_expired()
 
-        return len(expired_links)
+    def deferred_writes(self):
+        return self.cache.deferred_writes()
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+
+def cache_from_config(config: Dict) -> SimpleCache:
+    """Open the cache selected by CACHE_BACKEND; sqlite imports cache.json on first use"""
+    backend = config.get('cache_backend', 'json')
+    default_file = 'cache.db' if backend == 'sqlite' else 'cache.json'
+    return SimpleCache(
+        config.get('cache_file') or default_file,
+        max_age_hours=config.get('recency_hours', 24),
+        backend=backend,
+        migrate_from='cache.json' if backend == 'sqlite' else None,
+        max_entries=config.get('cache_max_entries', 0),
+        max_bytes=config.get('cache_max_bytes', 0),
+        negative_ttl_minutes=config.get('cache_negative_ttl_minutes', 60)
+    )
+
+
+def content_cache_from_config(config: Dict, prompt_version: str) -> ContentCache:
+    """Open the content-hash tier next to the link cache, with its own (longer) TTL"""
+    backend = config.get('cache_backend', 'json')
+    default_file = 'content_cache.db' if backend == 'sqlite' else 'content_cache.json'
+    return ContentCache(
+        config.get('content_cache_file') or default_file,
+        model=config.get('llm_model', ''),
+        prompt_version=prompt_version,
+        summary_chars=config.get('llm_summary_chars', 600),
+        max_age_hours=config.get('content_cache_hours', 168),
+        backend=backend,
+        max_entries=config.get('cache_max_entries', 0),
+        max_bytes=config.get('cache_max_bytes', 0)
+    )
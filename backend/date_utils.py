@@ -0,0 +1,80 @@
+"""Fast, memoized date normalization for feed entries"""
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+
+from dateutil import parser as date_parser
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+# "Wed, 08 Oct 2025 13:28:17 +0530" and friends; the weekday is ignored like dateutil does
+RFC822_DATE = re.compile(
+    r'^\s*(?:[A-Za-z]{3},?\s+)?(\d{1,2})\s+([A-Za-z]{3})\s+(\d{4})\s+'
+    r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*(?:([+-])(\d{2}):?(\d{2})|(GMT|UTC|Z))\s*$'
+)
+
+ISO8601_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}')
+
+
+def _parse_rfc822(date_str: str) -> Optional[datetime]:
+    match = RFC822_DATE.match(date_str)
+    if not match:
+        return None
+
+    day, month, year, hour, minute, second, sign, off_h, off_m, zone = match.groups()
+    month_number = MONTHS.get(month.lower())
+    if month_number is None:
+        return None
+
+    if zone:
+        tzinfo = timezone.utc
+    else:
+        offset = timedelta(hours=int(off_h), minutes=int(off_m))
+        tzinfo = timezone(-offset if sign == '-' else offset)
+
+    return datetime(int(year), month_number, int(day), int(hour), int(minute),
+                    int(second or 0), tzinfo=tzinfo)
+
+
+def _parse_iso8601(date_str: str) -> Optional[datetime]:
+    if not ISO8601_DATE.match(date_str):
+        return None
+    try:
+        return datetime.fromisoformat(date_str.strip())
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_date(date_str: str) -> Optional[tuple[float, str]]:
+    """(epoch seconds, ISO-8601 string) for a feed date, or None if unparseable.
+
+    RFC-822 and ISO-8601 are parsed directly; anything else goes to dateutil.
+    Naive dates are treated as local time, as before.
+    """
+    try:
+        parsed = _parse_rfc822(date_str) or _parse_iso8601(date_str) or date_parser.parse(date_str)
+        return parsed.timestamp(), parsed.isoformat()
+    except Exception:
+        return None
+
+
+def get_entry_date(entry) -> tuple[float, str]:
+    """(epoch seconds, ISO string) of an entry's published/updated/created date, or now"""
+    for field in ['published', 'updated', 'created']:
+        date_str = getattr(entry, field, None)
+        if date_str:
+            parsed = parse_date(date_str)
+            if parsed is not None:
+                return parsed
+    return time.time(), datetime.now().isoformat()
+
+
+def is_recent_timestamp(timestamp: float, hours: int = 48) -> bool:
+    """Check if an epoch timestamp is within the last hours"""
+    return timestamp >= time.time() - hours * 3600
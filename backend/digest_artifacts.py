@@ -0,0 +1,123 @@
+"""Pre-serialized, pre-compressed digest files for the serving path"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Dict, List
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are written
+    brotli = None
+
+MANIFEST_FILE = 'manifest.json'
+
+# Highest levels: written once per cycle, sent many times
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def slugify(name: str) -> str:
+    """URL-safe file name for a category ("Policy & Regulation" -> "policy-regulation")"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'category'
+
+
+def minified(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_variants(body: bytes) -> Dict[str, bytes]:
+    """Content-Encoding -> bytes; identity always, gzip always, br when brotli is installed"""
+    variants = {'identity': body, 'gzip': gzip.compress(body, GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_file, path)
+
+
+class DigestArtifacts:
+    """Minified digest and per-category slices, each with gzip/brotli copies and a manifest.
+
+    Files are content-addressed (name.<hash>.json[.gz|.br]) and the manifest is
+    replaced last, so a reader that follows the manifest always gets the files
+    it describes. The manifest gives each artifact a strong ETag (the hash of
+    the minified JSON) and the length of every encoding. Files from the
+    previous manifest are kept for readers still holding it; older ones are removed.
+
+    A category slice holds only its name and articles; the version, date and
+    last_updated live in the manifest, so a slice keeps its file and ETag for
+    as long as its articles are unchanged.
+    """
+
+    def __init__(self, out_dir: str = 'digest'):
+        self.out_dir = out_dir
+        self.manifest_path = os.path.join(out_dir, MANIFEST_FILE)
+
+    def _load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_artifact(self, name: str, data) -> Dict:
+        """Write all encodings of one JSON document; returns its manifest entry"""
+        body = minified(data)
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        encodings = {}
+        for encoding, payload in encode_variants(body).items():
+            suffix = {'identity': '', 'gzip': '.gz', 'br': '.br'}[encoding]
+            file_name = f"{name}.{digest}.json{suffix}"
+            path = os.path.join(self.out_dir, file_name)
+            if not os.path.exists(path):
+                _write_atomic(path, payload)
+            encodings[encoding] = {'file': file_name, 'length': len(payload)}
+        return {'etag': f'"{digest}"', 'encodings': encodings}
+
+    @staticmethod
+    def _files(manifest: Dict) -> List[str]:
+        artifacts = [manifest.get('digest')] + list((manifest.get('categories') or {}).values())
+        return [
+            variant['file'] for artifact in artifacts if artifact
+            for variant in artifact.get('encodings', {}).values()
+        ]
+
+    def write(self, digest: Dict) -> Dict:
+        """Write the artifacts for one digest version and swap in the new manifest"""
+        os.makedirs(self.out_dir, exist_ok=True)
+        previous = self._load_manifest()
+
+        manifest = {
+            'version': digest.get('version'),
+            'date': digest.get('date'),
+            'last_updated': digest.get('last_updated'),
+            'digest': self._write_artifact('digest', digest),
+            'categories': {}
+        }
+        for name, articles in (digest.get('categories') or {}).items():
+            slug = slugify(name)
+            entry = self._write_artifact(f"category-{slug}", {'category': name, 'articles': articles})
+            manifest['categories'][slug] = {'name': name, **entry}
+
+        _write_atomic(self.manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+
+        keep = set(self._files(manifest)) | set(self._files(previous)) | {MANIFEST_FILE}
+        for file_name in os.listdir(self.out_dir):
+            if file_name not in keep and not file_name.endswith('.tmp'):
+                try:
+                    os.remove(os.path.join(self.out_dir, file_name))
+                except OSError:
+                    pass
+
+        sizes = manifest['digest']['encodings']
+        logging.info(f"Digest artifacts: {len(manifest['categories'])} categories, "
+                     + ", ".join(f"{encoding} {variant['length']:,} B" for encoding, variant in sizes.items()))
+        return manifest
@@ -0,0 +1,133 @@
+"""Versioned digest writes with a rolling journal of per-cycle changes"""
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from url_canon import canonical_url
+
+# Digest fields copied into each journal record; feed_summary is left to full reads
+HEADER_FIELDS = ('date', 'last_updated', 'total_items', 'message')
+
+
+def item_key(item: Dict) -> str:
+    """Identity of an article across cycles: its canonical link, or the title if it has none"""
+    return canonical_url(item.get('link', '')) or f"title:{item.get('title', '')}"
+
+
+def digest_items(digest: Dict) -> Dict[str, Tuple[str, Dict]]:
+    """Key -> (category, item) for every article in a digest"""
+    items = {}
+    for category, articles in (digest.get('categories') or {}).items():
+        for item in articles:
+            items.setdefault(item_key(item), (category, item))
+    return items
+
+
+def diff_digests(previous: Dict, current: Dict) -> Dict[str, List]:
+    """Articles added, changed (content or category) and removed between two digests"""
+    before = digest_items(previous)
+    after = digest_items(current)
+    added, updated = [], []
+    for key, (category, item) in after.items():
+        if key not in before:
+            added.append({'category': category, 'item': item})
+        elif before[key] != (category, item):
+            updated.append({'category': category, 'item': item})
+    removed = [item.get('link', '') or key for key, (_, item) in before.items() if key not in after]
+    return {'added': added, 'updated': updated, 'removed': removed}
+
+
+def write_json_atomic(path: str, data, **dump_args):
+    """Write JSON to a temp file next to path and rename it over path, so readers never see half a file"""
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_args)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+class DigestStore:
+    """latest_digest.json plus a JSON-lines journal of the changes between versions.
+
+    Every publish gets the next version number. The journal record for version
+    V holds the articles added, updated (with category) and removed by link
+    since version `base`, which is V - 1; base is null when the previous digest
+    could not be read, so a consumer older than that must re-read the full
+    digest. Only the last max_entries records are kept.
+    """
+
+    def __init__(self, digest_file: str = 'latest_digest.json',
+                 journal_file: str = 'digest_journal.jsonl', max_entries: int = 288):
+        self.digest_file = digest_file
+        self.journal_file = journal_file
+        self.max_entries = max(1, max_entries)
+
+    def _load_digest(self) -> Optional[Dict]:
+        try:
+            with open(self.digest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _journal_lines(self) -> List[str]:
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                return [line for line in f.read().splitlines() if line.strip()]
+        except OSError:
+            return []
+
+    def _last_journal_version(self, lines: List[str]) -> int:
+        for line in reversed(lines):
+            try:
+                return int(json.loads(line)['version'])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return 0
+
+    def _append_journal(self, lines: List[str], record: Dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        if len(lines) + 1 > self.max_entries:
+            tmp_file = f"{self.journal_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines[-(self.max_entries - 1):] + [line]) + '\n')
+            os.replace(tmp_file, self.journal_file)
+        else:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def publish(self, digest: Dict) -> Dict:
+        """Write digest as the next version and journal its changes; returns the journal record"""
+        previous = self._load_digest()
+        lines = self._journal_lines()
+        previous_version = previous.get('version') if isinstance(previous, dict) else None
+        if not isinstance(previous_version, int):
+            previous_version = None
+        # Never reuse a version number, even if the digest file was lost
+        version = max(previous_version or 0, self._last_journal_version(lines)) + 1
+
+        changes = diff_digests(previous or {}, digest)
+        record = {
+            'version': version,
+            'base': previous_version if previous_version == version - 1 else None,
+            **{field: digest[field] for field in HEADER_FIELDS if field in digest},
+            **changes
+        }
+
+        # Digest first: a crash before the journal append leaves a gap, which
+        # consumers treat as "re-read the full digest", never a wrong delta
+        write_json_atomic(self.digest_file, {**digest, 'version': version}, indent=2, ensure_ascii=False)
+        self._append_journal(lines, record)
+
+        logging.info(f"Digest version {version}: {len(changes['added'])} added, "
+                     f"{len(changes['updated'])} updated, {len(changes['removed'])} removed")
+        return record
+
+
+def digest_store_from_config(config: Dict, digest_file: str = 'latest_digest.json') -> DigestStore:
+    return DigestStore(
+        digest_file,
+        config.get('digest_journal_file', 'digest_journal.jsonl'),
+        config.get('digest_journal_entries', 288)
+    )
@@ -0,0 +1,92 @@
+"""Persistent ledger of feed entries that were already extracted"""
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class EntryLedger:
+    """Remembers each entry (by GUID or link) with the item it produced.
+
+    Known entries are reused without date parsing or HTML cleaning. Entries
+    that were too old are remembered too (with no item) so they are skipped.
+    Records are kept for retention_hours, which should equal the recency
+    window so an entry is never re-processed while it could still be used.
+    Keys are indexed by source so a parse worker can be sent just its feed's.
+    """
+
+    def __init__(self, ledger_file: str = 'entry_ledger.json', retention_hours: int = 48):
+        self.ledger_file = ledger_file
+        self.retention_hours = retention_hours
+        self.ledger = self._load()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._by_source = {}
+        for key in self.ledger:
+            self._by_source.setdefault(key_source(key), set()).add(key)
+
+    def _load(self) -> Dict:
+        """Load ledger from file"""
+        if not os.path.exists(self.ledger_file):
+            return {}
+
+        try:
+            with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def save(self):
+        """Prune old records and write the ledger if anything changed"""
+        with self._lock:
+            cutoff = time.time() - self.retention_hours * 3600
+            expired = [key for key, record in self.ledger.items() if record['seen'] < cutoff]
+            for key in expired:
+                del self.ledger[key]
+                self._by_source.get(key_source(key), set()).discard(key)
+
+            if not (self._dirty or expired):
+                return
+            tmp_file = f"{self.ledger_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.ledger, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.ledger_file)
+            self._dirty = False
+
+    def lookup(self, key: str) -> tuple[bool, Optional[Dict]]:
+        """(known, item): item is None if the entry is unknown, too old or no longer recent"""
+        record = self.ledger.get(key)
+        if record is None:
+            return False, None
+        if record['item'] is None or record['expires'] < time.time():
+            return True, None
+        return True, record['item']
+
+    def known_keys(self, source: str) -> frozenset:
+        """Every key recorded for a source"""
+        with self._lock:
+            return frozenset(self._by_source.get(source, ()))
+
+    def record(self, key: str, item: Optional[Dict]):
+        """Remember an entry and the item it produced (None if it was skipped as old)"""
+        expires = 0
+        if item is not None:
+            expires = item['published_ts'] + self.retention_hours * 3600
+
+        with self._lock:
+            self.ledger[key] = {'seen': time.time(), 'expires': expires, 'item': item}
+            self._by_source.setdefault(key_source(key), set()).add(key)
+            self._dirty = True
+
+
+def key_source(key: str) -> str:
+    return key.partition('|')[0]
+
+
+def entry_key(source: str, entry) -> Optional[str]:
+    """Ledger key for a feed entry: its GUID, falling back to the link"""
+    entry_id = entry.get('id') or entry.get('link')
+    if not entry_id:
+        return None
+    return f"{source}|{entry_id}"
@@ -0,0 +1,181 @@
+"""Asyncio feed fetcher with a shared, pooled HTTP client"""
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from feed_health import CircuitOpenError, FeedHealthStore
+from metrics import metrics
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Same retry policy as the tenacity decorator on app.fetch_feed_with_retry
+RETRY_ATTEMPTS = 3
+RETRY_MIN_WAIT = 1
+RETRY_MAX_WAIT = 10
+
+
+class FetchResponse(NamedTuple):
+    """The parts of a response the parser needs (mirrors requests.Response)"""
+    status_code: int
+    headers: Any
+    content: bytes
+    hedged: bool = False
+    elapsed: float = 0.0  # seconds holding a connection slot, excluding the wait for one
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff in seconds after the given (1-based) failed attempt"""
+    return min(RETRY_MAX_WAIT, max(RETRY_MIN_WAIT, 2 ** (attempt - 1)))
+
+
+class FeedFetcher:
+    """Downloads feeds over one keep-alive connection pool.
+
+    A global semaphore caps requests in flight and a per-host semaphore
+    caps concurrent connections to any single publisher.
+    """
+
+    def __init__(self, max_in_flight: int = 50, per_host_limit: int = 4, timeout: int = 10):
+        self.max_in_flight = max_in_flight
+        self.per_host_limit = per_host_limit
+        self.timeout = timeout
+        self._in_flight = None
+        self._host_limits = {}
+        self._session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight,
+            limit_per_host=self.per_host_limit,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT}
+        )
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _get(self, url: str, headers: Dict[str, str], started: asyncio.Event = None) -> FetchResponse:
+        """Single GET; waiting for a slot does not count against the timeout"""
+        # Take the host slot first so a busy host cannot hold global slots
+        async with self._host_limit(url), self._in_flight:
+            if started is not None:
+                started.set()
+            start = time.monotonic()
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            async with self._session.get(url, headers=headers, timeout=timeout) as response:
+                response.raise_for_status()
+                content = await response.read()
+                return FetchResponse(response.status, response.headers, content,
+                                     elapsed=time.monotonic() - start)
+
+    async def fetch(self, url: str, headers: Dict[str, str] = None, attempts: int = RETRY_ATTEMPTS,
+                    started: asyncio.Event = None) -> FetchResponse:
+        """GET with retries; backoff sleeps never block a thread or a slot.
+
+        started, if given, is set once the first attempt holds its connection slots.
+        """
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._get(url, headers or {}, started)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == attempts:
+                    raise
+                delay = backoff_delay(attempt)
+                logging.debug(f"Retrying {url} in {delay}s after {type(e).__name__}: {e}")
+                await asyncio.sleep(delay)
+
+    async def hedged_fetch(self, url: str, headers: Dict[str, str] = None, hedge_after: float = None,
+                           attempts: int = RETRY_ATTEMPTS) -> FetchResponse:
+        """fetch, plus a second identical request if the first is still running after hedge_after seconds.
+
+        The first to succeed wins and the other is cancelled; if both fail the first one's error is raised.
+        """
+        started = asyncio.Event()
+        first = asyncio.create_task(self.fetch(url, headers, attempts, started))
+        if hedge_after is None:
+            return await first
+
+        # The hedge timer starts once the request is on the wire, not while it queues for a slot
+        waiter = asyncio.create_task(started.wait())
+        await asyncio.wait({first, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        waiter.cancel()
+        if not first.done():
+            await asyncio.wait({first}, timeout=hedge_after)
+        if first.done():
+            return first.result()
+
+        logging.debug(f"Hedging {url} after {hedge_after:.2f}s")
+        pending = {first, asyncio.create_task(self.fetch(url, headers, attempts))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()._replace(hedged=True)
+            return first.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+async def _fetch_all(feeds: List[Dict], handle_feed: Callable, headers_for: Optional[Callable],
+                     max_in_flight: int, per_host_limit: int, timeout: int,
+                     health: Optional[FeedHealthStore], hedge_factor: Optional[float]) -> List[Any]:
+    loop = asyncio.get_running_loop()
+
+    async with FeedFetcher(max_in_flight, per_host_limit, timeout) as fetcher:
+        async def fetch_one(feed: Dict):
+            url = feed['url']
+            response: Optional[FetchResponse] = None
+            error: Optional[Exception] = None
+            if health is not None and not health.allow(url):
+                error = CircuitOpenError(url)
+            else:
+                attempts = 1 if health is not None and health.is_probe(url) else RETRY_ATTEMPTS
+                hedge_after = health.hedge_delay(url, hedge_factor) if health is not None and hedge_factor else None
+                start = time.monotonic()
+                try:
+                    headers = headers_for(url) if headers_for else None
+                    response = await fetcher.hedged_fetch(url, headers, hedge_after, attempts)
+                except Exception as e:
+                    error = e
+                seconds = response.elapsed if response is not None else time.monotonic() - start
+                metrics.observe('feed_request_seconds', seconds, mode='async')
+                if health is not None:
+                    health.record(url, seconds, error)
+            # Parsing is CPU work, keep it off the event loop
+            return await loop.run_in_executor(None, handle_feed, feed, response, error)
+
+        tasks = [asyncio.create_task(fetch_one(feed)) for feed in feeds]
+        return [await task for task in asyncio.as_completed(tasks)]
+
+
+def fetch_feeds_async(feeds: List[Dict], handle_feed: Callable, headers_for: Callable = None,
+                      max_in_flight: int = 50, per_host_limit: int = 4, timeout: int = 10,
+                      health: FeedHealthStore = None, hedge_factor: float = None) -> List[Any]:
+    """Download all feeds concurrently and pass each response to handle_feed.
+
+    handle_feed(feed, response, error) runs in a worker thread as soon as its
+    feed finishes; results are returned in completion order. headers_for(url)
+    may supply extra request headers, e.g. conditional GET validators.
+    With a health store, feeds whose breaker is open are not requested
+    (error is a CircuitOpenError), and with hedge_factor a feed still running
+    after hedge_factor x its p95 latency gets a second request.
+    """
+    return asyncio.run(_fetch_all(feeds, handle_feed, headers_for, max_in_flight, per_host_limit, timeout,
+                                  health, hedge_factor))
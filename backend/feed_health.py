@@ -0,0 +1,165 @@
+"""Per-feed health: fetch latency percentiles, a circuit breaker and hedge timing"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Callable, Dict, Optional, Tuple
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Latencies kept per feed for percentiles, and the fewest needed before hedging
+LATENCY_WINDOW = 50
+MIN_HEDGE_SAMPLES = 5
+
+# With few samples one slow response is the p95; never wait longer than this many medians to hedge
+HEDGE_MAX_MEDIANS = 4
+
+
+class CircuitOpenError(Exception):
+    """The feed's breaker is open; it was not requested this cycle"""
+
+
+def percentile(values, fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of values, None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FeedHealthStore:
+    """Fetch outcomes per feed URL, persisted between cycles.
+
+    After failure_threshold fetches in a row fail (each after its retries)
+    the breaker opens and the feed is skipped. Once the cool-down has passed
+    one probe is allowed (half-open), with no retries: success closes the
+    breaker, failure re-opens it with twice the cool-down, up to max_cooldown.
+    """
+
+    def __init__(self, state_file: str = 'feed_health.json', failure_threshold: int = 3,
+                 cooldown: float = 300, max_cooldown: float = 6 * 3600, clock=time.time):
+        self.state_file = state_file
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.clock = clock
+        self.state = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write health state to file (atomic replace)"""
+        with self._lock:
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, separators=(',', ':'))
+            os.replace(tmp_file, self.state_file)
+
+    def _entry(self, url: str) -> Dict:
+        return self.state.setdefault(url, {
+            'breaker': CLOSED, 'failures': 0, 'opened_at': None,
+            'cooldown': self.base_cooldown, 'latencies': [], 'last_error': None
+        })
+
+    def allow(self, url: str) -> bool:
+        """Whether to request the feed now; moves an open breaker to half-open once its cool-down has passed"""
+        with self._lock:
+            entry = self._entry(url)
+            if entry['breaker'] == OPEN:
+                if self.clock() < entry['opened_at'] + entry['cooldown']:
+                    return False
+                entry['breaker'] = HALF_OPEN
+                logging.info(f"Circuit half-open for {url}, probing")
+            return True
+
+    def is_probe(self, url: str) -> bool:
+        """A half-open probe gets a single attempt"""
+        return self._entry(url)['breaker'] == HALF_OPEN
+
+    def record(self, url: str, seconds: float, error: Exception = None):
+        """Record one fetch (after its retries): latency on success, a failure otherwise"""
+        with self._lock:
+            entry = self._entry(url)
+            if error is None:
+                entry['latencies'] = (entry['latencies'] + [round(seconds, 3)])[-LATENCY_WINDOW:]
+                if entry['breaker'] != CLOSED:
+                    logging.info(f"Circuit closed for {url}")
+                entry.update(breaker=CLOSED, failures=0, opened_at=None, cooldown=self.base_cooldown)
+                return
+
+            entry['failures'] += 1
+            entry['last_error'] = f"{type(error).__name__}: {error}"[:200]
+            if entry['breaker'] == HALF_OPEN:
+                entry['cooldown'] = min(self.max_cooldown, entry['cooldown'] * 2)
+            elif entry['failures'] < self.failure_threshold:
+                return
+            entry['breaker'] = OPEN
+            entry['opened_at'] = self.clock()
+            logging.warning(f"Circuit open for {url} after {entry['failures']} failures, "
+                            f"next probe in {entry['cooldown']:.0f}s")
+
+    def hedge_delay(self, url: str, factor: float = 1.0) -> Optional[float]:
+        """Seconds after which a second request is worth sending: factor x the feed's p95 latency,
+        but no more than HEDGE_MAX_MEDIANS x its median"""
+        latencies = self._entry(url)['latencies']
+        if len(latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        return min(percentile(latencies, 0.95), HEDGE_MAX_MEDIANS * percentile(latencies, 0.5)) * factor
+
+    def summary(self, url: str) -> Dict:
+        """Breaker state and latency percentiles (ms) for feed_summary"""
+        entry = self._entry(url)
+        latencies = entry['latencies']
+        return {
+            'breaker': entry['breaker'],
+            'consecutive_failures': entry['failures'],
+            'latency_ms': {
+                name: round(percentile(latencies, fraction) * 1000) if latencies else None
+                for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99))
+            }
+        }
+
+
+def hedged_call(call: Callable, delay: Optional[float], executor: Executor) -> Tuple[object, bool]:
+    """(result, hedged): call once, and again if the first has not finished after delay seconds.
+
+    The first call to succeed wins; the other is left to finish in the
+    background. If both fail, the first call's error is raised.
+    """
+    if delay is None:
+        return call(), False
+    first = executor.submit(call)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result(), False
+
+    pending = {first, executor.submit(call)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result(), True
+    return first.result(), True
+
+
+def health_from_config(config: Dict) -> Optional[FeedHealthStore]:
+    if not config.get('feed_breaker', True):
+        return None
+    return FeedHealthStore(
+        config.get('feed_health_file', 'feed_health.json'),
+        failure_threshold=config.get('breaker_failures', 3),
+        cooldown=config.get('breaker_cooldown_seconds', 300),
+        max_cooldown=config.get('breaker_max_cooldown_seconds', 6 * 3600)
+    )
@@ -0,0 +1,170 @@
+"""Feed body -> extracted items, in the calling thread or on a pool of worker processes; cleaning of selected items"""
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import feedparser
+
+from date_utils import get_entry_date, is_recent_timestamp
+from entry_ledger import entry_key
+from metrics import metrics
+from text_cleaner import clean_text
+from url_canon import entry_url
+
+# Marks an entry the ledger already has; the caller reuses the ledger's item
+KNOWN = 'known'
+
+# Set on items whose title and summary are still raw feed HTML; finish_items() cleans them
+RAW_TEXT = '_raw_text'
+
+# Process pool shared by every cycle, created on first use
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class ParsedFeed(NamedTuple):
+    """Compact result of parsing one feed body: what crosses the process boundary.
+
+    entries holds one (ledger key, item) pair per entry: item is KNOWN for
+    entries already in the ledger and None for entries outside the recency
+    window. No feedparser objects are kept, so results pickle small.
+    """
+    entries: List[Tuple]
+    items_failed: int
+    parse_seconds: float = 0.0
+    warning: Optional[str] = None
+    error: Optional[str] = None
+
+
+def extract_entries(name: str, parsed_feed, recency_hours: int = 48,
+                    is_known: Callable[[str], bool] = None) -> ParsedFeed:
+    """Date-filter the entries of a parsed feed; entries is_known() accepts are not touched.
+
+    Title and summary stay raw (marked RAW_TEXT): only items that are
+    selected for the digest go through clean_text, in finish_items().
+    """
+    warning = None
+    if parsed_feed.bozo:
+        warning = f"Feed parsing issues for {name}: {parsed_feed.bozo_exception}"
+
+    # Check if feed returned entries
+    if not hasattr(parsed_feed, 'entries') or len(parsed_feed.entries) == 0:
+        return ParsedFeed([], 1, warning=warning, error=f"No entries found for {name}")
+
+    entries = []
+    items_failed = 0
+    for entry in parsed_feed.entries:
+        try:
+            # Entries handled in an earlier cycle skip date parsing and cleaning
+            key = entry_key(name, entry) if is_known is not None else None
+            if key is not None and is_known(key):
+                entries.append((key, KNOWN))
+                continue
+
+            # Parse the date once: epoch for the recency filter, ISO string for output
+            published_ts, published_date = get_entry_date(entry)
+
+            # Skip old articles (outside the recency window)
+            if not is_recent_timestamp(published_ts, hours=recency_hours):
+                if key is not None:
+                    entries.append((key, None))
+                continue
+
+            entries.append((key, {
+                'title': getattr(entry, 'title', ''),
+                'summary': getattr(entry, 'summary', '') or getattr(entry, 'description', ''),
+                # The publisher's URL as users should see it; canonical_url() is only ever a key
+                'link': entry_url(entry),
+                'published': published_date,
+                'published_ts': published_ts,
+                'source': name,
+                RAW_TEXT: True
+            }))
+
+        except Exception as e:
+            logging.error(f"Error processing entry from {name}: {type(e).__name__}: {e}")
+            items_failed += 1
+
+    return ParsedFeed(entries, items_failed, warning=warning)
+
+
+def parse_feed_content(name: str, content: bytes, recency_hours: int = 48,
+                       known_keys: frozenset = None) -> ParsedFeed:
+    """feedparser + extract_entries for one feed body; runs in a pool worker"""
+    start = time.perf_counter()
+    parsed_feed = feedparser.parse(content)
+    parse_seconds = time.perf_counter() - start
+    result = extract_entries(name, parsed_feed, recency_hours,
+                             known_keys.__contains__ if known_keys is not None else None)
+    return result._replace(parse_seconds=parse_seconds)
+
+
+def finish_items(items: List[Dict]) -> List[Dict]:
+    """clean_text the title and summary of raw items, in place: the ledger and feed state hold the same dicts,
+    so an item is cleaned once however often it is selected"""
+    start = time.perf_counter()
+    cleaned = 0
+    for item in items:
+        if item.pop(RAW_TEXT, False):
+            item['title'] = clean_text(item.get('title', ''))
+            item['summary'] = clean_text(item.get('summary', ''))
+            cleaned += 1
+    if cleaned:
+        metrics.observe('stage_seconds', time.perf_counter() - start, stage='clean_text')
+        metrics.inc('items_total', cleaned, stage='cleaned')
+    return items
+
+
+def parse_feed(name: str, content: bytes, recency_hours: int = 48, known_keys: frozenset = None,
+               pool: ProcessPoolExecutor = None) -> ParsedFeed:
+    """parse_feed_content on the pool if given (blocking the calling fetch thread), else right here"""
+    if pool is not None:
+        try:
+            return pool.submit(parse_feed_content, name, content, recency_hours, known_keys).result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); start a fresh pool next cycle
+            logging.error(f"Parse pool broken, parsing {name} in-process: {e}")
+            discard_parse_pool(pool)
+    return parse_feed_content(name, content, recency_hours, known_keys)
+
+
+def get_parse_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """The shared parse pool with the given number of workers, or None (parse in the calling thread) for 0.
+
+    Workers are spawned, not forked: the pool starts from fetch threads, and
+    forking a multi-threaded process can copy locks held by other threads.
+    They live as long as the service, so the start-up cost is paid once.
+    """
+    global _pool, _pool_workers
+    if workers <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+            logging.info(f"Parsing feeds on {workers} worker processes ({os.cpu_count()} CPUs)")
+        return _pool
+
+
+def discard_parse_pool(pool: ProcessPoolExecutor):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def parse_workers_from_config(config: Dict) -> int:
+    """PARSE_WORKERS: 0 parses in the fetch threads, 'auto' uses one worker per CPU"""
+    workers = str(config.get('parse_workers', 0)).strip().lower()
+    if workers == 'auto':
+        return os.cpu_count() or 1
+    return max(0, int(workers))
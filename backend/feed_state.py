@@ -0,0 +1,88 @@
+"""Persistent per-feed validators for conditional GET"""
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+
+class FeedStateStore:
+    """ETag, Last-Modified, body hash and last extracted items for each feed URL"""
+
+    def __init__(self, state_file: str = 'feed_state.json'):
+        self.state_file = state_file
+        self.state = self._load()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def _load(self) -> Dict:
+        """Load state from file"""
+        if not os.path.exists(self.state_file):
+            return {}
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except:
+            return {}
+
+    def save(self):
+        """Write state to file if anything changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp_file = f"{self.state_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_file, self.state_file)
+            self._dirty = False
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Conditional request headers for a feed we have seen before"""
+        entry = self.state.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def unchanged_items(self, url: str, status: int, content: Optional[bytes]) -> Optional[List[Dict]]:
+        """Previously extracted items if the feed has not changed, else None"""
+        entry = self.state.get(url)
+        if not entry:
+            return None
+
+        if status == 304:
+            return entry.get('items', [])
+        if content is not None and entry.get('content_hash') == content_hash(content):
+            return entry.get('items', [])
+        return None
+
+    def last_items(self, url: str) -> List[Dict]:
+        """Items from the last full parse of url, served while the feed is unreachable"""
+        return self.state.get(url, {}).get('items', [])
+
+    def body_size(self, url: str) -> int:
+        """Size of the last full body downloaded for url"""
+        return self.state.get(url, {}).get('size', 0)
+
+    def record(self, url: str, headers, content: bytes, items: List[Dict]):
+        """Remember validators and extracted items after a full parse"""
+        with self._lock:
+            self.state[url] = {
+                'etag': headers.get('ETag'),
+                'last_modified': headers.get('Last-Modified'),
+                'content_hash': content_hash(content),
+                'size': len(content),
+                'items': items
+            }
+            self._dirty = True
+
+
+def content_hash(content: bytes) -> str:
+    """Stable digest of a feed body"""
+    return hashlib.sha1(content).hexdigest()
@@ -0,0 +1,71 @@
+"""Top-K item selection across feeds by recency and per-source weight and quota (sources.yml)"""
+import heapq
+import time
+from itertools import chain
+from typing import Dict, List
+
+# An item this many hours old scores half of a new one from a source of the same weight
+DEFAULT_HALF_LIFE_HOURS = 12
+
+
+def item_score(item: Dict, weight: float, now: float, half_life_hours: float = DEFAULT_HALF_LIFE_HOURS) -> float:
+    """Source weight decayed by the item's age; uses only published_ts, so raw items can be ranked"""
+    age_hours = max(0.0, now - item.get('published_ts', now)) / 3600
+    return weight * 0.5 ** (age_hours / half_life_hours)
+
+
+class TopKSelector:
+    """Keeps the max_items best items seen so far while feeds complete.
+
+    Each source has a min-heap bounded by its quota (sources.yml "quota",
+    else max_items), so an item that cannot make the final cut is dropped
+    as soon as it arrives and memory stays at sum(quotas). selected() takes
+    the best max_items across the sources' heaps. Ties go to the source
+    listed first in sources.yml and then to the entry listed first in its
+    feed, so the selection does not depend on which feed answered first.
+    """
+
+    def __init__(self, feeds: List[Dict], max_items: int,
+                 half_life_hours: float = DEFAULT_HALF_LIFE_HOURS, now: float = None):
+        self.max_items = max_items
+        self.half_life_hours = half_life_hours
+        self.now = now or time.time()
+        self.weights = {feed['name']: float(feed.get('weight', 1.0)) for feed in feeds}
+        self.quotas = {feed['name']: int(feed.get('quota') or 0) for feed in feeds}
+        self.order = {feed['name']: index for index, feed in enumerate(feeds)}
+        self.seen = 0
+        self._heaps = {}
+        self._sequence = 0
+
+    def add(self, name: str, items: List[Dict]):
+        """Offer one feed's items"""
+        limit = min(self.quotas.get(name) or self.max_items, self.max_items)
+        if limit <= 0:
+            return
+        weight = self.weights.get(name, 1.0)
+        order = -self.order.get(name, len(self.order))
+        heap = self._heaps.setdefault(name, [])
+        for position, item in enumerate(items):
+            self.seen += 1
+            self._sequence += 1
+            # The sequence number keeps the item dict itself out of comparisons
+            entry = (item_score(item, weight, self.now, self.half_life_hours), order, -position,
+                     -self._sequence, item)
+            if len(heap) < limit:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+
+    def selected(self) -> List[Dict]:
+        """The best max_items items, best first"""
+        best = heapq.nlargest(self.max_items, chain.from_iterable(self._heaps.values()))
+        return [entry[-1] for entry in best]
+
+
+def select_items(feeds: List[Dict], items_by_source: Dict[str, List[Dict]], max_items: int,
+                 half_life_hours: float = DEFAULT_HALF_LIFE_HOURS) -> List[Dict]:
+    """TopKSelector over items already grouped by source"""
+    selector = TopKSelector(feeds, max_items, half_life_hours)
+    for name, items in items_by_source.items():
+        selector.add(name, items)
+    return selector.selected()
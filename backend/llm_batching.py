@@ -0,0 +1,110 @@
+"""Token-budgeted batch planning and compact prompt encoding for LLM calls"""
+import json
+from typing import Dict, List, Optional, Tuple
+
+# Rough size of the instructions sent with every batch, and of each item's answer
+PROMPT_OVERHEAD_TOKENS = 400
+OUTPUT_TOKENS_PER_ITEM = 120
+
+# Summaries beyond this add tokens without changing a 22-word one-liner
+MAX_SUMMARY_CHARS = 600
+
+
+def count_tokens(text: str) -> int:
+    """Cheap token estimate: about 4 characters per token for English text"""
+    return len(text) // 4 + 1
+
+
+def encode_item(item: Dict, item_id: str, max_summary_chars: int = MAX_SUMMARY_CHARS) -> Dict:
+    """Only the fields the model reads; link and published stay local"""
+    return {
+        'id': item_id,
+        'title': item.get('title', ''),
+        'summary': item.get('summary', '')[:max_summary_chars],
+        'source': item.get('source', '')
+    }
+
+
+def item_tokens(item: Dict, max_summary_chars: int = MAX_SUMMARY_CHARS) -> int:
+    """Estimated input plus output tokens one item adds to a batch"""
+    encoded = encode_item(item, 'xx', max_summary_chars)
+    return count_tokens(json.dumps(encoded, ensure_ascii=False, separators=(',', ':'))) + OUTPUT_TOKENS_PER_ITEM
+
+
+def estimate_tokens(items: List[Dict], max_summary_chars: int = MAX_SUMMARY_CHARS) -> int:
+    """Estimated total tokens of one batch request"""
+    return PROMPT_OVERHEAD_TOKENS + sum(item_tokens(item, max_summary_chars) for item in items)
+
+
+def plan_batches(items: List[Dict], token_budget: int, max_items: int = 0,
+                 max_summary_chars: int = MAX_SUMMARY_CHARS) -> List[List[Dict]]:
+    """Pack items, in order, into batches that fit token_budget (and max_items if set).
+
+    max_summary_chars must match what encode_batch will be given, or the estimates are off.
+    An item larger than the whole budget still gets a batch of its own.
+    """
+    batches = []
+    current = []
+    current_tokens = PROMPT_OVERHEAD_TOKENS
+    for item in items:
+        tokens = item_tokens(item, max_summary_chars)
+        full = current and (current_tokens + tokens > token_budget or (max_items and len(current) >= max_items))
+        if full:
+            batches.append(current)
+            current = []
+            current_tokens = PROMPT_OVERHEAD_TOKENS
+        current.append(item)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def encode_batch(items: List[Dict], max_summary_chars: int = MAX_SUMMARY_CHARS) -> Tuple[str, Dict[str, Dict]]:
+    """Compact JSON for the prompt, plus the short-ID -> original item map"""
+    items_by_id = {}
+    encoded = []
+    for index, item in enumerate(items):
+        item_id = str(index)
+        items_by_id[item_id] = item
+        encoded.append(encode_item(item, item_id, max_summary_chars))
+    return json.dumps(encoded, ensure_ascii=False, separators=(',', ':')), items_by_id
+
+
+def is_valid_answer(answer) -> bool:
+    """An answer is usable if it is an object with a non-empty one_liner"""
+    if not isinstance(answer, dict):
+        return False
+    one_liner = answer.get('one_liner')
+    return isinstance(one_liner, str) and bool(one_liner.strip())
+
+
+def reconcile_output(items: List[Dict], processed_items: List, items_by_id: Dict[str, Dict]) -> List[Optional[Dict]]:
+    """Match model answers to the input batch by short ID (or echoed link).
+
+    Returns one entry per input item, in input order, with title/source/link/
+    published restored from the input; None marks a missing or invalid answer.
+    """
+    position = {id(item): index for index, item in enumerate(items)}
+    by_link = {item.get('link'): item for item in items if item.get('link')}
+    results = [None] * len(items)
+
+    for answer in processed_items:
+        if not is_valid_answer(answer):
+            continue
+        original = items_by_id.get(str(answer.get('id'))) or by_link.get(answer.get('link'))
+        if original is None:
+            continue
+        index = position[id(original)]
+        if results[index] is not None:
+            continue
+        restored = {
+            **answer,
+            'title': original.get('title', ''),
+            'source': original.get('source', ''),
+            'link': original.get('link', ''),
+            'published': original.get('published', '')
+        }
+        restored.pop('id', None)
+        results[index] = restored
+    return results
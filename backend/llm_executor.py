@@ -0,0 +1,142 @@
+"""Bounded-concurrency, rate-limit-aware execution of LLM batches"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from llm_batching import MAX_SUMMARY_CHARS, estimate_tokens
+from metrics import metrics
+
+# Errors worth retrying; anything else (bad JSON, auth) fails the batch immediately
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount now (going into debt if needed); returns seconds to wait before using it"""
+        with self._lock:
+            self._refill()
+            # A single request larger than the bucket still goes through, it just waits longer
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate) if self.tokens < 0 else 0.0
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one API key"""
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 200000):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def acquire(self, tokens: int):
+        """Block until a request of the given token estimate may be sent"""
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested delay from a 429 response, if any"""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        return None
+    return None
+
+
+def backoff_seconds(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter after the given (1-based) failed attempt"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+def run_batch(batch: List[Dict], call_batch: Callable, fallback: Callable,
+              limiter: RateLimiter, max_attempts: int, max_summary_chars: int = MAX_SUMMARY_CHARS) -> List[Dict]:
+    """Run one batch with its own retry/backoff.
+
+    call_batch returns one answer per input item, None where the answer was
+    missing or invalid; only those items are re-sent, as a smaller follow-up
+    request. Items still unanswered after max_attempts go to fallback.
+    """
+    results = [None] * len(batch)
+    pending = list(range(len(batch)))
+    for attempt in range(1, max_attempts + 1):
+        request = [batch[i] for i in pending]
+        if attempt > 1:
+            metrics.inc('llm_retries_total')
+        limiter.acquire(estimate_tokens(request, max_summary_chars))
+        try:
+            answers = call_batch(request)
+        except RETRYABLE_ERRORS as e:
+            metrics.inc('llm_requests_total', outcome='error')
+            if attempt == max_attempts:
+                logging.error(f"LLM batch failed after {attempt} attempts: {type(e).__name__}: {e}")
+                break
+            delay = retry_after_seconds(e) if isinstance(e, RateLimitError) else None
+            if delay is None:
+                delay = backoff_seconds(attempt)
+            logging.warning(f"LLM batch {type(e).__name__}, retrying in {delay:.1f}s (attempt {attempt}/{max_attempts})")
+            time.sleep(delay)
+            continue
+        except Exception as e:
+            metrics.inc('llm_requests_total', outcome='error')
+            logging.error(f"LLM batch failed: {type(e).__name__}: {e}")
+            break
+
+        for i, answer in zip(pending, answers):
+            results[i] = answer
+        pending = [i for i in pending if results[i] is None]
+        if not pending:
+            break
+        if attempt < max_attempts:
+            logging.warning(f"LLM answered {len(request) - len(pending)}/{len(request)} items, "
+                            f"re-sending {len(pending)} (attempt {attempt}/{max_attempts})")
+
+    if pending:
+        metrics.inc('llm_fallback_items_total', len(pending))
+        for i, item in zip(pending, fallback([batch[i] for i in pending])):
+            results[i] = item
+    return results
+
+
+def run_batches(batches: List[List[Dict]], call_batch: Callable, fallback: Callable,
+                concurrency: int = 4, limiter: RateLimiter = None, max_attempts: int = 3,
+                max_summary_chars: int = MAX_SUMMARY_CHARS) -> List[Dict]:
+    """Run batches concurrently; output is in batch order regardless of completion order.
+
+    max_summary_chars is what call_batch encodes summaries to, for the rate limiter's token estimates.
+    """
+    limiter = limiter or RateLimiter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [
+            executor.submit(run_batch, batch, call_batch, fallback, limiter, max_attempts, max_summary_chars)
+            for batch in batches
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result())
+    return results
@@ -0,0 +1,190 @@
+"""In-process pipeline metrics: counters and latency histograms, exported as Prometheus text and JSON"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds, from a cache lookup to a slow LLM batch
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+PREFIX = 'news_'
+
+HELP = {
+    'stage_seconds': 'Duration of one pipeline stage',
+    'feed_request_seconds': 'Duration of one feed request, retries and hedging included',
+    'llm_batch_seconds': 'Duration of one LLM request',
+    'items_total': 'Items seen at each pipeline stage',
+    'cache_lookups_total': 'Cache lookups by tier and result',
+    'llm_tokens_total': 'LLM tokens reported by the API, by kind',
+    'llm_requests_total': 'LLM requests by outcome',
+    'llm_retries_total': 'LLM requests re-sent after an error or missing answers',
+    'llm_fallback_items_total': 'Items that got rule-based fallback output',
+    'feed_fetches_total': 'Feed fetches by outcome',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(pairs: Labels) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect and three additions"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile (the largest bound if beyond it)"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms keyed by name and labels.
+
+    Values are cumulative for the life of the process, like Prometheus
+    counters; write_prometheus() and snapshot() read them without resetting.
+    """
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.enabled = True
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled or not amount:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float, **labels):
+        if not self.enabled:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str = 'stage_seconds', **labels):
+        """Time the with-block into a histogram (also when it raises)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly view for service_status.json: counter values, histogram count/sum/quantiles"""
+        def series_name(name: str, key: Labels) -> str:
+            return name + ('{' + ','.join(f"{k}={v}" for k, v in key) + '}' if key else '')
+
+        with self._lock:
+            counters = {
+                series_name(name, key): value
+                for name, series in sorted(self.counters.items()) for key, value in sorted(series.items())
+            }
+            histograms = {
+                series_name(name, key): {
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 4),
+                    'avg': round(histogram.sum / histogram.count, 4) if histogram.count else 0.0,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99)
+                }
+                for name, series in sorted(self.histograms.items()) for key, histogram in sorted(series.items())
+            }
+        return {
+            'counters': counters,
+            'histograms': histograms,
+            'cache_hit_ratio': self.cache_hit_ratio()
+        }
+
+    def cache_hit_ratio(self) -> Dict[str, float]:
+        """Hits / lookups per cache tier since start"""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            lookups = list(self.counters.get('cache_lookups_total', {}).items())
+        for key, value in lookups:
+            labels = dict(key)
+            hits_lookups = totals.setdefault(labels.get('tier', ''), [0, 0])
+            hits_lookups[1] += value
+            if labels.get('result') == 'hit':
+                hits_lookups[0] += value
+        return {tier: round(hits / lookups, 4) for tier, (hits, lookups) in totals.items() if lookups}
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_label_text(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{full}_bucket{_label_text(key + (('le', f'{bound:g}'),))} {cumulative}")
+                    lines.append(f"{full}_bucket{_label_text(key + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{full}_sum{_label_text(key)} {histogram.sum:.6f}")
+                    lines.append(f"{full}_count{_label_text(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str):
+        """Write the text format atomically, for node_exporter's textfile collector or a static scrape"""
+        tmp_file = f"{path}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_file, path)
+
+
+# One registry per process, like the logging module's root logger
+metrics = MetricsRegistry()
@@ -0,0 +1,198 @@
+"""Cross-source near-duplicate detection with MinHash signatures and LSH banding"""
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
+
+from metrics import metrics
+from url_canon import canonical_url
+
+# 64 MinHash values, compared in 32 bands of 2: pairs around the default
+# threshold become candidates with ~87% probability, unrelated pairs rarely
+NUM_PERM = 64
+BAND_ROWS = 2
+
+# Bands shared by more items than this hash a very common word, not a story;
+# real duplicates also meet in other bands
+MAX_BUCKET_SIZE = 100
+
+# Leading summary words used next to the title; summaries differ most between outlets
+SUMMARY_WORDS = 10
+
+STOPWORDS = frozenset(
+    "a an the and or of to in on for at by with from as is are was were be has have had "
+    "its it this that says said after over amid into up out s vs".split()
+)
+WORD = re.compile(r'\w+')
+
+
+def tokens(text: str) -> List[str]:
+    """Lowercased words without stopwords"""
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def features(item: Dict, summary_words: int = SUMMARY_WORDS) -> Set[str]:
+    """Title words and word pairs, plus the first summary words"""
+    title = tokens(item.get('title', ''))
+    shingles = set(title)
+    shingles.update(f"{a} {b}" for a, b in zip(title, title[1:]))
+    shingles.update(tokens(item.get('summary', ''))[:summary_words])
+    return shingles
+
+
+@lru_cache(maxsize=65536)
+def _feature_hashes(feature: str) -> tuple:
+    """NUM_PERM independent 32-bit hashes of one feature"""
+    digest = hashlib.shake_128(feature.encode('utf-8')).digest(NUM_PERM * 4)
+    return tuple(memoryview(digest).cast('I'))
+
+
+def minhash(shingles: Set[str]) -> tuple:
+    """MinHash signature of a feature set"""
+    if not shingles:
+        return ()
+    return tuple(map(min, zip(*(_feature_hashes(feature) for feature in shingles))))
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def find_duplicate_groups(items: List[Dict], threshold: float = 0.25) -> List[List[int]]:
+    """Indices of items grouped by near-duplicate title/summary.
+
+    LSH banding proposes candidate pairs without comparing every pair; each
+    candidate is confirmed with the exact Jaccard similarity of its features.
+    Confirmed pairs are merged most-similar first, and two groups only merge
+    if their representatives also match, so a chain of loosely related
+    stories does not collapse into one. Groups are returned in order of their
+    first item; singletons included.
+    """
+    item_features = [features(item) for item in items]
+    buckets = {}
+    for index, shingles in enumerate(item_features):
+        signature = minhash(shingles)
+        for band in range(0, len(signature), BAND_ROWS):
+            buckets.setdefault((band, signature[band:band + BAND_ROWS]), []).append(index)
+
+    checked = set()
+    matches = []
+    for members in buckets.values():
+        if len(members) > MAX_BUCKET_SIZE:
+            continue
+        for position in range(1, len(members)):
+            other = members[position]
+            for candidate in members[:position]:
+                if (candidate, other) in checked:
+                    continue
+                checked.add((candidate, other))
+                similarity = jaccard(item_features[candidate], item_features[other])
+                if similarity >= threshold:
+                    matches.append((similarity, candidate, other))
+
+    parent = list(range(len(items)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for _, a, b in sorted(matches, reverse=True):
+        root_a, root_b = find(a), find(b)
+        if root_a == root_b:
+            continue
+        # The group's first-joined item represents it
+        if jaccard(item_features[root_a], item_features[root_b]) >= threshold:
+            parent[root_b] = root_a
+
+    groups = {}
+    for index in range(len(items)):
+        groups.setdefault(find(index), []).append(index)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+class NearDuplicateIndex:
+    """Incremental near-duplicate lookup for items that arrive one at a time.
+
+    Each item is compared, through the same LSH buckets, with the stories
+    indexed so far; the first copy to arrive becomes the story.
+    """
+
+    def __init__(self, threshold: float = 0.25):
+        self.threshold = threshold
+        self._features = []
+        self._buckets = {}
+
+    def add(self, item: Dict) -> Optional[int]:
+        """Number of the earlier story this item duplicates, or None after indexing it as a new story"""
+        shingles = features(item)
+        signature = minhash(shingles)
+        keys = [(band, signature[band:band + BAND_ROWS]) for band in range(0, len(signature), BAND_ROWS)]
+
+        best, best_similarity = None, self.threshold
+        compared = set()
+        for key in keys:
+            members = self._buckets.get(key, ())
+            if len(members) > MAX_BUCKET_SIZE:
+                continue
+            for story in members:
+                if story in compared:
+                    continue
+                compared.add(story)
+                similarity = jaccard(shingles, self._features[story])
+                if similarity >= best_similarity:
+                    best, best_similarity = story, similarity
+        if best is not None:
+            return best
+
+        story = len(self._features)
+        self._features.append(shingles)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(story)
+        return None
+
+
+def collapse_near_duplicates(items: List[Dict], threshold: float = 0.25) -> List[Dict]:
+    """One canonical item per story, with the other copies listed as alternates.
+
+    The earliest-published copy is canonical, so the choice (and its cache key)
+    stays stable as later copies arrive.
+    """
+    collapsed = []
+    with metrics.timer(stage='near_dedup'):
+        groups = find_duplicate_groups(items, threshold)
+    for group in groups:
+        if len(group) == 1:
+            collapsed.append(items[group[0]])
+            continue
+        members = sorted(group, key=lambda i: (items[i].get('published_ts', float('inf')), i))
+        canonical = items[members[0]]
+        collapsed.append({
+            **canonical,
+            'alternates': [
+                {
+                    'source': items[i].get('source', ''),
+                    'title': items[i].get('title', ''),
+                    'link': items[i].get('link', '')
+                }
+                for i in members[1:]
+            ]
+        })
+    metrics.inc('items_total', len(collapsed), stage='near_deduped')
+    return collapsed
+
+
+def attach_alternates(processed_items: List[Dict], canonical_items: List[Dict]) -> List[Dict]:
+    """Copy alternates from the canonical raw items onto processed output, by canonical link"""
+    alternates_by_link = {
+        canonical_url(item['link']): item['alternates'] for item in canonical_items
+        if item.get('alternates') and item.get('link')
+    }
+    attached = []
+    for item in processed_items:
+        alternates = alternates_by_link.get(canonical_url(item.get('link', '')))
+        attached.append({**item, 'alternates': alternates} if alternates else item)
+    return attached
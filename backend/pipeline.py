@@ -0,0 +1,227 @@
+"""Streaming fetch -> dedup -> cache -> LLM cycle for the background service"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, List, Tuple
+
+from app import FeedStores, deduplicate_items, fetch_rss_items, make_llm_client, process_uncached_items
+from feed_parsing import finish_items
+from item_selection import TopKSelector
+from llm_batching import MAX_SUMMARY_CHARS, plan_batches
+from llm_executor import RateLimiter
+from near_dedup import NearDuplicateIndex, attach_alternates, collapse_near_duplicates
+from url_canon import canonical_url
+
+# Marks the end of the fetch stage in the item queue
+FETCH_DONE = object()
+
+
+class StreamingPipeline:
+    """One refresh cycle in which LLM work starts as soon as feeds complete.
+
+    Fetch workers push each feed's raw items into a bounded queue; a single
+    intake loop ranks them with a TopKSelector, as the staged mode does.
+    Items that enter the current top max_items are cleaned, de-duplicated
+    (exact link, then near-duplicate) against earlier ones, checked in the
+    caches and packed into LLM batches. A batch is sent when it is full or
+    its first item has waited linger_seconds; items pushed out of the top
+    max_items while they wait are dropped. At most 2 x LLM_CONCURRENCY
+    batches are in flight; beyond that the intake loop blocks, the queue
+    fills and the fetch workers wait, so memory stays bounded.
+
+    Once every feed is in, the final top max_items go through the staged
+    dedup, near-duplicate grouping and cache check, so what is published
+    does not depend on which feed answered first. Items sent early are cache
+    hits by then; the LLM only sees, at the end, a story whose earliest copy
+    arrived after another one was sent, or an item the intake took for a
+    duplicate of one that was later pushed out. Items pushed out after their
+    batch was sent are cached but not published. In a sharded deployment,
+    cache misses another shard has claimed are left to that shard, and items
+    this shard claims are always published, since the other shards skip them.
+
+    Items are cleaned only on the intake loop, and the feed stores (which
+    hold the same dicts) are saved from it once the fetch thread has ended.
+    """
+
+    def __init__(self, config: Dict, cache, content_cache=None, claims=None, stores=None):
+        self.config = config
+        self.cache = cache
+        self.content_cache = content_cache
+        self.claims = claims
+        self.stores = stores or FeedStores(config)
+        self.max_items = config.get('max_items', 50)
+        self.batch_size = config.get('batch_size', 4)
+        self.batch_tokens = config.get('llm_batch_tokens', 4000)
+        self.summary_chars = config.get('llm_summary_chars', MAX_SUMMARY_CHARS)
+        self.linger = config.get('pipeline_linger_seconds', 2.0)
+        self.concurrency = max(1, config.get('llm_concurrency', 4))
+
+        self.items = queue.Queue(maxsize=config.get('pipeline_queue_size', 200))
+        self.in_flight = threading.BoundedSemaphore(self.concurrency * 2)
+        self.selector = TopKSelector(config['feeds'], self.max_items, config.get('select_half_life_hours', 12))
+        self.near_index = NearDuplicateIndex(config.get('near_dup_threshold', 0.25)) \
+            if config.get('near_dedup', True) else None
+
+        self.feed_summary = []
+        self.considered = {}  # id -> item for items that have entered the top max_items (keeps ids unique)
+        self.claimed = []
+        self._lock = threading.Lock()
+        self._start = None
+        self.stats = {'first_item_seconds': None, 'cycle_seconds': None, 'batches': 0, 'cache_hits': 0,
+                      'dropped': 0, 'late': 0}
+
+    def _on_feed(self, name: str, items: List[Dict], feed_info: Dict):
+        """Called by fetch workers as each feed completes; blocks while the queue is full"""
+        self.feed_summary.append(feed_info)
+        self.items.put((name, items))
+
+    def _fetch(self):
+        try:
+            fetch_rss_items(self.config['feeds'], self.max_items, self.config, on_feed=self._on_feed,
+                            stores=self.stores)
+        except Exception as e:
+            logging.error(f"Streaming fetch failed: {type(e).__name__}: {e}")
+        finally:
+            self.items.put(FETCH_DONE)
+
+    def _emit(self, processed_items: List[Dict]):
+        with self._lock:
+            if processed_items and self.stats['first_item_seconds'] is None:
+                self.stats['first_item_seconds'] = round(time.monotonic() - self._start, 3)
+
+    def _process_batch(self, batch: List[Dict], client, limiter: RateLimiter):
+        try:
+            self._emit(process_uncached_items(batch, self.config, self.cache, self.content_cache, client, limiter))
+        except Exception as e:
+            logging.error(f"Streaming LLM batch failed: {type(e).__name__}: {e}")
+        finally:
+            self.in_flight.release()
+
+    def _candidates(self) -> Tuple[List[Dict], set]:
+        """(items that just entered the top max_items, cleaned; ids of the whole current top)"""
+        current = self.selector.selected()
+        new = [item for item in current if id(item) not in self.considered]
+        self.considered.update((id(item), item) for item in new)
+        return finish_items(new), {id(item) for item in current}
+
+    def _admit(self, item: Dict, seen_links: set) -> bool:
+        """Whether the item is a new story rather than a copy of one already admitted"""
+        link = canonical_url(item.get('link', ''))
+        if not link or link in seen_links:
+            return False
+        seen_links.add(link)
+        return self.near_index is None or self.near_index.add(item) is None
+
+    def _finish(self, items: List[Dict], client, limiter: RateLimiter) -> Tuple[List[Dict], int]:
+        """The staged dedup, near-duplicate grouping and cache check over the final items; (processed, stories)"""
+        deduped = deduplicate_items(items)
+        if self.config.get('near_dedup', True):
+            deduped = collapse_near_duplicates(deduped, self.config.get('near_dup_threshold', 0.25))
+        # A re-read of what the intake already looked up: it does not count as hits
+        cached, uncached = self.cache.partition(deduped, count=False)
+        if self.claims is not None and uncached:
+            uncached, _ = self.claims.partition(uncached)
+        self.stats['late'] = len(uncached)
+        late = process_uncached_items(uncached, self.config, self.cache, self.content_cache, client, limiter) \
+            if uncached else []
+        return attach_alternates(cached + late, deduped), len(deduped)
+
+    def run(self) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """(raw items, processed items, feed summary) for one cycle"""
+        self._start = time.monotonic()
+        client = make_llm_client(self.config)
+        limiter = RateLimiter(self.config.get('llm_rpm', 500), self.config.get('llm_tpm', 200000))
+        fetcher = threading.Thread(target=self._fetch, name='pipeline-fetch', daemon=True)
+        fetcher.start()
+
+        seen_links = set()
+        current = set()
+        pending = []
+        pending_since = None
+        done = False
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='pipeline-llm') as executor:
+            while not done:
+                # Wait for feeds, but no longer than the oldest pending item may linger
+                timeout = None
+                if pending:
+                    timeout = max(0.0, pending_since + self.linger - time.monotonic())
+                arrivals = []
+                try:
+                    arrivals.append(self.items.get(timeout=timeout))
+                    while True:
+                        arrivals.append(self.items.get_nowait())
+                except queue.Empty:
+                    pass
+
+                ranked = False
+                for arrival in arrivals:
+                    if arrival is FETCH_DONE:
+                        done = True
+                        continue
+                    self.selector.add(*arrival)
+                    ranked = True
+
+                new_stories = []
+                if ranked:
+                    candidates, current = self._candidates()
+                    new_stories = [item for item in candidates if self._admit(item, seen_links)]
+
+                if new_stories:
+                    cached, uncached = self.cache.partition(new_stories)
+                    if self.claims is not None:
+                        uncached, _ = self.claims.partition(uncached)
+                        self.claimed.extend(uncached)
+                    self.stats['cache_hits'] += len(cached)
+                    self._emit(cached)
+                    if uncached and not pending:
+                        pending_since = time.monotonic()
+                    pending.extend(uncached)
+
+                # Items pushed out of the top while waiting are not sent (claimed ones are published regardless)
+                if pending and self.claims is None:
+                    kept = [item for item in pending if id(item) in current]
+                    self.stats['dropped'] += len(pending) - len(kept)
+                    pending = kept
+
+                # Send every full batch; a partial one only once it has lingered or input has ended
+                while pending:
+                    batch = plan_batches(pending, self.batch_tokens, max_items=self.batch_size,
+                                         max_summary_chars=self.summary_chars)[0]
+                    lingered = time.monotonic() - pending_since >= self.linger
+                    if len(batch) == len(pending) and len(batch) < self.batch_size and not (lingered or done):
+                        break
+                    self.in_flight.acquire()
+                    executor.submit(self._process_batch, batch, client, limiter)
+                    self.stats['batches'] += 1
+                    pending = pending[len(batch):]
+                    pending_since = time.monotonic()
+
+        fetcher.join()
+        selected = finish_items(self.selector.selected())
+        self.stores.save()
+        selected_ids = {id(item) for item in selected}
+        raw_items = selected + [item for item in self.claimed if id(item) not in selected_ids]
+        processed, stories = self._finish(raw_items, client, limiter)
+
+        self.stats['cycle_seconds'] = round(time.monotonic() - self._start, 3)
+        logging.info(f"Streaming cycle: {len(raw_items)} of {self.selector.seen} items, {stories} stories, "
+                     f"{self.stats['cache_hits']} cached, {self.stats['batches']} LLM batches, "
+                     f"{self.stats['dropped']} items pushed out before sending, {self.stats['late']} sent at the end, "
+                     f"first article after {self.stats['first_item_seconds']}s, total {self.stats['cycle_seconds']}s")
+        return raw_items, processed, self.feed_summary
+
+
+def run_streaming_cycle(config: Dict, cache, content_cache=None, claims=None,
+                        stores=None) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Fetch, de-duplicate, check caches and run the LLM as one streaming pass.
+
+    Cache writes from every batch are held and saved once when the cycle ends.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(cache.deferred_writes())
+        if content_cache is not None:
+            stack.enter_context(content_cache.deferred_writes())
+        return StreamingPipeline(config, cache, content_cache, claims, stores).run()
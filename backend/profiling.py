@@ -0,0 +1,198 @@
+"""Opt-in per-cycle profiling for the background service: cProfile, sampled stacks and tracemalloc"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import shutil
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict
+
+# Lines of pstats and tracemalloc output kept in the text reports
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval into collapsed-stack counts.
+
+    cProfile only sees the thread that enabled it; the fetch and LLM work runs
+    on pool threads, so the sampler is what covers the whole cycle. Output is
+    the folded format of flamegraph.pl and speedscope: one "thread;outer;...;inner count" per line.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                labels.append(names.get(ident, str(ident)))
+                self.stacks[';'.join(reversed(labels))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class CycleProfiler:
+    """Profiles the next N service cycles once armed; otherwise cycle() does nothing.
+
+    Arm it with PROFILE_CYCLES at start-up or with SIGUSR1 while running. Each
+    profiled cycle gets its own directory under out_dir with:
+      cpu.prof / cpu.txt      cProfile of the cycle's main thread (load cpu.prof with pstats or snakeviz)
+      stacks.collapsed        sampled stacks of all threads, for flamegraph.pl or speedscope
+      memory.txt              top allocations at the end of the cycle, and the change since the previous
+                              profiled cycle (or since the cycle started, for the first)
+    Only the newest keep directories are kept.
+    """
+
+    def __init__(self, out_dir: str = 'profiles', cycles: int = 0, keep: int = 20,
+                 sample_interval: float = 0.005, trace_frames: int = 10):
+        self.out_dir = out_dir
+        self.keep = max(1, keep)
+        self.sample_interval = sample_interval
+        self.trace_frames = trace_frames
+        self.pending = cycles
+        self.signal_cycles = max(1, cycles or 3)
+        self._previous_snapshot = None
+        self._started_tracemalloc = False
+        self._sequence = 0
+
+    def arm(self, cycles: int = None):
+        """Profile the next cycles (signal-safe: only sets a counter)"""
+        self.pending = cycles or self.signal_cycles
+
+    def install_signal(self):
+        """kill -USR1 <pid> profiles the next cycles; a no-op where SIGUSR1 does not exist (Windows)"""
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda signum, frame: self.arm())
+
+    @contextmanager
+    def cycle(self):
+        if not self.pending:
+            yield
+            return
+        self.pending -= 1
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            self._started_tracemalloc = True
+        if self._previous_snapshot is None:
+            self._previous_snapshot = self._snapshot()
+
+        sampler = StackSampler(self.sample_interval)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+            try:
+                self._write(profile, sampler, elapsed)
+            except OSError as e:
+                logging.error(f"Failed to write cycle profile: {e}")
+            if not self.pending:
+                self._previous_snapshot = None
+                if self._started_tracemalloc:
+                    tracemalloc.stop()
+                    self._started_tracemalloc = False
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, pstats.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+
+    def _write(self, profile: cProfile.Profile, sampler: StackSampler, elapsed: float):
+        # Before the reports below allocate anything
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+
+        self._sequence += 1
+        run_dir = os.path.join(self.out_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{self._sequence:04d}")
+        os.makedirs(run_dir, exist_ok=True)
+
+        profile.dump_stats(os.path.join(run_dir, 'cpu.prof'))
+        text = io.StringIO()
+        stats = pstats.Stats(profile, stream=text)
+        stats.sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+        with open(os.path.join(run_dir, 'cpu.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Cycle took {elapsed:.2f}s (main thread only; see stacks.collapsed for all threads)\n")
+            f.write(text.getvalue())
+
+        sampler.write(os.path.join(run_dir, 'stacks.collapsed'))
+
+        with open(os.path.join(run_dir, 'memory.txt'), 'w', encoding='utf-8') as f:
+            f.write(f"Traced memory: {current / 2 ** 20:.1f} MB now, {peak / 2 ** 20:.1f} MB peak\n\n")
+            f.write(f"Top {TOP_ALLOCATIONS} allocations by line:\n")
+            for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+            f.write("\nLargest changes since the previous snapshot:\n")
+            for stat in snapshot.compare_to(self._previous_snapshot, 'lineno')[:TOP_ALLOCATIONS]:
+                f.write(f"  {stat}\n")
+        self._previous_snapshot = snapshot
+
+        self._rotate()
+        logging.info(f"📈 Cycle profile ({elapsed:.2f}s, {sampler.samples} samples) saved to {run_dir}")
+
+    def _rotate(self):
+        """Delete all but the newest keep profile directories"""
+        runs = sorted(
+            entry for entry in os.listdir(self.out_dir)
+            if os.path.isdir(os.path.join(self.out_dir, entry))
+        )
+        for entry in runs[:-self.keep]:
+            shutil.rmtree(os.path.join(self.out_dir, entry), ignore_errors=True)
+
+
+def profiler_from_config(config: Dict) -> CycleProfiler:
+    profiler = CycleProfiler(
+        config.get('profile_dir', 'profiles'),
+        cycles=config.get('profile_cycles', 0),
+        keep=config.get('profile_keep', 20),
+        sample_interval=config.get('profile_sample_ms', 5) / 1000
+    )
+    if profiler.pending:
+        logging.info(f"Profiling the next {profiler.pending} cycles into {profiler.out_dir}/")
+    return profiler
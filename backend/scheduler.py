@@ -0,0 +1,205 @@
+"""Adaptive per-feed polling: each feed on its own interval, learned from its publishing cadence"""
+import heapq
+import json
+import logging
+import os
+import random
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from date_utils import is_recent_timestamp
+from feed_parsing import finish_items
+from item_selection import DEFAULT_HALF_LIFE_HOURS, select_items
+from url_canon import canonical_url
+
+# Growth of the interval for each poll in a row that found nothing new, and after a failure
+UNCHANGED_BACKOFF = 1.25
+FAILURE_BACKOFF = 2.0
+
+# Weight of the newest cadence estimate; older estimates keep one burst from swinging the interval
+CADENCE_ALPHA = 0.3
+
+# Newest items whose publish times give the cadence estimate
+CADENCE_ITEMS = 20
+
+
+def publishing_gap(items: List[Dict]) -> Optional[float]:
+    """Median seconds between consecutive items, from their publish times; None with fewer than two"""
+    stamps = sorted({item['published_ts'] for item in items if item.get('published_ts')}, reverse=True)
+    stamps = stamps[:CADENCE_ITEMS]
+    if len(stamps) < 2:
+        return None
+    return max(1.0, statistics.median(a - b for a, b in zip(stamps, stamps[1:])))
+
+
+class FeedScheduler:
+    """Priority queue of feeds by next poll time, with per-feed learned intervals.
+
+    After each poll the feed's interval is its estimated gap between items
+    (an average of the median gap seen in its publish times), so a poll finds
+    about one new item and an article waits half a gap on average. It grows
+    by UNCHANGED_BACKOFF for every poll in a row without new links (a 304 or
+    identical body counts as one) and by FAILURE_BACKOFF after a failure, is
+    clamped to [min_interval, max_interval] and jittered so feeds do not fall
+    into lockstep. A feed seen for the first time starts at initial_interval. Learned cadence survives restarts via state_file; the
+    last items of each feed are kept in memory so a digest can be rebuilt from
+    every feed when only some were polled.
+    """
+
+    def __init__(self, feeds: List[Dict], state_file: str = 'feed_schedule.json',
+                 min_interval: float = 120, max_interval: float = 3600,
+                 initial_interval: float = 300, jitter: float = 0.1, clock=time.time):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.initial_interval = initial_interval
+        self.jitter = jitter
+        self.clock = clock
+        self.state_file = state_file
+        self.feeds = {feed['name']: feed for feed in feeds}
+        self.items = {}
+        self.feed_info = {}
+        self.stats = {'polls': 0, 'polls_with_new': 0}
+
+        saved = self._load()
+        now = self.clock()
+        self.state = {}
+        self._heap = []
+        for name in self.feeds:
+            entry = saved.get(name, {})
+            self.state[name] = {
+                'gap': entry.get('gap'),
+                'interval': entry.get('interval', initial_interval),
+                'unchanged': entry.get('unchanged', 0),
+                'failures': entry.get('failures', 0),
+                'last_poll': entry.get('last_poll'),
+                'next_poll': now,
+                'links': set()
+            }
+            # Everything is polled once at start-up so the first digest covers every feed
+            heapq.heappush(self._heap, (now, name))
+
+    def _load(self) -> Dict:
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        """Write learned intervals (atomic replace)"""
+        if not self.state_file:
+            return
+        state = {
+            name: {key: value for key, value in entry.items() if key not in ('links', 'next_poll')}
+            for name, entry in self.state.items()
+        }
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def next_poll_time(self) -> float:
+        """When the next feed falls due"""
+        return self._heap[0][0] if self._heap else self.clock() + self.max_interval
+
+    def due_feeds(self, window: float = 30.0) -> List[Dict]:
+        """Pop every feed due now, or within window seconds, so close neighbours share one poll"""
+        cutoff = self.clock() + window
+        due = []
+        while self._heap and self._heap[0][0] <= cutoff:
+            _, name = heapq.heappop(self._heap)
+            due.append(self.feeds[name])
+        return due
+
+    def _next_interval(self, entry: Dict) -> float:
+        if entry['failures']:
+            interval = entry['interval'] * FAILURE_BACKOFF
+        else:
+            interval = entry['gap'] or self.initial_interval
+            interval *= UNCHANGED_BACKOFF ** entry['unchanged']
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record(self, name: str, items: List[Dict], feed_info: Dict) -> int:
+        """Learn from one poll and schedule the feed's next; returns how many new links it brought"""
+        entry = self.state[name]
+        now = self.clock()
+        self.stats['polls'] += 1
+        entry['last_poll'] = now
+        self.feed_info[name] = feed_info
+
+        if feed_info.get('status') != 'success':
+            entry['failures'] += 1
+            new = 0
+        else:
+            entry['failures'] = 0
+            links = {canonical_url(item.get('link', '')) for item in items}
+            new = 0 if feed_info.get('not_modified') else len(links - entry['links'])
+            entry['links'] = links
+            self.items[name] = items
+
+            gap = publishing_gap(items)
+            if gap is not None:
+                entry['gap'] = gap if entry['gap'] is None else \
+                    CADENCE_ALPHA * gap + (1 - CADENCE_ALPHA) * entry['gap']
+            entry['unchanged'] = 0 if new else entry['unchanged'] + 1
+            if new:
+                self.stats['polls_with_new'] += 1
+
+        entry['interval'] = self._next_interval(entry)
+        entry['next_poll'] = now + entry['interval'] * random.uniform(1 - self.jitter, 1 + self.jitter)
+        heapq.heappush(self._heap, (entry['next_poll'], name))
+        return new
+
+    def current_items(self, max_items: int, recency_hours: int = 48,
+                      half_life_hours: float = DEFAULT_HALF_LIFE_HOURS) -> List[Dict]:
+        """The best max_items of every feed's latest items still in the recency window (see item_selection),
+        cleaned; items that were never selected stay raw"""
+        recent = {
+            name: [
+                item for item in self.items.get(name, [])
+                if 'published_ts' not in item or is_recent_timestamp(item['published_ts'], recency_hours)
+            ]
+            for name in self.feeds
+        }
+        return finish_items(select_items(list(self.feeds.values()), recent, max_items, half_life_hours))
+
+    def feed_summary(self) -> List[Dict]:
+        """The last poll outcome of every feed polled so far"""
+        return [self.feed_info[name] for name in self.feeds if name in self.feed_info]
+
+    def requests_per_day(self) -> float:
+        """Polls per day at the current intervals"""
+        return sum(86400 / entry['interval'] for entry in self.state.values())
+
+    def summary(self) -> Dict:
+        """Per-feed interval and next poll, for the status file"""
+        return {
+            'requests_per_day': round(self.requests_per_day()),
+            'next_poll': self.next_poll_time(),
+            'feeds': {
+                name: {
+                    'interval_seconds': round(entry['interval']),
+                    'gap_seconds': round(entry['gap']) if entry['gap'] else None,
+                    'unchanged_polls': entry['unchanged'],
+                    'failures': entry['failures']
+                }
+                for name, entry in self.state.items()
+            }
+        }
+
+
+def scheduler_from_config(config: Dict, initial_interval: float = 300) -> FeedScheduler:
+    scheduler = FeedScheduler(
+        config['feeds'],
+        config.get('feed_schedule_file', 'feed_schedule.json'),
+        min_interval=config.get('poll_min_seconds', 120),
+        max_interval=config.get('poll_max_seconds', 3600),
+        initial_interval=initial_interval,
+        jitter=config.get('poll_jitter', 0.1)
+    )
+    logging.info(f"Adaptive polling for {len(scheduler.feeds)} feeds, "
+                 f"intervals {scheduler.min_interval:.0f}-{scheduler.max_interval:.0f}s")
+    return scheduler
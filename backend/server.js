@@ -45,17 +45,94 @@ const activeSessions = new Map();
 /**
  * Load the latest digest from pre-processed file
  */
+// Parsed digest, reused until the service replaces the file
+let digestCache = { mtimeMs: null, size: null, data: null };
+
 async function loadLatestDigest() {
   try {
     const digestPath = path.join(__dirname, 'latest_digest.json');
+    const stat = await fs.stat(digestPath);
+    if (digestCache.data && digestCache.mtimeMs === stat.mtimeMs && digestCache.size === stat.size) {
+      return digestCache.data;
+    }
     const content = await fs.readFile(digestPath, 'utf-8');
-    return JSON.parse(content);
+    digestCache = { mtimeMs: stat.mtimeMs, size: stat.size, data: JSON.parse(content) };
+    return digestCache.data;
   } catch (error) {
     console.error('Error loading digest:', error);
     return null;
   }
 }
 
+const ARTIFACTS_DIR = path.join(__dirname, process.env.DIGEST_ARTIFACTS_DIR || 'digest');
+
+/**
+ * Load the manifest of pre-compressed digest artifacts written by service.py
+ */
+async function loadArtifactManifest() {
+  try {
+    const content = await fs.readFile(path.join(ARTIFACTS_DIR, 'manifest.json'), 'utf-8');
+    return JSON.parse(content);
+  } catch (error) {
+    return null;
+  }
+}
+
+/**
+ * Preferred encoding the client accepts among those written (br, then gzip, then identity)
+ */
+function negotiateEncoding(acceptEncoding, available) {
+  const accepted = new Set(
+    (acceptEncoding || '')
+      .split(',')
+      .map(part => part.trim().split(';'))
+      .filter(([, q]) => !q || parseFloat(q.split('=')[1]) > 0)
+      .map(([name]) => name.trim().toLowerCase())
+  );
+  for (const encoding of ['br', 'gzip']) {
+    if (available[encoding] && (accepted.has(encoding) || accepted.has('*'))) {
+      return encoding;
+    }
+  }
+  return 'identity';
+}
+
+/**
+ * Send one artifact as stored on disk: 304 if the client's ETag matches,
+ * otherwise the best pre-compressed variant streamed straight from the file
+ */
+function sendArtifact(req, res, artifact, manifest) {
+  res.set({
+    'ETag': artifact.etag,
+    'Cache-Control': 'no-cache',
+    'Vary': 'Accept-Encoding'
+  });
+  // Category slices carry only their articles; the cycle they belong to comes from the manifest
+  if (manifest.version != null) {
+    res.set('X-Digest-Version', String(manifest.version));
+  }
+  if (manifest.last_updated) {
+    res.set('X-Digest-Updated', manifest.last_updated);
+  }
+
+  const ifNoneMatch = req.headers['if-none-match'];
+  if (ifNoneMatch && ifNoneMatch.split(',').some(tag => tag.trim().replace(/^W\//, '') === artifact.etag)) {
+    return res.status(304).end();
+  }
+
+  const encoding = negotiateEncoding(req.headers['accept-encoding'], artifact.encodings);
+  const variant = artifact.encodings[encoding];
+  res.set('Content-Type', 'application/json; charset=utf-8');
+  if (encoding !== 'identity') {
+    res.set('Content-Encoding', encoding);
+  }
+  res.sendFile(variant.file, { root: ARTIFACTS_DIR, etag: false, lastModified: false }, error => {
+    if (error && !res.headersSent) {
+      res.status(error.status || 500).json({ success: false, error: 'Digest artifact unavailable' });
+    }
+  });
+}
+
 /**
  * GET /api/news
  * Returns pre-processed digest (instant response)
@@ -89,6 +166,104 @@ app.get('/api/news', async (req, res) => {
   }
 });
 
+/**
+ * Load the digest change journal (one JSON record per line, oldest first)
+ */
+async function loadDigestJournal() {
+  const journalPath = path.join(__dirname, process.env.DIGEST_JOURNAL_FILE || 'digest_journal.jsonl');
+  let content;
+  try {
+    content = await fs.readFile(journalPath, 'utf-8');
+  } catch (error) {
+    return [];
+  }
+  const records = [];
+  for (const line of content.split('\n')) {
+    if (!line.trim()) continue;
+    try {
+      records.push(JSON.parse(line));
+    } catch (error) {
+      // A torn last line from an interrupted append; the version gap forces a resync
+    }
+  }
+  return records;
+}
+
+/**
+ * GET /api/digest
+ * The full digest as written by service.py (minified, pre-compressed, ETag for 304s)
+ */
+app.get('/api/digest', async (req, res) => {
+  const manifest = await loadArtifactManifest();
+  if (!manifest) {
+    return res.status(404).json({
+      success: false,
+      error: 'No digest artifacts available. Service may still be processing.'
+    });
+  }
+  sendArtifact(req, res, manifest.digest, manifest);
+});
+
+/**
+ * GET /api/digest/:category
+ * One category slice of the digest, by slug (e.g. markets, policy-regulation)
+ */
+app.get('/api/digest/:category', async (req, res) => {
+  const manifest = await loadArtifactManifest();
+  // Own keys only: "constructor" or "__proto__" must not resolve to an Object.prototype member
+  const slug = req.params.category;
+  const artifact = manifest && Object.hasOwn(manifest.categories, slug) ? manifest.categories[slug] : null;
+  if (!artifact) {
+    return res.status(404).json({
+      success: false,
+      error: `Unknown category: ${req.params.category}`,
+      categories: manifest ? Object.keys(manifest.categories) : []
+    });
+  }
+  sendArtifact(req, res, artifact, manifest);
+});
+
+/**
+ * GET /api/news/changes?since=N
+ * Changes (added, updated and removed articles) from digest version N to the latest.
+ * Returns resync: true when the journal no longer reaches back to N; fetch /api/news instead.
+ */
+app.get('/api/news/changes', async (req, res) => {
+  try {
+    const since = parseInt(req.query.since, 10);
+    if (!Number.isInteger(since) || since < 0) {
+      return res.status(400).json({
+        success: false,
+        error: 'Query parameter "since" must be a digest version (non-negative integer)'
+      });
+    }
+
+    const records = await loadDigestJournal();
+    const version = records.length ? records[records.length - 1].version : 0;
+    const changes = records.filter(record => record.version > since);
+
+    // The records must chain unbroken from `since` to the latest version
+    let expected = since;
+    const complete = since <= version && changes.every(record => {
+      const chained = record.version === expected + 1 && record.base === expected;
+      expected = record.version;
+      return chained;
+    });
+
+    if (!complete) {
+      return res.json({ success: true, resync: true, version });
+    }
+
+    res.json({ success: true, resync: false, version, changes });
+  } catch (error) {
+    console.error('Error fetching digest changes:', error);
+    res.status(500).json({
+      success: false,
+      error: error.message
+    });
+  }
+});
+
 /**
  * Helper function to format categories for frontend
  */
@@ -543,6 +718,7 @@ app.get('/api/status', async (req, res) => {
       service: serviceStatus || { status: 'unknown', message: 'Service status unavailable' },
       digest: digestData ? {
         available: true,
+        version: digestData.version,
         total_items: digestData.total_items,
         last_updated: digestData.last_updated,
         categories: Object.keys(digestData.categories || {})
@@ -578,6 +754,8 @@ app.listen(PORT, () => {
 📡 Port: ${PORT}
 🌐 API: http://localhost:${PORT}
 📰 News: http://localhost:${PORT}/api/news
+🗜️  Digest: http://localhost:${PORT}/api/digest[/<category>]
+🧾 Changes: http://localhost:${PORT}/api/news/changes?since=N
 📊 Cards: http://localhost:${PORT}/api/cards
 📈 Status: http://localhost:${PORT}/api/status
 🔄 Refresh: POST http://localhost:${PORT}/api/refresh
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """
 Background Service - Continuously process news articles
-Runs every 5 minutes to keep latest_digest.json fresh
+Refreshes all feeds every 5 minutes, or with SCHEDULE_MODE=adaptive polls each
+feed on its own learned interval and rebuilds latest_digest.json when new articles arrive.
+With SHARD_ROLE=worker it handles only its shard's feeds and publishes a partial
+output; SHARD_ROLE=coordinator merges those into latest_digest.json
 """
 
 import os
@@ -11,13 +14,24 @@ import logging
 from datetime import datetime
 from app import (
     load_config,
+    FeedStores,
     fetch_rss_items,
     deduplicate_items,
-    process_with_llm,
+    process_uncached_items,
+    PROMPT_VERSION,
     group_items_by_label,
     save_audit_file
 )
-from cache_manager import SimpleCache
+from audit_log import audit_log_from_config
+from cache_manager import cache_from_config, content_cache_from_config
+from digest_artifacts import DigestArtifacts
+from digest_store import digest_store_from_config
+from metrics import metrics
+from near_dedup import attach_alternates, collapse_near_duplicates
+from pipeline import run_streaming_cycle
+from profiling import profiler_from_config
+from scheduler import scheduler_from_config
+from sharding import merge_partials, output_signature, shard_from_config, write_partial
 
 # Configure logging
 logging.basicConfig(
@@ -30,169 +44,413 @@ logging.basicConfig(
 )
 
 # Service configuration
-REFRESH_INTERVAL = 5 * 60  # 5 minutes in seconds
+REFRESH_INTERVAL = 5 * 60  # 5 minutes in seconds; also the first interval of a new feed in adaptive mode
 STATUS_FILE = 'service_status.json'
+METRICS_FILE = 'metrics.prom'  # Prometheus text format, rewritten with every status update
 DIGEST_FILE = 'latest_digest.json'
 
+# Processed-article caches shared by every cycle of this process
+_cache = None
+_content_cache = None
+
+# Feed state, entry ledger and feed health shared by every cycle of this process
+_feed_stores = None
+
+# Per-feed poll schedule in adaptive mode
+_scheduler = None
+
+# Per-cycle profiling, off until PROFILE_CYCLES or SIGUSR1 arms it
+_profiler = None
+
+# Append-only audit log of every published cycle
+_audit_log = None
+
+# This process's shard (SHARD_ROLE), None when one service handles every feed
+_shard = None
+
+# How often the coordinator deletes expired claims
+CLAIM_PRUNE_INTERVAL = 60 * 60
+
+
+def service_config() -> dict:
+    """load_config(), narrowed to this worker's feeds and state directory in a sharded deployment"""
+    config = load_config()
+    if _shard is not None and _shard.role == 'worker':
+        config = _shard.worker_config(config)
+    return config
+
+
+def state_path(filename: str) -> str:
+    """Per-process files (status, metrics) go in the worker's state directory when sharded"""
+    if _shard is not None and _shard.role == 'worker':
+        return os.path.join(_shard.state_dir, filename)
+    return filename
+
+
+def get_claims(config: dict):
+    """Cross-shard LLM claims for a worker, else None"""
+    if _shard is None or _shard.role != 'worker':
+        return None
+    return _shard.claims(config)
+
+
+def get_cache(config: dict):
+    """Open the cache on first use and keep it for the life of the service"""
+    global _cache
+    if _cache is None:
+        _cache = cache_from_config(config)
+    return _cache
+
+
+def get_feed_stores(config: dict):
+    """Open the feed stores once, like the caches; they are saved at most every FEED_STATE_SAVE_SECONDS"""
+    global _feed_stores
+    if _feed_stores is None:
+        _feed_stores = FeedStores(config, config.get('feed_state_save_seconds', 300))
+    return _feed_stores
+
+
+def get_content_cache(config: dict):
+    """Content-hash tier, opened once like the link cache; None when CONTENT_CACHE=false"""
+    global _content_cache
+    if _content_cache is None and config.get('content_cache', True):
+        _content_cache = content_cache_from_config(config, PROMPT_VERSION)
+    return _content_cache
+
+
+def get_audit_log(config: dict):
+    """Open the audit log once; it keeps appending to the current segment"""
+    global _audit_log
+    if _audit_log is None:
+        _audit_log = audit_log_from_config(config)
+    return _audit_log
+
 
 def update_status(status: str, message: str = "", last_update: str = None):
     """Update service status file"""
+    next_update = _scheduler.next_poll_time() if _scheduler is not None else time.time() + REFRESH_INTERVAL
     status_data = {
         'status': status,
         'message': message,
         'last_update': last_update or datetime.now().isoformat(),
-        'next_update': datetime.fromtimestamp(time.time() + REFRESH_INTERVAL).isoformat() if status == 'idle' else None
+        'next_update': datetime.fromtimestamp(next_update).isoformat() if status == 'idle' else None,
+        'cache': _cache.stats() if _cache is not None else None,
+        'content_cache': _content_cache.stats() if _content_cache is not None else None,
+        'schedule': _scheduler.summary() if _scheduler is not None else None,
+        'metrics': metrics.snapshot() if metrics.enabled else None
     }
 
-    with open(STATUS_FILE, 'w', encoding='utf-8') as f:
+    with open(state_path(STATUS_FILE), 'w', encoding='utf-8') as f:
         json.dump(status_data, f, indent=2)
-
-
-def process_and_save():
-    """Main processing function - fetches, processes, and saves digest"""
+    if metrics.enabled:
+        metrics.write_prometheus(state_path(METRICS_FILE))
+
+
+def save_digest(config: dict, digest: dict) -> dict:
+    """Publish the next digest version, then its pre-compressed serving artifacts; returns the journal record"""
+    with metrics.timer(stage='digest_write'):
+        record = digest_store_from_config(config, DIGEST_FILE).publish(digest)
+        if config.get('digest_artifacts', True):
+            try:
+                DigestArtifacts(config.get('digest_artifacts_dir', 'digest')).write({**digest, 'version': record['version']})
+            except OSError as e:
+                # latest_digest.json is already saved; the server falls back to it
+                logging.error(f"Failed to write digest artifacts: {e}")
+    metrics.inc('items_total', digest.get('total_items', 0), stage='published')
+    return record
+
+
+def run_staged_cycle(config: dict):
+    """Fetch every feed, then dedup, cache check and LLM in turn; returns (raw, processed, feed summary)"""
+    # Fetch RSS items
+    update_status('processing', 'Fetching articles from feeds...')
+    raw_items, feed_summary = fetch_rss_items(config['feeds'], config['max_items'], config,
+                                              stores=get_feed_stores(config))
+    logging.info(f"Total items fetched: {len(raw_items)}")
+
+    if not raw_items:
+        return raw_items, [], feed_summary
+
+    return raw_items, process_fetched_items(config, raw_items), feed_summary
+
+
+def process_fetched_items(config: dict, raw_items: list) -> list:
+    """Dedup, cache check and LLM for fetched items; returns the processed articles"""
+    # Deduplicate
+    update_status('processing', 'Removing duplicates...')
+    deduped_items = deduplicate_items(raw_items)
+    logging.info(f"Items after deduplication: {len(deduped_items)}")
+    if config.get('near_dedup', True):
+        deduped_items = collapse_near_duplicates(deduped_items, config.get('near_dup_threshold', 0.25))
+        logging.info(f"Stories after near-duplicate grouping: {len(deduped_items)}")
+
+    # Cache check
+    update_status('processing', 'Checking cache...')
+    # Cache entries live as long as the recency window so no item is re-sent to the LLM
+    cache = get_cache(config)
+    cache.clean_expired()
+
+    cached_items, uncached_items = cache.partition(deduped_items)
+
+    logging.info(f"📊 Cache stats: {len(cached_items)} cached, {len(uncached_items)} need processing")
+
+    # Stories another shard has already claimed appear in its output instead
+    claims = get_claims(config)
+    if claims is not None and uncached_items:
+        uncached_items, claimed = claims.partition(uncached_items)
+        if claimed:
+            logging.info(f"Skipping {len(claimed)} articles claimed by other shards")
+
+    # Process uncached items with LLM
+    if uncached_items:
+        update_status('processing', f'Processing {len(uncached_items)} articles with LLM...')
+        processed_new = process_uncached_items(uncached_items, config, cache, get_content_cache(config))
+        logging.info(f"LLM processing complete: {len(processed_new)} items processed")
+    else:
+        processed_new = []
+        logging.info("All items found in cache, skipping LLM processing")
+
+    # Combine cached + newly processed
+    processed_items = attach_alternates(cached_items + processed_new, deduped_items)
+    logging.info(f"Total articles available: {len(processed_items)}")
+    return processed_items
+
+
+def run_polling_cycle(config: dict, scheduler):
+    """Poll the feeds that are due; returns (raw, processed, feed summary), or None if nothing new arrived"""
+    due = scheduler.due_feeds()
+    if not due:
+        return None
+    update_status('processing', f'Polling {len(due)} due feeds...')
+
+    new_counts = []
+
+    def on_feed(name, items, feed_info):
+        new_counts.append(scheduler.record(name, items, feed_info))
+
+    # scheduler.current_items selects and cleans; only the feed summary comes back here
+    stores = get_feed_stores(config)
+    fetch_rss_items(due, config['max_items'], config, on_feed=on_feed, stores=stores)
+    stores.save()
+    scheduler.save()
+    new_items = sum(new_counts)
+    logging.info(f"Polled {len(due)} feeds ({', '.join(feed['name'] for feed in due)}): {new_items} new items, "
+                 f"~{scheduler.requests_per_day():.0f} requests/day at current intervals")
+    if not new_items:
+        return None
+
+    # Rebuild from every feed's latest items; unchanged feeds come from memory and the caches
+    raw_items = scheduler.current_items(config['max_items'], config.get('recency_hours', 48),
+                                        config.get('select_half_life_hours', 12))
+    if not raw_items:
+        return raw_items, [], scheduler.feed_summary()
+    return raw_items, process_fetched_items(config, raw_items), scheduler.feed_summary()
+
+
+def process_and_save(scheduler=None):
+    """Main processing function - fetches, processes, and saves digest.
+
+    With a scheduler only the feeds due now are polled, and the digest is
+    rebuilt only if they brought new items.
+    """
     try:
-        logging.info("=" * 60)
-        logging.info("Starting news processing cycle...")
-        update_status('processing', 'Fetching RSS feeds...')
-
         # Load configuration
-        config = load_config()
-        logging.info(f"Loaded {len(config['feeds'])} RSS feeds")
-
-        # Fetch RSS items
-        update_status('processing', 'Fetching articles from feeds...')
-        raw_items, feed_summary = fetch_rss_items(config['feeds'], config['max_items'])
-        logging.info(f"Total items fetched: {len(raw_items)}")
-
-        # Check if we got any items
-        if len(raw_items) == 0:
-            logging.warning("No items fetched - all feeds failed")
-            empty_digest = {
-                'date': datetime.now().strftime("%Y-%m-%d"),
-                'categories': {},
-                'total_items': 0,
-                'message': 'No articles available - all feeds unavailable'
-            }
-            with open(DIGEST_FILE, 'w', encoding='utf-8') as f:
-                json.dump(empty_digest, f, indent=2, ensure_ascii=False)
-
-            update_status('idle', 'All feeds failed', datetime.now().isoformat())
-            return
-
-        # Deduplicate
-        update_status('processing', 'Removing duplicates...')
-        deduped_items = deduplicate_items(raw_items)
-        logging.info(f"Items after deduplication: {len(deduped_items)}")
+        config = service_config()
+        metrics.enabled = config.get('metrics', True)
+
+        if scheduler is not None:
+            cycle = run_polling_cycle(config, scheduler)
+            if cycle is None:
+                update_status('idle', 'No new articles; digest unchanged')
+                return
+            logging.info("=" * 60)
+            logging.info("New articles arrived, rebuilding digest...")
+            raw_items, processed_items, feed_summary = cycle
+        # Fetch, dedup, cache check and LLM: stage by stage, or streaming as feeds complete
+        elif config.get('pipeline_mode', 'staged') == 'streaming':
+            logging.info("=" * 60)
+            logging.info(f"Starting news processing cycle for {len(config['feeds'])} RSS feeds...")
+            update_status('processing', 'Streaming articles from feeds through the LLM...')
+            cache = get_cache(config)
+            cache.clean_expired()
+            raw_items, processed_items, feed_summary = run_streaming_cycle(
+                config, cache, get_content_cache(config), get_claims(config), get_feed_stores(config))
+        else:
+            logging.info("=" * 60)
+            logging.info(f"Starting news processing cycle for {len(config['feeds'])} RSS feeds...")
+            raw_items, processed_items, feed_summary = run_staged_cycle(config)
 
-        # Cache check
-        update_status('processing', 'Checking cache...')
-        cache = SimpleCache('cache.json', max_age_hours=24)
-        cache.clean_expired()
+        publish_cycle(config, raw_items, processed_items, feed_summary)
 
-        cached_items = cache.get_cached(deduped_items)
-        uncached_items = cache.filter_uncached(deduped_items)
+    except Exception as e:
+        logging.error(f"❌ Error during processing: {type(e).__name__}: {e}", exc_info=True)
+        update_status('error', f'{type(e).__name__}: {str(e)}')
 
-        logging.info(f"📊 Cache stats: {len(cached_items)} cached, {len(uncached_items)} need processing")
 
-        # Process uncached items with LLM
-        if uncached_items:
-            update_status('processing', f'Processing {len(uncached_items)} articles with LLM...')
-            processed_new = process_with_llm(uncached_items, config)
-            cache.update(uncached_items, processed_new)
-            logging.info(f"LLM processing complete: {len(processed_new)} items processed")
-        else:
-            processed_new = []
-            logging.info("All items found in cache, skipping LLM processing")
-
-        # Combine cached + newly processed
-        processed_items = cached_items + processed_new
-        logging.info(f"Total articles available: {len(processed_items)}")
-
-        if not processed_items:
-            logging.warning("No processed items available")
-            empty_digest = {
-                'date': datetime.now().strftime("%Y-%m-%d"),
-                'categories': {},
-                'total_items': 0,
-                'message': 'No articles available'
-            }
-            with open(DIGEST_FILE, 'w', encoding='utf-8') as f:
-                json.dump(empty_digest, f, indent=2, ensure_ascii=False)
-
-            update_status('idle', 'No articles available', datetime.now().isoformat())
-            return
-
-        # Group by category
-        update_status('processing', 'Organizing articles by category...')
-        grouped_items = group_items_by_label(processed_items)
-        logging.info(f"Items grouped into {len(grouped_items)} categories: {list(grouped_items.keys())}")
-
-        # Map labels to friendly section names
-        section_names = {
-            'policy': 'Policy & Regulation',
-            'markets': 'Markets',
-            'startups': 'Startups & Innovation',
-            'infra': 'Infrastructure & Real Estate',
-            'energy': 'Energy & Resources',
-            'misc': 'Business News'
+def publish_cycle(config: dict, raw_items: list, processed_items: list, feed_summary: list):
+    """Save the digest built from one cycle's items; a shard worker saves its partial output instead"""
+    if _shard is not None and _shard.role == 'worker':
+        write_partial(_shard, raw_items, processed_items, feed_summary)
+        logging.info(f"✅ Published {len(processed_items)} articles from {len(config['feeds'])} feeds "
+                     f"to {_shard.output_file}")
+        update_status('idle', f'Published {len(processed_items)} articles for shard {_shard.shard_id}',
+                      datetime.now().isoformat())
+        return
+
+    # Check if we got any items
+    if len(raw_items) == 0:
+        logging.warning("No items fetched - all feeds failed")
+        empty_digest = {
+            'date': datetime.now().strftime("%Y-%m-%d"),
+            'categories': {},
+            'total_items': 0,
+            'message': 'No articles available - all feeds unavailable'
         }
+        save_digest(config, empty_digest)
 
-        # Create digest structure
-        categories = {}
-        for label, items in grouped_items.items():
-            section_name = section_names.get(label, label.title())
-            categories[section_name] = items
+        update_status('idle', 'All feeds failed', datetime.now().isoformat())
+        return
 
-        digest_data = {
+    if not processed_items:
+        logging.warning("No processed items available")
+        empty_digest = {
             'date': datetime.now().strftime("%Y-%m-%d"),
-            'last_updated': datetime.now().isoformat(),
-            'categories': categories,
-            'total_items': len(processed_items),
-            'feed_summary': feed_summary
+            'categories': {},
+            'total_items': 0,
+            'message': 'No articles available'
         }
+        save_digest(config, empty_digest)
+
+        update_status('idle', 'No articles available', datetime.now().isoformat())
+        return
+
+    # Group by category
+    update_status('processing', 'Organizing articles by category...')
+    grouped_items = group_items_by_label(processed_items)
+    logging.info(f"Items grouped into {len(grouped_items)} categories: {list(grouped_items.keys())}")
+
+    # Map labels to friendly section names
+    section_names = {
+        'policy': 'Policy & Regulation',
+        'markets': 'Markets',
+        'startups': 'Startups & Innovation',
+        'infra': 'Infrastructure & Real Estate',
+        'energy': 'Energy & Resources',
+        'misc': 'Business News'
+    }
 
-        # Save digest
-        update_status('processing', 'Saving digest...')
-        with open(DIGEST_FILE, 'w', encoding='utf-8') as f:
-            json.dump(digest_data, f, indent=2, ensure_ascii=False)
+    # Create digest structure
+    categories = {}
+    for label, items in grouped_items.items():
+        section_name = section_names.get(label, label.title())
+        categories[section_name] = items
+
+    digest_data = {
+        'date': datetime.now().strftime("%Y-%m-%d"),
+        'last_updated': datetime.now().isoformat(),
+        'categories': categories,
+        'total_items': len(processed_items),
+        'feed_summary': feed_summary
+    }
 
-        logging.info(f"✅ Saved {DIGEST_FILE} with {len(processed_items)} articles")
+    # Save digest
+    update_status('processing', 'Saving digest...')
+    record = save_digest(config, digest_data)
 
-        # Save audit file
-        audit_filename = save_audit_file(raw_items, processed_items)
-        logging.info(f"✅ Saved {audit_filename}")
+    logging.info(f"✅ Saved {DIGEST_FILE} version {record['version']} with {len(processed_items)} articles")
 
-        # Update status to idle
-        update_status('idle', f'Successfully processed {len(processed_items)} articles', datetime.now().isoformat())
-        logging.info(f"🎉 Processing complete! Next update in {REFRESH_INTERVAL // 60} minutes")
+    # Append the cycle to the audit log
+    audit_filename = save_audit_file(raw_items, processed_items, get_audit_log(config))
+    logging.info(f"✅ Saved {audit_filename}")
 
-    except Exception as e:
-        logging.error(f"❌ Error during processing: {type(e).__name__}: {e}", exc_info=True)
-        update_status('error', f'{type(e).__name__}: {str(e)}')
+    # Update status to idle
+    update_status('idle', f'Successfully processed {len(processed_items)} articles', datetime.now().isoformat())
+    logging.info("🎉 Processing complete!")
+
+
+def run_coordinator(config: dict):
+    """Merge the shard workers' partial outputs into latest_digest.json whenever one of them publishes"""
+    logging.info(f"Coordinating shards {', '.join(_shard.members)} in {_shard.shard_dir}/, "
+                 f"checking every {config['shard_merge_seconds']}s")
+    claims = _shard.claims(config)
+    last_signature = None
+    last_prune = 0.0
+    while True:
+        try:
+            signature = output_signature(_shard)
+            if signature and signature != last_signature:
+                metrics.enabled = config.get('metrics', True)
+                raw_items, processed_items, feed_summary = merge_partials(_shard, config, config['shard_stale_seconds'])
+                publish_cycle(config, raw_items, processed_items, feed_summary)
+                last_signature = signature
+            if time.time() - last_prune > CLAIM_PRUNE_INTERVAL:
+                removed = claims.prune()
+                if removed:
+                    logging.info(f"Pruned {removed} expired article claims")
+                last_prune = time.time()
+            time.sleep(config['shard_merge_seconds'])
+        except KeyboardInterrupt:
+            logging.info("🛑 Coordinator stopped by user")
+            update_status('stopped', 'Coordinator stopped by user')
+            break
+        except Exception as e:
+            logging.error(f"❌ Error merging shard outputs: {type(e).__name__}: {e}", exc_info=True)
+            update_status('error', f'Coordinator error: {str(e)}')
+            time.sleep(60)
 
 
 def run_service():
     """Main service loop - runs continuously"""
+    global _scheduler, _profiler, _shard
     logging.info("🚀 Business Agent Background Service Starting...")
-    logging.info(f"Refresh interval: {REFRESH_INTERVAL // 60} minutes")
 
-    # Initial status
-    update_status('starting', 'Service initializing...')
+    _shard = shard_from_config(load_config())
+    if _shard is not None and _shard.role == 'worker':
+        # Workers on one host share service.log
+        for handler in logging.getLogger().handlers:
+            handler.setFormatter(logging.Formatter(f'%(asctime)s - {_shard.shard_id} - %(levelname)s - %(message)s'))
 
-    # Run initial processing immediately
-    process_and_save()
+    # Initial status (after service_config() has created a worker's state directory)
+    config = service_config()
+    update_status('starting', 'Service initializing...')
+    if _shard is not None:
+        if _shard.role == 'coordinator':
+            run_coordinator(config)
+            return
+        logging.info(f"Shard {_shard.shard_id} of {len(_shard.members)}: {len(config['feeds'])} feeds, "
+                     f"state in {_shard.state_dir}/")
+    if config.get('schedule_mode', 'fixed') == 'adaptive':
+        _scheduler = scheduler_from_config(config, initial_interval=REFRESH_INTERVAL)
+        if config.get('pipeline_mode', 'staged') == 'streaming':
+            logging.warning("PIPELINE_MODE=streaming only applies to SCHEDULE_MODE=fixed; "
+                            "adaptive polls process their items staged")
+    else:
+        logging.info(f"Refresh interval: {REFRESH_INTERVAL // 60} minutes")
+    _profiler = profiler_from_config(config)
+    _profiler.install_signal()
+
+    # Run initial processing immediately (every feed is due at start-up)
+    with _profiler.cycle():
+        process_and_save(_scheduler)
 
     # Continuous loop
     while True:
         try:
-            logging.info(f"⏰ Sleeping for {REFRESH_INTERVAL // 60} minutes...")
-            time.sleep(REFRESH_INTERVAL)
+            if _scheduler is not None:
+                # Sleep until the next feed falls due
+                time.sleep(max(1.0, _scheduler.next_poll_time() - time.time()))
+            else:
+                logging.info(f"⏰ Sleeping for {REFRESH_INTERVAL // 60} minutes...")
+                time.sleep(REFRESH_INTERVAL)
 
             # Process again
-            process_and_save()
+            with _profiler.cycle():
+                process_and_save(_scheduler)
 
         except KeyboardInterrupt:
             logging.info("🛑 Service stopped by user")
+            if _feed_stores is not None:
+                _feed_stores.save(force=True)
             update_status('stopped', 'Service stopped by user')
             break
         except Exception as e:
@@ -0,0 +1,288 @@
+"""Sharded service mode: a consistent-hash ring over feeds, cross-shard LLM claims and partial-output merging"""
+import bisect
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from cache_manager import content_hash
+from digest_store import write_json_atomic
+from item_selection import DEFAULT_HALF_LIFE_HOURS, select_items
+from url_canon import canonical_url
+
+# Points per member on the ring; more points even out the slices
+DEFAULT_VNODES = 100
+
+# Relative state files of a worker are rooted in SHARD_DIR/<id>/ so workers sharing a directory never clobber them
+SHARD_STATE_FILES = ('feed_state_file', 'feed_health_file', 'entry_ledger_file', 'feed_schedule_file',
+                     'cache_file', 'content_cache_file', 'profile_dir')
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+
+class HashRing:
+    """Consistent hashing of feed names onto shard members.
+
+    Each member owns the arcs ending at its vnodes points, so adding or
+    removing one of N members only moves the feeds on its arcs: about 1/N
+    of them. Every worker computes the same ring from the member list, with
+    no coordination.
+    """
+
+    def __init__(self, members: List[str], vnodes: int = DEFAULT_VNODES):
+        if not members:
+            raise ValueError("HashRing needs at least one member")
+        self.members = sorted(set(members))
+        points = sorted((_hash(f"{member}#{i}"), member) for member in self.members for i in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> str:
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+    def assign(self, feeds: List[Dict]) -> Dict[str, List[Dict]]:
+        """Feeds per member, keyed by feed name"""
+        slices = {member: [] for member in self.members}
+        for feed in feeds:
+            slices[self.owner(feed['name'])].append(feed)
+        return slices
+
+
+class ShardClaims:
+    """First-come claims on articles, so one shard sends each story to the LLM.
+
+    An article is claimed by its canonical link and by the hash of its text,
+    so the same text re-published under another URL by a feed of another
+    shard is left to the first shard too (near-duplicates with different
+    wording are only grouped within a shard). A claim is a small file under SHARD_DIR/claims/ created with O_EXCL,
+    which is atomic on a local disk and on NFS, holding the claiming shard
+    and the feed the article came from. A claim is void once it is older
+    than the TTL (the recency window), its shard has left the ring, or the
+    ring has moved its feed to another shard; a void claim is taken over.
+    """
+
+    def __init__(self, claims_dir: str, shard_id: str, ring: HashRing, ttl_hours: int = 48):
+        self.claims_dir = claims_dir
+        self.shard_id = shard_id
+        self.ring = ring
+        self.ttl = ttl_hours * 3600
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.claims_dir, digest[:2], digest)
+
+    def _owner(self, path: str) -> Optional[str]:
+        """The shard holding a valid claim at path, or None"""
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                owner, _, feed = f.read().partition('\n')
+        except OSError:
+            return None
+        if owner not in self.ring.members or self.ring.owner(feed) != owner:
+            return None
+        return owner
+
+    def claim(self, key: str, feed: str) -> bool:
+        """True if this shard owns the key (just claimed, or claimed earlier)"""
+        path = self._path(key)
+        record = f"{self.shard_id}\n{feed}"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            owner = self._owner(path)
+            if owner is not None:
+                return owner == self.shard_id
+            # Void claim: take it over; a racing shard may still win, so re-read
+            tmp_file = f"{path}.{self.shard_id}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(record)
+            os.replace(tmp_file, path)
+            return self._owner(path) == self.shard_id
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(record)
+        return True
+
+    def partition(self, items: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """(items this shard processes, items another shard has claimed)"""
+        mine, others = [], []
+        for item in items:
+            feed = item.get('source', '')
+            keys = [f"link:{canonical_url(item.get('link', ''))}", f"text:{content_hash(item, '', '')}"]
+            (mine if all(self.claim(key, feed) for key in keys) else others).append(item)
+        return mine, others
+
+    def prune(self) -> int:
+        """Delete expired claims; returns how many"""
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for path in glob.glob(os.path.join(self.claims_dir, '*', '*')):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+class ShardConfig:
+    """This process's place in a sharded deployment, from SHARD_ROLE / SHARD_ID / SHARD_MEMBERS / SHARD_DIR"""
+
+    def __init__(self, role: str, shard_id: str, members: List[str], shard_dir: str = 'shards',
+                 vnodes: int = DEFAULT_VNODES):
+        self.role = role
+        self.shard_id = shard_id
+        self.ring = HashRing(members, vnodes)
+        self.members = self.ring.members
+        self.shard_dir = shard_dir
+
+    @property
+    def state_dir(self) -> str:
+        return os.path.join(self.shard_dir, self.shard_id)
+
+    @property
+    def output_file(self) -> str:
+        return os.path.join(self.shard_dir, 'output', f"{self.shard_id}.json")
+
+    def worker_config(self, config: Dict) -> Dict:
+        """config restricted to this shard's feeds, with its state files under state_dir"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        config = dict(config)
+        config['feeds'] = [feed for feed in config['feeds'] if self.ring.owner(feed['name']) == self.shard_id]
+        backend = config.get('cache_backend', 'json')
+        extension = 'db' if backend == 'sqlite' else 'json'
+        defaults = {
+            'cache_file': f"cache.{extension}",
+            'content_cache_file': f"content_cache.{extension}"
+        }
+        for key in SHARD_STATE_FILES:
+            path = config.get(key) or defaults.get(key)
+            if path:
+                # os.path.join keeps an absolute path as configured
+                config[key] = os.path.join(self.state_dir, path)
+        return config
+
+    def claims(self, config: Dict) -> ShardClaims:
+        return ShardClaims(os.path.join(self.shard_dir, 'claims'), self.shard_id, self.ring,
+                           ttl_hours=config.get('recency_hours', 48))
+
+
+def write_partial(shard: ShardConfig, raw_items: List[Dict], processed_items: List[Dict],
+                  feed_summary: List[Dict]):
+    """Publish this worker's slice of the digest for the coordinator"""
+    os.makedirs(os.path.dirname(shard.output_file), exist_ok=True)
+    write_json_atomic(shard.output_file, {
+        'shard': shard.shard_id,
+        'members': shard.members,
+        'updated_ts': time.time(),
+        'raw_items': raw_items,
+        'processed_items': processed_items,
+        'feed_summary': feed_summary
+    }, ensure_ascii=False)
+
+
+def output_signature(shard: ShardConfig) -> Tuple:
+    """(name, mtime) of every partial output; changes whenever a worker publishes"""
+    signature = []
+    for path in sorted(glob.glob(os.path.join(shard.shard_dir, 'output', '*.json'))):
+        try:
+            signature.append((os.path.basename(path), os.path.getmtime(path)))
+        except OSError:
+            pass
+    return tuple(signature)
+
+
+def _rank_merged(processed_items: List[Dict], raw_items: List[Dict], config: Dict) -> List[Dict]:
+    """The best MAX_ITEMS of the merged articles, as one service over every feed would select them.
+
+    Processed items carry no published_ts; each is ranked by that of its raw item.
+    """
+    published_ts = {
+        canonical_url(item.get('link', '')): item['published_ts'] for item in raw_items if 'published_ts' in item
+    }
+    by_source = {}
+    originals = {}
+    for item in processed_items:
+        ranked = dict(item)
+        ts = published_ts.get(canonical_url(item.get('link', '')))
+        if ts is not None:
+            ranked['published_ts'] = ts
+        originals[id(ranked)] = item
+        by_source.setdefault(item.get('source', ''), []).append(ranked)
+    selected = select_items(config['feeds'], by_source, config['max_items'],
+                            config.get('select_half_life_hours', DEFAULT_HALF_LIFE_HOURS))
+    return [originals[id(item)] for item in selected]
+
+
+def merge_partials(shard: ShardConfig, config: Dict,
+                   stale_seconds: int = 0) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(raw, processed, feed summary) across the current members' partial outputs.
+
+    Outputs of shards no longer in the member list are ignored. A canonical
+    link in more than one output (a feed moved between shards, or the same
+    story in feeds of different shards) is kept once, from the most recent
+    output. Each worker only picked the best of its own feeds, so the merged
+    articles are ranked again into one selection of MAX_ITEMS, with the
+    sources.yml weights and quotas and SELECT_HALF_LIFE_HOURS.
+    """
+    partials = []
+    for member in shard.members:
+        path = os.path.join(shard.shard_dir, 'output', f"{member}.json")
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                partials.append(json.load(f))
+        except FileNotFoundError:
+            logging.warning(f"Shard {member} has not published yet")
+        except (OSError, ValueError) as e:
+            logging.error(f"Failed to read output of shard {member}: {e}")
+
+    raw_items, processed_items, feed_summary = [], [], []
+    seen_raw, seen_links = set(), set()
+    for partial in sorted(partials, key=lambda p: p.get('updated_ts', 0), reverse=True):
+        age = time.time() - partial.get('updated_ts', 0)
+        if stale_seconds and age > stale_seconds:
+            logging.warning(f"Output of shard {partial.get('shard')} is {age / 60:.0f} minutes old")
+        for item in partial.get('raw_items', []):
+            link = canonical_url(item.get('link', ''))
+            if link and link in seen_raw:
+                continue
+            seen_raw.add(link)
+            raw_items.append(item)
+        feed_summary.extend(partial.get('feed_summary', []))
+        for item in partial.get('processed_items', []):
+            link = canonical_url(item.get('link', ''))
+            if link and link in seen_links:
+                continue
+            seen_links.add(link)
+            processed_items.append(item)
+
+    merged = len(processed_items)
+    processed_items = _rank_merged(processed_items, raw_items, config)
+    feed_summary.sort(key=lambda info: info.get('name', ''))
+    logging.info(f"Merged {len(partials)}/{len(shard.members)} shard outputs: "
+                 f"{len(processed_items)} of {merged} articles selected")
+    return raw_items, processed_items, feed_summary
+
+
+def shard_from_config(config: Dict) -> Optional[ShardConfig]:
+    """ShardConfig for SHARD_ROLE=worker|coordinator, or None for a single unsharded service"""
+    role = config.get('shard_role', '').strip().lower()
+    if not role:
+        return None
+    if role not in ('worker', 'coordinator'):
+        raise ValueError(f"SHARD_ROLE must be worker or coordinator, not {role!r}")
+    members = [member.strip() for member in config.get('shard_members', '').split(',') if member.strip()]
+    shard_id = config.get('shard_id', '').strip()
+    if role == 'worker' and shard_id not in members:
+        raise ValueError(f"SHARD_ID {shard_id!r} is not one of SHARD_MEMBERS {members}")
+    return ShardConfig(role, shard_id, members, config.get('shard_dir', 'shards'),
+                       config.get('shard_vnodes', DEFAULT_VNODES))
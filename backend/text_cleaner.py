@@ -0,0 +1,125 @@
+"""Tiered HTML-to-text cleaning for feed titles and summaries.
+
+The output is identical to BeautifulSoup(text, 'html.parser').get_text()
+followed by whitespace collapsing, but most inputs never build a tree:
+
+1. plain text (no '<' or '&'): whitespace collapse only
+2. simple HTML (plain tags and unambiguous entities): regex stripper
+3. anything else (comments, script/style, odd entities, stray '<'): BeautifulSoup
+"""
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EntitySubstitution
+
+WHITESPACE = re.compile(r'\s+')
+
+# Start tags with well-formed attributes, or bare end tags
+SIMPLE_TAG = re.compile(
+    r"""<(?:([a-zA-Z][a-zA-Z0-9]*)"""
+    r"""(?:\s+[^\s"'<>/=]+(?:\s*=\s*(?:"[^"<>]*"|'[^'<>]*'|[^\s"'<>=`]+))?)*\s*/?"""
+    r"""|/([a-zA-Z][a-zA-Z0-9]*)\s*)>"""
+)
+
+# Tags whose text html.parser keeps raw or BeautifulSoup leaves out of get_text()
+RAW_TEXT_TAGS = {
+    'script', 'style', 'template', 'rt', 'rp', 'textarea', 'title',
+    'xmp', 'iframe', 'noembed', 'noframes', 'noscript', 'plaintext'
+}
+
+ENTITY = re.compile(r'&(?:#([0-9]+);|#[xX]([0-9a-fA-F]+);|([a-zA-Z][a-zA-Z0-9]*)(;?))')
+
+# Named references terminated by one of these are read the same way by html.parser
+NAME_TERMINATORS = frozenset(' \t\n\r\f,:!?()[]"\'/')
+
+
+def _safe_codepoint(codepoint: int) -> bool:
+    """Code points that html.parser + BeautifulSoup decode with plain chr()"""
+    return (codepoint in (9, 10, 13) or 32 <= codepoint <= 126
+            or 160 <= codepoint <= 0xD7FF or 0xE000 <= codepoint <= 0xFFFD)
+
+
+def _decode_entities(text: str) -> Optional[str]:
+    """Decode character references in a text run, or None if any is ambiguous"""
+    parts = []
+    pos = 0
+    while True:
+        amp = text.find('&', pos)
+        if amp == -1:
+            parts.append(text[pos:])
+            return ''.join(parts)
+
+        parts.append(text[pos:amp])
+        match = ENTITY.match(text, amp)
+        if match is None:
+            # A bare '&' followed by whitespace is literal text
+            if amp + 1 < len(text) and text[amp + 1].isspace():
+                parts.append('&')
+                pos = amp + 1
+                continue
+            return None
+
+        decimal, hexadecimal, name, semicolon = match.groups()
+        if name is None:
+            codepoint = int(decimal) if decimal is not None else int(hexadecimal, 16)
+            if not _safe_codepoint(codepoint):
+                return None
+            parts.append(chr(codepoint))
+        else:
+            character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+            if semicolon:
+                if character is None:
+                    return None
+                parts.append(character)
+            else:
+                # Unterminated references such as "S&P 500" stay literal
+                end = match.end()
+                if character is not None or end >= len(text) or text[end] not in NAME_TERMINATORS:
+                    return None
+                parts.append(match.group())
+        pos = match.end()
+
+
+def strip_simple_html(text: str) -> Optional[str]:
+    """Text content of simple HTML without building a tree, or None if not simple"""
+    parts = []
+    pos = 0
+    for match in SIMPLE_TAG.finditer(text):
+        name = (match.group(1) or match.group(2)).lower()
+        if name in RAW_TEXT_TAGS:
+            return None
+        parts.append(text[pos:match.start()])
+        pos = match.end()
+    parts.append(text[pos:])
+
+    decoded = []
+    for part in parts:
+        if '<' in part:
+            return None
+        if '&' in part:
+            part = _decode_entities(part)
+            if part is None:
+                return None
+        decoded.append(part)
+    return ''.join(decoded)
+
+
+def html_to_text(text: str) -> str:
+    """Text content of text, choosing the cheapest tier that gives BeautifulSoup's answer"""
+    if '<' not in text and '&' not in text:
+        return text
+
+    stripped = strip_simple_html(text)
+    if stripped is not None:
+        return stripped
+
+    return BeautifulSoup(text, 'html.parser').get_text()
+
+
+def clean_text(text: str) -> str:
+    """Remove HTML tags and normalize whitespace"""
+    if not text:
+        return ""
+
+    return WHITESPACE.sub(' ', html_to_text(text)).strip()
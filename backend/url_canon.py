@@ -0,0 +1,118 @@
+"""Canonical article URLs, used as the dedup and cache key"""
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click, on any site
+TRACKING_PARAMS = frozenset([
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref', 'ref_src',
+    'cmpid', 'cmp', 'ito', 'amp', 'outputtype'
+])
+TRACKING_PREFIXES = ('utm_', 'pk_', 'at_')
+
+# Hosts whose article URLs carry everything in the path; the query is always dropped
+PATH_ONLY_HOSTS = frozenset([
+    'economictimes.indiatimes.com',
+    'timesofindia.indiatimes.com',
+    'www.livemint.com',
+    'www.thehindu.com',
+    'www.news18.com',
+    'www.indiatoday.in',
+    'www.business-standard.com',
+    'www.ndtvprofit.com',
+    'www.ndtv.com',
+])
+
+# Mobile / AMP hosts and the host that serves the same article
+HOST_ALIASES = {
+    'm.economictimes.com': 'economictimes.indiatimes.com',
+    'economictimes.com': 'economictimes.indiatimes.com',
+    'm.timesofindia.com': 'timesofindia.indiatimes.com',
+    'livemint.com': 'www.livemint.com',
+    'm.livemint.com': 'www.livemint.com',
+    'thehindu.com': 'www.thehindu.com',
+    'news18.com': 'www.news18.com',
+    'indiatoday.in': 'www.indiatoday.in',
+    'business-standard.com': 'www.business-standard.com',
+    'm.business-standard.com': 'www.business-standard.com',
+    'ndtvprofit.com': 'www.ndtvprofit.com',
+    'ndtv.com': 'www.ndtv.com',
+    'amp.ndtv.com': 'www.ndtv.com',
+}
+
+# Per-host path rewrites from the AMP page to the article page
+AMP_PATH_RULES = {
+    'economictimes.indiatimes.com': [(re.compile(r'/amp_articleshow/'), '/articleshow/')],
+    'timesofindia.indiatimes.com': [(re.compile(r'/amp_articleshow/'), '/articleshow/')],
+    # /news/india/<slug>/amp-11759943209804.html -> /news/india/<slug>-11759943209804.html
+    'www.livemint.com': [(re.compile(r'/amp-(\d+\.html)$'), r'-\1')],
+}
+
+# A whole "amp" path segment (/amp/, trailing /amp) is an AMP variant on any site
+AMP_SEGMENT = re.compile(r'/amp(?=/|$)')
+
+# Feed proxies whose links only redirect; the entry's origLink is the article
+REDIRECT_HOSTS = frozenset(['feedproxy.google.com', 'feeds.feedburner.com'])
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=16384)
+def canonical_url(url: str) -> str:
+    """Normalized form of an article URL; idempotent, and '' for empty input.
+
+    https, lowercase host (with mobile/AMP hosts mapped to the main one),
+    AMP path variants rewritten, tracking parameters and fragment removed,
+    no trailing slash. Unparseable input is returned stripped but unchanged.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if host.startswith('amp.') and host[4:] in PATH_ONLY_HOSTS:
+        host = host[4:]
+    host = HOST_ALIASES.get(host, host)
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = parts.path or '/'
+    for pattern, replacement in AMP_PATH_RULES.get(host, ()):
+        path = pattern.sub(replacement, path)
+    path = AMP_SEGMENT.sub('', path) or '/'
+    path = re.sub(r'/{2,}', '/', path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    if host in PATH_ONLY_HOSTS:
+        query = ''
+    else:
+        params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k)]
+        query = urlencode(sorted(params))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def entry_url(entry) -> str:
+    """Article URL of a feed entry, looking through feed-proxy redirect links.
+
+    Feedburner puts the article in feedburner:origLink; failing that, the
+    GUID is used when it is itself a URL.
+    """
+    link = entry.get('link', '') or ''
+    if link and urlsplit(link).hostname not in REDIRECT_HOSTS:
+        return link
+    for candidate in (entry.get('feedburner_origlink'), entry.get('id')):
+        if candidate and candidate.startswith(('http://', 'https://')):
+            return candidate
+    return link